@@ -0,0 +1,123 @@
+"""On-disk Construction Kit snapshot cache for the OctoMesh exploration scripts.
+
+A snapshot holds the models, fully expanded types, and enums of one tenant and is
+stored as JSON under ~/.cache/octo-claude-skills/ck/<host>/<tenant>/. Each snapshot
+carries a fingerprint of the loaded model versions (from the constructionKit models
+query), so callers can cheaply detect when the model set changed and re-fetch.
+Snapshots whose type or enum list is shorter than the server's totalCount are
+neither saved nor loaded, so an interrupted or truncated fetch cannot stick.
+"""
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+CACHE_ROOT = os.path.join(os.path.expanduser("~"), ".cache", "octo-claude-skills", "ck")
+
+# Seconds a snapshot is trusted without re-checking the model set on the server.
+DEFAULT_TTL = 600
+
+# Bump when the snapshot layout changes so stale files are ignored.
+SNAPSHOT_VERSION = 2
+
+
+def _safe_name(value):
+    """Make a host or tenant ID usable as a single path component."""
+    return re.sub(r"[^A-Za-z0-9._-]", "_", value) or "_"
+
+
+def cache_dir(context, tenant_override=None):
+    """Return the cache directory for the context's AssetServiceUrl host and tenant."""
+    opts = context["OctoToolOptions"]
+    host = urlsplit(opts["AssetServiceUrl"]).netloc or opts["AssetServiceUrl"]
+    tenant = tenant_override or opts["TenantId"]
+    return os.path.join(CACHE_ROOT, _safe_name(host), _safe_name(tenant))
+
+
+def model_fingerprint(models):
+    """Hash the sorted model fullNames (which include versions) of a models list."""
+    names = sorted(m["id"]["fullName"] for m in models)
+    return hashlib.sha256("\n".join(names).encode("utf-8")).hexdigest()
+
+
+def load_json(path):
+    """Read a cache file, returning None if it is missing or unreadable."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_json(path, obj):
+    """Atomically write `obj` as JSON to `path`, creating parent directories.
+
+    Cache write failures are not fatal: the caller already has the data in memory.
+    """
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(obj, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def snapshot_path(context, tenant_override=None):
+    """Path of the CK snapshot file for the context and tenant."""
+    return os.path.join(cache_dir(context, tenant_override), "snapshot.json")
+
+
+def load_snapshot(context, tenant_override=None):
+    """Return the cached snapshot dict, or None if absent, corrupt, incomplete, or from an older layout."""
+    snapshot = load_json(snapshot_path(context, tenant_override))
+    if not isinstance(snapshot, dict) or snapshot.get("version") != SNAPSHOT_VERSION:
+        return None
+    return snapshot if is_complete(snapshot) else None
+
+
+def save_snapshot(context, snapshot, tenant_override=None):
+    """Write the snapshot, stamping it with the layout version.
+
+    Incomplete snapshots (see is_complete()) are not written; returns whether it was.
+    """
+    if not is_complete(snapshot):
+        return False
+    snapshot["version"] = SNAPSHOT_VERSION
+    save_json(snapshot_path(context, tenant_override), snapshot)
+    return True
+
+
+def new_snapshot(models, types, enums, type_total=None, enum_total=None):
+    """Build a snapshot dict from freshly fetched models, types, and enums.
+
+    `type_total` / `enum_total` are the totalCount the server reported for each list.
+    """
+    now = time.time()
+    return {
+        "version": SNAPSHOT_VERSION,
+        "fingerprint": model_fingerprint(models),
+        "fetchedAt": now,
+        "checkedAt": now,
+        "totalCounts": {"types": type_total, "enums": enum_total},
+        "models": models,
+        "types": types,
+        "enums": enums,
+    }
+
+
+def is_complete(snapshot):
+    """True if the snapshot holds exactly as many types and enums as the server reported."""
+    totals = snapshot.get("totalCounts") or {}
+    return all(isinstance(totals.get(key), int) and totals[key] == len(snapshot.get(key) or [])
+               for key in ("types", "enums"))
+
+
+def is_fresh(snapshot, ttl=DEFAULT_TTL):
+    """True if the snapshot's model set was verified less than `ttl` seconds ago."""
+    return time.time() - snapshot.get("checkedAt", 0) < ttl
@@ -0,0 +1,262 @@
+"""Inverted full-text index over a Construction Kit snapshot.
+
+Indexes type names, attribute names, enum names, enum value names, and descriptions
+as lowercase tokens (split on punctuation and camelCase), plus a trigram map over
+the token vocabulary for substring and fuzzy matching. The index is persisted next
+to the CK snapshot (see _ck_cache.py) and rebuilt whenever the snapshot changes.
+
+Scoring: each query term contributes the weight of the best field it matched in a
+document (name > attribute/value name > description), scaled by match quality
+(exact token > substring of a token > fuzzy). All terms must match. A query that
+is a document's whole id or short name (with or without version) gets a bonus.
+Version numbers like '2.1' are indexed whole and only match versions they are a
+prefix of ('2.1.0'), never digits elsewhere ('System-2.0.2', 'Type-1').
+"""
+import os
+import re
+
+import _ck_cache
+
+# Bump when the index layout or tokenization changes so stale files are ignored.
+INDEX_VERSION = 2
+
+# Field weights: how much a term matching this field counts towards the score.
+WEIGHT_NAME = 5.0
+WEIGHT_MEMBER = 3.0
+WEIGHT_DESCRIPTION = 1.0
+
+# Added when the whole query equals a document's id or short name.
+WEIGHT_EXACT_NAME = 10.0
+
+# Match quality multipliers.
+QUALITY_EXACT = 1.0
+QUALITY_SUBSTRING = 0.7
+QUALITY_FUZZY = 0.5
+
+# Minimum trigram similarity (Jaccard) for a fuzzy token match.
+FUZZY_THRESHOLD = 0.45
+
+_SPLIT_RE = re.compile(r"[^0-9A-Za-z]+")
+_CAMEL_RE = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|[0-9]+")
+_VERSION_RE = re.compile(r"\d+(?:\.\d+)+")
+_NUMERIC_RE = re.compile(r"[0-9.]+")
+_TYPE_VERSION_RE = re.compile(r"-\d+$")
+_MODEL_VERSION_RE = re.compile(r"-\d+(\.\d+)*$")
+
+
+def tokenize(text):
+    """Split text into lowercase tokens on punctuation and camelCase boundaries.
+
+    The whole word is kept as a token as well, so 'machineState' yields
+    'machinestate', 'machine', and 'state'. Dotted versions are also kept
+    whole: 'Basic-2.1.0' yields '2.1.0' besides 'basic', '2', '1', and '0'.
+    """
+    tokens = _VERSION_RE.findall(text or "")
+    for word in _SPLIT_RE.split(text or ""):
+        if not word:
+            continue
+        lower = word.lower()
+        tokens.append(lower)
+        parts = _CAMEL_RE.findall(word)
+        if len(parts) > 1:
+            tokens.extend(p.lower() for p in parts)
+    return tokens
+
+
+def _trigrams(token):
+    """Padded trigrams of a token, e.g. 'abc' -> {'  a', ' ab', 'abc', 'bc '}."""
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _short_name(full_name):
+    """'Model-1.0.0/Type-1' -> 'Type-1'."""
+    return full_name.split("/", 1)[1] if "/" in full_name else full_name
+
+
+def _names(full_name):
+    """Lowercase names a query may spell out exactly: full id, short name, and both without versions."""
+    names = {full_name, _short_name(full_name), _TYPE_VERSION_RE.sub("", _short_name(full_name))}
+    if "/" in full_name:
+        model, type_name = full_name.split("/", 1)
+        names.add(f"{_MODEL_VERSION_RE.sub('', model)}/{_TYPE_VERSION_RE.sub('', type_name)}")
+    return sorted(n.lower() for n in names)
+
+
+def _type_fields(t):
+    """Yield (weight, source label, text) for the indexed fields of a type."""
+    fn = t["ckTypeId"]["fullName"]
+    yield WEIGHT_NAME, "name", fn
+    for edge in (t.get("attributes") or {}).get("edges") or []:
+        name = (edge.get("node") or {}).get("attributeName")
+        if name:
+            yield WEIGHT_MEMBER, f"attribute {name}", name
+    if t.get("description"):
+        yield WEIGHT_DESCRIPTION, "description", t["description"]
+
+
+def _enum_fields(e):
+    """Yield (weight, source label, text) for the indexed fields of an enum."""
+    yield WEIGHT_NAME, "name", e["ckEnumId"]["fullName"]
+    for v in e.get("values") or []:
+        if v.get("name"):
+            yield WEIGHT_MEMBER, f"value {v['name']}", v["name"]
+    if e.get("description"):
+        yield WEIGHT_DESCRIPTION, "description", e["description"]
+
+
+def build_index(types, enums, fingerprint=None, fetched_at=None):
+    """Build the index dict for lists of type and enum nodes.
+
+    Documents are referenced as ["type", position] / ["enum", position] into the
+    given lists, so the index is only valid for exactly these lists.
+    """
+    docs = []
+    names = []
+    postings = {}
+
+    def add(kind, pos, full_name, fields):
+        doc = len(docs)
+        docs.append([kind, pos])
+        names.append(_names(full_name))
+        best = {}
+        for weight, source, text in fields:
+            for token in tokenize(text):
+                if token not in best or best[token][0] < weight:
+                    best[token] = (weight, source)
+        for token, (weight, source) in best.items():
+            postings.setdefault(token, []).append([doc, weight, source])
+
+    for pos, t in enumerate(types):
+        add("type", pos, t["ckTypeId"]["fullName"], _type_fields(t))
+    for pos, e in enumerate(enums):
+        add("enum", pos, e["ckEnumId"]["fullName"], _enum_fields(e))
+
+    trigrams = {}
+    for token in postings:
+        for tri in _trigrams(token):
+            trigrams.setdefault(tri, []).append(token)
+
+    return {
+        "version": INDEX_VERSION,
+        "fingerprint": fingerprint,
+        "fetchedAt": fetched_at,
+        "docs": docs,
+        "names": names,
+        "postings": postings,
+        "trigrams": trigrams,
+    }
+
+
+def _index_path(context, tenant_override=None):
+    return os.path.join(_ck_cache.cache_dir(context, tenant_override), "index.json")
+
+
+def load_or_build(context, snapshot, tenant_override=None):
+    """Return the persisted index for `snapshot`, building and saving it if stale."""
+    path = _index_path(context, tenant_override)
+    index = _ck_cache.load_json(path)
+    if (isinstance(index, dict) and index.get("version") == INDEX_VERSION
+            and index.get("fingerprint") == snapshot.get("fingerprint")
+            and index.get("fetchedAt") == snapshot.get("fetchedAt")):
+        return index
+    index = build_index(snapshot["types"], snapshot["enums"],
+                        snapshot.get("fingerprint"), snapshot.get("fetchedAt"))
+    _ck_cache.save_json(path, index)
+    return index
+
+
+def _candidate_tokens(index, term):
+    """Yield (token, quality) for vocabulary tokens matching one query term."""
+    postings = index["postings"]
+    trigrams = index["trigrams"]
+    found = False
+    if term in postings:
+        found = True
+        yield term, QUALITY_EXACT
+
+    if _NUMERIC_RE.fullmatch(term):
+        # Numbers and versions: only whole versions they start, '2.1' -> '2.1.0'.
+        # Substring and fuzzy matches would hit digits in every other version.
+        prefix = term + "."
+        candidates = trigrams.get(term[:3], ()) if len(term) >= 3 else postings.keys()
+        for token in candidates:
+            if token.startswith(prefix):
+                yield token, QUALITY_SUBSTRING
+        return
+
+    # Substring matches: tokens containing every trigram of the term.
+    inner = [term[i:i + 3] for i in range(len(term) - 2)]
+    if inner:
+        candidates = None
+        for tri in inner:
+            tokens = set(trigrams.get(tri, ()))
+            candidates = tokens if candidates is None else candidates & tokens
+            if not candidates:
+                break
+        candidates = candidates or ()
+    else:
+        candidates = postings.keys()
+    for token in candidates:
+        if token != term and term in token:
+            found = True
+            yield token, QUALITY_SUBSTRING
+
+    if found:
+        return
+
+    # Fuzzy fallback: tokens with enough trigram overlap (typos, near spellings).
+    term_tris = _trigrams(term)
+    seen = set()
+    for tri in term_tris:
+        for token in trigrams.get(tri, ()):
+            if token in seen:
+                continue
+            seen.add(token)
+            tok_tris = _trigrams(token)
+            sim = len(term_tris & tok_tris) / len(term_tris | tok_tris)
+            if sim >= FUZZY_THRESHOLD:
+                yield token, QUALITY_FUZZY * sim
+
+
+def search(index, query):
+    """Rank documents for a free-text query.
+
+    Returns a list of (kind, position, score, reasons) sorted by descending score,
+    where reasons lists the fields that matched (e.g. 'attribute machineState').
+    """
+    terms = list(dict.fromkeys(tokenize(query)))
+    # A version in the query stands for itself, not for its separate digits.
+    parts = {p for t in terms if "." in t for p in t.split(".")}
+    terms = [t for t in terms if "." in t or t not in parts]
+    if not terms:
+        return []
+
+    scores = None
+    reasons = {}
+    for term in terms:
+        term_scores = {}
+        for token, quality in _candidate_tokens(index, term):
+            for doc, weight, source in index["postings"][token]:
+                score = weight * quality
+                if score > term_scores.get(doc, (0, None))[0]:
+                    term_scores[doc] = (score, source)
+        if scores is None:
+            scores = {doc: s for doc, (s, _) in term_scores.items()}
+        else:
+            scores = {doc: scores[doc] + term_scores[doc][0] for doc in scores if doc in term_scores}
+        for doc, (_, source) in term_scores.items():
+            reasons.setdefault(doc, set()).add(source)
+        if not scores:
+            return []
+
+    exact = query.strip().lower()
+    for doc in scores:
+        if exact in index["names"][doc]:
+            scores[doc] += WEIGHT_EXACT_NAME
+            reasons[doc].add("name")
+
+    docs = index["docs"]
+    results = [(docs[doc][0], docs[doc][1], score, sorted(reasons[doc])) for doc, score in scores.items()]
+    results.sort(key=lambda r: (-r[2], r[0], r[1]))
+    return results
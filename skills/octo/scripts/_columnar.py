@@ -0,0 +1,176 @@
+"""Streaming columnar writers for transientQuery results.
+
+A transient query returns columns[] (attributePath, attributeValueType) and rows
+of cells. open_writer() maps those columns to a typed table and appends one
+batch of rows per page, so large results can be written without holding them
+in memory or re-parsing JSON later:
+
+    csv      header row, then one line per row (always available)
+    parquet  one row group per page (needs pyarrow)
+    arrow    Arrow IPC file, one record batch per page (needs pyarrow)
+
+pyarrow is optional and only imported when a Parquet/Arrow writer is opened.
+"""
+import csv
+import json
+import sys
+from datetime import datetime, timezone
+
+from _octo_common import OctoError
+
+FORMATS = ("csv", "parquet", "arrow")
+
+# Formats that are binary and cannot be written to stdout.
+BINARY_FORMATS = ("parquet", "arrow")
+
+
+def _cell_text(value):
+    """CSV text for a cell value: '' for null, JSON for lists and objects."""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(",", ":"))
+    return value
+
+
+class CsvWriter:
+    """Write rows as CSV, flushing after every page."""
+
+    def __init__(self, stream, columns):
+        self._stream = stream
+        self._csv = csv.writer(stream)
+        self._csv.writerow([path for path, _ in columns])
+
+    def write_rows(self, rows):
+        self._csv.writerows([_cell_text(v) for v in row] for row in rows)
+        self._stream.flush()
+
+    def close(self):
+        if self._stream is not sys.stdout:
+            self._stream.close()
+
+
+# ---------------------------------------------------------------------------
+# Parquet / Arrow
+# ---------------------------------------------------------------------------
+
+def _import_pyarrow(fmt):
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        if fmt == "parquet":
+            import pyarrow.parquet
+    except ImportError as e:
+        raise OctoError(f"--format {fmt} needs pyarrow, which is not installed.",
+                        hint="Install it with 'pip install pyarrow', or use --format csv.") from e
+    return pyarrow
+
+
+def _to_int(value):
+    return value if isinstance(value, int) and not isinstance(value, bool) else int(value)
+
+
+def _to_float(value):
+    return float(value)
+
+
+def _to_bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "1", "yes")
+    return bool(value)
+
+
+def _to_timestamp(value):
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value, tz=timezone.utc)
+    parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def _to_text(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(",", ":"))
+    return str(value)
+
+
+def _column_type(pa, value_type):
+    """(arrow type, converter) for an attributeValueType; unknown types become strings."""
+    value_type = (value_type or "").upper()
+    if value_type in ("INT", "INTEGER", "INT_64", "INT64", "LONG"):
+        return pa.int64(), _to_int
+    if value_type in ("DOUBLE", "FLOAT", "DECIMAL"):
+        return pa.float64(), _to_float
+    if value_type == "BOOLEAN":
+        return pa.bool_(), _to_bool
+    if value_type in ("DATE_TIME", "DATE_TIME_OFFSET", "DATETIME"):
+        return pa.timestamp("us", tz="UTC"), _to_timestamp
+    if value_type == "STRING_ARRAY":
+        return pa.list_(pa.string()), lambda v: [_to_text(x) for x in v]
+    if value_type in ("INTEGER_ARRAY", "INT_ARRAY"):
+        return pa.list_(pa.int64()), lambda v: [_to_int(x) for x in v]
+    return pa.string(), _to_text
+
+
+class ArrowWriter:
+    """Append pages as record batches to a Parquet or Arrow IPC file."""
+
+    def __init__(self, path, fmt, columns):
+        pa = self._pa = _import_pyarrow(fmt)
+        types = [_column_type(pa, value_type) for _, value_type in columns]
+        self._names = [path_ for path_, _ in columns]
+        self._converters = [conv for _, conv in types]
+        self._schema = pa.schema([pa.field(name, arrow_type) for name, (arrow_type, _) in zip(self._names, types)])
+        if fmt == "parquet":
+            self._writer = pa.parquet.ParquetWriter(path, self._schema)
+        else:
+            self._writer = pa.ipc.new_file(path, self._schema)
+
+    def write_rows(self, rows):
+        if not rows:
+            return
+        arrays = []
+        for i, (name, convert) in enumerate(zip(self._names, self._converters)):
+            values = []
+            for row in rows:
+                value = row[i]
+                if value is None:
+                    values.append(None)
+                    continue
+                try:
+                    values.append(convert(value))
+                except (TypeError, ValueError) as e:
+                    raise OctoError(f"value {value!r} in column '{name}' does not match its type "
+                                    f"{self._schema.field(name).type}.",
+                                    hint="Use --format csv to export the values as text.") from e
+            arrays.append(self._pa.array(values, type=self._schema.field(name).type))
+        batch = self._pa.RecordBatch.from_arrays(arrays, schema=self._schema)
+        if isinstance(self._writer, self._pa.ipc.RecordBatchFileWriter):
+            self._writer.write_batch(batch)
+        else:
+            self._writer.write_table(self._pa.Table.from_batches([batch]))
+
+    def close(self):
+        self._writer.close()
+
+
+def open_writer(fmt, path, columns):
+    """Open a writer for `fmt` at `path` ('-' or None: stdout, CSV only).
+
+    `columns` is a list of (attributePath, attributeValueType) pairs. The writer
+    has write_rows(rows), taking lists of values in column order, and close().
+    """
+    if fmt in BINARY_FORMATS:
+        if not path or path == "-":
+            raise OctoError(f"--format {fmt} writes a binary file; give it with --out FILE.")
+    elif not path or path == "-":
+        return CsvWriter(sys.stdout, columns)
+    try:
+        if fmt in BINARY_FORMATS:
+            return ArrowWriter(path, fmt, columns)
+        return CsvWriter(open(path, "w", newline="", encoding="utf-8"), columns)
+    except OSError as e:
+        raise OctoError(f"cannot write {path}: {e}") from e
@@ -2,137 +2,1517 @@
 
 Provides context loading, authentication, and GraphQL query execution
 using the connection info from ~/.octo-cli/contexts.json.
+
+All queries go through a pooled, keep-alive HTTP client (one per AssetServiceUrl
+and TLS verification setting), so repeated queries in one process reuse the
+same TCP/TLS connections instead of paying a fresh handshake each time.
+
+Transient transport failures (connection drops, timeouts, HTTP 429/502/503/504)
+are retried with exponential backoff and jitter according to the active
+RetryPolicy (see set_retry_policy()); once retries are exhausted a
+TransportError is raised for the caller to handle.
+
+The helpers never print-and-exit: failures raise OctoError subclasses
+(ContextError, AuthError, TransportError, GraphQLError), so they can run inside
+thread pools and long-lived workers. CLI entry points catch OctoError, report
+it with print_error(), and exit with the error's exit_code.
+
+Responses are requested compressed with requests' default Accept-Encoding
+(gzip/deflate, plus br and zstd when the brotli / zstandard packages are
+installed) and decoded with orjson or ujson when available, falling back to the
+stdlib json module. transfer_stats() reports bytes on the wire vs decoded bytes
+and JSON decode time; the wire size is reported as unknown when the transport
+adapter does not count the bytes it read.
+
+Each request attempt can be observed through add_request_hook(): hooks receive
+an event with the query name, payload sizes, and per-phase timings (connect,
+TLS, server wait, download, JSON decode). RequestTimings collects these events
+for the explorers' --timings flag.
+
+The scripts' constant Q_* documents are registered for automatic persisted
+queries (see register_persisted_queries()): they are sent as a SHA-256 hash and
+only fall back to the full text when the server has not seen the hash yet.
+
+Requests can be throttled per GraphQL endpoint (AssetServiceUrl + tenant) with
+a token-bucket rate and a max-in-flight cap (see set_rate_limit()), optionally
+shared between processes through lock files in the temp directory.
+
+AsyncGraphQLClient offers the same calls to asyncio code, running them on a
+bounded thread pool over the shared pooled client, so commands can keep dozens
+of queries in flight without adding an async HTTP dependency.
 """
+import argparse
+import asyncio
+import atexit
+import base64
+import copy
+import functools
+import hashlib
 import json
 import os
+import random
+import re
 import sys
+import tempfile
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+# Fastest available JSON decoder for response bodies; all accept bytes.
+try:
+    import orjson
+    _json_loads = orjson.loads
+    JSON_BACKEND = "orjson"
+except ImportError:
+    try:
+        import ujson
+        _json_loads = ujson.loads
+        JSON_BACKEND = "ujson"
+    except ImportError:
+        _json_loads = json.loads
+        JSON_BACKEND = "json"
+
+# Default number of keep-alive connections kept open per host.
+DEFAULT_POOL_SIZE = 10
+
+# Default per-request timeout in seconds.
+DEFAULT_TIMEOUT = 30
+
+# Default page size when walking a connection cursor by cursor.
+DEFAULT_PAGE_SIZE = 200
+
+# Refresh the access token when it expires within this many seconds.
+TOKEN_REFRESH_MARGIN = 60
+
+# Default number of pages fetched concurrently when cursors are offset-based.
+DEFAULT_PARALLEL_PAGES = 4
+
+
+class OctoError(Exception):
+    """Base class for errors raised by the OctoMesh script helpers.
+
+    The helpers never exit the process themselves; CLI entry points catch
+    OctoError, report it with print_error(), and exit with `exit_code`.
+    `hint` optionally carries follow-up lines telling the user how to fix it.
+    """
+
+    exit_code = 1
+
+    def __init__(self, message, hint=None):
+        super().__init__(message)
+        self.hint = hint
+
+
+class ContextError(OctoError):
+    """~/.octo-cli/contexts.json is missing, malformed, or has no usable active context."""
+
+    exit_code = 3
+
+
+class AuthError(OctoError):
+    """No access token, or the server rejected it (`status` is 401/403 if it did)."""
+
+    exit_code = 4
+
+    def __init__(self, message, hint=None, status=None):
+        super().__init__(message, hint)
+        self.status = status
+
+
+class TransportError(OctoError):
+    """The GraphQL endpoint could not be reached or answered with an HTTP error.
+
+    `status` is the last HTTP status code (None for connection failures and
+    timeouts); `attempts` is how many times the request was sent.
+    """
+
+    exit_code = 5
+
+    def __init__(self, message, hint=None, url=None, status=None, attempts=1):
+        super().__init__(message, hint)
+        self.url = url
+        self.status = status
+        self.attempts = attempts
+
+
+class GraphQLError(OctoError):
+    """The server answered but returned GraphQL errors and no data.
+
+    `errors` is the server's errors list; `data` is whatever data came back (usually None).
+    """
+
+    exit_code = 1
+
+    def __init__(self, errors, data=None):
+        messages = [_error_message(e) for e in errors] or ["unknown GraphQL error"]
+        message = messages[0] if len(messages) == 1 else f"{messages[0]} (and {len(messages) - 1} more)"
+        super().__init__(message)
+        self.errors = errors
+        self.data = data
+
+
+def _error_message(err):
+    return err.get("message", err) if isinstance(err, dict) else err
+
+
+class RetryPolicy:
+    """How _post_graphql() retries transient failures.
+
+    Args:
+        max_attempts: Total tries per request, including the first (1 disables retries).
+        retry_statuses: HTTP status codes treated as transient.
+        backoff: Base delay in seconds; attempt n waits up to backoff * 2**(n-1).
+        max_backoff: Upper bound for a single computed delay.
+        jitter: If True, wait a random fraction of the computed delay ("full jitter")
+                so concurrent clients do not retry in lockstep.
+        max_retry_after: Upper bound for a server-sent Retry-After delay.
+        retry_connection_errors: Also retry connection failures and timeouts.
+        timeout: Per-attempt request timeout in seconds.
+    """
+
+    def __init__(self, max_attempts=4, retry_statuses=(429, 502, 503, 504), backoff=0.5,
+                 max_backoff=30.0, jitter=True, max_retry_after=120.0,
+                 retry_connection_errors=True, timeout=DEFAULT_TIMEOUT):
+        self.max_attempts = max(1, max_attempts)
+        self.retry_statuses = frozenset(retry_statuses)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.max_retry_after = max_retry_after
+        self.retry_connection_errors = retry_connection_errors
+        self.timeout = timeout
+
+    def delay(self, attempt, retry_after=None):
+        """Seconds to wait before retry number `attempt` (1-based).
+
+        A Retry-After header (seconds or HTTP date) takes precedence, capped at
+        max_retry_after.
+        """
+        server_delay = _parse_retry_after(retry_after)
+        if server_delay is not None:
+            return min(server_delay, self.max_retry_after)
+        delay = min(self.max_backoff, self.backoff * (2 ** (attempt - 1)))
+        return random.uniform(0, delay) if self.jitter else delay
 
 
-def load_context():
+def _parse_retry_after(value):
+    """Parse a Retry-After header into seconds, or None if absent or malformed."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+
+def print_error(error):
+    """Print an OctoError and its hint to stderr in the scripts' 'Error: ...' format.
+
+    GraphQLError prints one 'GraphQL error: ...' line per server error instead.
+    """
+    if isinstance(error, GraphQLError):
+        for err in error.errors:
+            print(f"GraphQL error: {_error_message(err)}", file=sys.stderr)
+        return
+    print(f"Error: {error}", file=sys.stderr)
+    if error.hint:
+        print(error.hint, file=sys.stderr)
+
+
+_retry_policy = RetryPolicy()
+
+
+def get_retry_policy():
+    """Return the RetryPolicy used for all GraphQL requests in this process."""
+    return _retry_policy
+
+
+def set_retry_policy(policy):
+    """Replace the process-wide RetryPolicy; returns the previous one.
+
+    Pass RetryPolicy(max_attempts=1) to fail fast without retries.
+    """
+    global _retry_policy
+    previous, _retry_policy = _retry_policy, policy
+    return previous
+
+
+def positive_int(value):
+    """argparse type for counts that must be at least 1 (workers, batch and page sizes)."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: '{value}'")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def positive_float(value):
+    """argparse type for rates that must be greater than 0."""
+    try:
+        number = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid float value: '{value}'")
+    if not number > 0:
+        raise argparse.ArgumentTypeError(f"must be greater than 0, got {value}")
+    return number
+
+
+def add_client_flags(parser):
+    """Add the flags shared by every script that queries GraphQL through these helpers.
+
+    --tenant, --insecure, --stats, --timings, and the --rate / --max-in-flight /
+    --shared-limit throttle; run the command with run_cli().
+    """
+    parser.add_argument("--tenant", type=str, default=None, help="Override tenant ID")
+    parser.add_argument("--insecure", action="store_true",
+                        help="Disable SSL certificate verification (for localhost dev)")
+    parser.add_argument("--stats", action="store_true",
+                        help="Print response transfer stats (bytes on wire vs decoded) to stderr")
+    parser.add_argument("--timings", nargs="?", const="", default=None, metavar="TRACE.json",
+                        help="Print per-phase request timings to stderr; --timings=FILE also writes a JSON trace")
+    parser.add_argument("--rate", type=positive_float, default=None, metavar="N",
+                        help="Send at most N requests per second to the tenant")
+    parser.add_argument("--max-in-flight", type=positive_int, default=None, dest="max_in_flight", metavar="N",
+                        help="Keep at most N requests in flight at once")
+    parser.add_argument("--shared-limit", action="store_true", dest="shared_limit",
+                        help="Share --rate/--max-in-flight with other processes on this machine")
+
+
+def run_cli(args, command):
+    """Run `command(context, args)` for a CLI whose parser used add_client_flags().
+
+    Loads the active context, applies --rate/--max-in-flight to the target
+    tenant, collects --timings (reported even if the command fails), prints
+    --stats afterwards, and reports an OctoError with print_error() before
+    exiting with its exit_code.
+    """
+    timings = RequestTimings.install() if args.timings is not None else None
+    try:
+        context = load_context()
+        if args.rate or args.max_in_flight:
+            set_rate_limit(RateLimit(args.rate, max_in_flight=args.max_in_flight, shared=args.shared_limit),
+                           context, args.tenant)
+        command(context, args)
+        if args.stats:
+            print(f"Transfer: {format_transfer_stats()}", file=sys.stderr)
+    except OctoError as e:
+        print_error(e)
+        sys.exit(e.exit_code)
+    finally:
+        if timings is not None:
+            timings.report(args.timings)
+
+
+def _contexts_path():
+    return os.path.join(os.path.expanduser("~"), ".octo-cli", "contexts.json")
+
+
+# Parsed contexts.json, reused until the file's inode, size, or mtime changes.
+_contexts_cache = {"key": None, "config": None, "contexts": None}
+_contexts_lock = threading.Lock()
+
+
+def _load_contexts_file():
+    """Return (raw config, {name: context}) for contexts.json, parsing it only when it changed.
+
+    Raises ContextError if the file is missing or malformed.
+    """
+    path = _contexts_path()
+    try:
+        st = os.stat(path)
+    except OSError:
+        raise ContextError(
+            f"contexts file not found at {path}",
+            "Run 'octo-cli -c AddContext -n <name> -isu <url> -asu <url> -tid <tenant>' to create a context,\n"
+            "then 'octo-cli -c UseContext -n <name>' and 'octo-cli -c LogIn -i' to authenticate.") from None
+    key = (path, st.st_ino, st.st_size, st.st_mtime_ns)
+
+    with _contexts_lock:
+        if _contexts_cache["key"] == key:
+            return _contexts_cache["config"], _contexts_cache["contexts"]
+        try:
+            with open(path) as f:
+                config = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ContextError(f"failed to parse {path}: {e}") from e
+        except OSError as e:
+            raise ContextError(f"cannot read {path}: {e}") from e
+
+        contexts = {
+            name: {
+                "Name": name,
+                "OctoToolOptions": entry.get("OctoToolOptions", {}),
+                "Authentication": entry.get("Authentication", {}),
+            }
+            for name, entry in (config.get("Contexts") or {}).items()
+            if isinstance(entry, dict)
+        }
+        _contexts_cache.update(key=key, config=config, contexts=contexts)
+        return config, contexts
+
+
+def load_contexts():
+    """Return (active context name, {name: context dict}) for every context in contexts.json.
+
+    Context dicts have the same shape as load_context() returns. The file is
+    parsed once and re-read only when it changes on disk, so calling this (or
+    load_context()) in a loop is cheap. Each call returns private copies, so
+    callers (and refresh_token()) may change them without affecting others.
+    """
+    config, contexts = _load_contexts_file()
+    return config.get("ActiveContext"), copy.deepcopy(contexts)
+
+
+def load_contexts_config():
+    """Return a private copy of the raw contexts.json document, e.g. to edit and write back."""
+    config, _ = _load_contexts_file()
+    return copy.deepcopy(config)
+
+
+def load_context(name=None):
     """Read ~/.octo-cli/contexts.json and return the active context as a dict.
 
     Returns a dict with "OctoToolOptions" and "Authentication" keys,
-    matching the structure expected by get_graphql_url() and get_token().
-    Exits with a clear error if the file is missing, malformed, or has no active context.
+    matching the structure expected by get_graphql_url() and get_token(),
+    plus "Name" (the context name, used to write refreshed tokens back).
+    The dict is the caller's own copy; threads sharing it see token refreshes.
+    Pass `name` to load a specific context instead of the active one.
+    Raises ContextError if the file is missing, malformed, or has no active context.
     """
-    path = os.path.join(os.path.expanduser("~"), ".octo-cli", "contexts.json")
-    if not os.path.isfile(path):
-        print(f"Error: contexts file not found at {path}", file=sys.stderr)
-        print("Run 'octo-cli -c AddContext -n <name> -isu <url> -asu <url> -tid <tenant>' to create a context,", file=sys.stderr)
-        print("then 'octo-cli -c UseContext -n <name>' and 'octo-cli -c LogIn -i' to authenticate.", file=sys.stderr)
-        sys.exit(1)
-    try:
-        with open(path) as f:
-            config = json.load(f)
-    except json.JSONDecodeError as e:
-        print(f"Error: failed to parse {path}: {e}", file=sys.stderr)
-        sys.exit(1)
+    active_name, contexts = load_contexts()
+    if name is None:
+        if not active_name:
+            raise ContextError("no active context set.",
+                               "Run 'octo-cli -c UseContext -n <name>' to activate a context.")
+        name = active_name
+        label = "active context"
+    else:
+        label = "context"
 
-    active_name = config.get("ActiveContext")
-    if not active_name:
-        print("Error: no active context set.", file=sys.stderr)
-        print("Run 'octo-cli -c UseContext -n <name>' to activate a context.", file=sys.stderr)
-        sys.exit(1)
+    context = contexts.get(name)
+    if not context:
+        raise ContextError(f"{label} '{name}' not found in contexts.",
+                           "Run 'octo-cli -c UseContext' to list available contexts.")
+    return context
 
-    contexts = config.get("Contexts", {})
-    active = contexts.get(active_name)
-    if not active:
-        print(f"Error: active context '{active_name}' not found in contexts.", file=sys.stderr)
-        print("Run 'octo-cli -c UseContext' to list available contexts.", file=sys.stderr)
-        sys.exit(1)
 
-    return {
-        "OctoToolOptions": active.get("OctoToolOptions", {}),
-        "Authentication": active.get("Authentication", {}),
-    }
+@functools.lru_cache(maxsize=64)
+def _graphql_url(asset_service_url, tenant):
+    return f"{asset_service_url.rstrip('/')}/tenants/{tenant}/GraphQL"
 
 
 def get_graphql_url(context, tenant_override=None):
     """Build the GraphQL endpoint URL from the active context.
 
     Returns: https://{AssetServiceUrl}tenants/{TenantId}/GraphQL
+    URLs are memoized per AssetServiceUrl and tenant.
     """
     opts = context["OctoToolOptions"]
-    base = opts["AssetServiceUrl"].rstrip("/")
-    tenant = tenant_override or opts["TenantId"]
-    return f"{base}/tenants/{tenant}/GraphQL"
+    return _graphql_url(opts["AssetServiceUrl"], tenant_override or opts["TenantId"])
 
 
-def get_token(context):
+def get_token(context, verify_ssl=True):
     """Extract the access token from the active context.
 
-    Exits with error if missing or empty.
+    If the token (a JWT) expires within TOKEN_REFRESH_MARGIN seconds, it is
+    refreshed first (see refresh_token()). Raises AuthError if missing or empty.
     """
     token = context.get("Authentication", {}).get("AccessToken")
     if not token:
-        print("Error: no access token found in active context.", file=sys.stderr)
-        print("Run 'octo-cli -c LogIn -i' to authenticate.", file=sys.stderr)
-        sys.exit(1)
+        raise AuthError("no access token found in active context.",
+                        "Run 'octo-cli -c LogIn -i' to authenticate.")
+    if _expires_soon(token):
+        refresh_token(context, stale_token=token, verify_ssl=verify_ssl)
+        token = context["Authentication"]["AccessToken"]
     return token
 
 
-def graphql_query(context, query, variables=None, tenant_override=None, verify_ssl=True):
-    """Execute a GraphQL query and return the 'data' dict.
+def jwt_claims(token):
+    """Decode the payload of a JWT without verifying it; {} if it is not a JWT."""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        claims = json.loads(base64.urlsafe_b64decode(payload))
+    except (IndexError, ValueError, AttributeError):
+        return {}
+    return claims if isinstance(claims, dict) else {}
+
+
+def token_expiry(token):
+    """Return the JWT 'exp' claim as a Unix timestamp, or None if unknown."""
+    exp = jwt_claims(token).get("exp")
+    return float(exp) if isinstance(exp, (int, float)) else None
+
+
+def _expires_soon(token, margin=TOKEN_REFRESH_MARGIN):
+    exp = token_expiry(token)
+    return exp is not None and exp - time.time() < margin
+
+
+_token_lock = threading.Lock()
+
+
+def refresh_token(context, stale_token=None, verify_ssl=True):
+    """Replace an expiring or rejected access token in `context`, in place.
+
+    The update happens under a lock, so worker threads sharing one context
+    dict all pick up the new token. Other dicts from load_context() are copies
+    and see it the next time they are loaded (it is written to contexts.json).
+
+    Tries, in order:
+      1. Re-reading ~/.octo-cli/contexts.json, in case octo-cli refreshed it.
+      2. An OAuth refresh_token grant against the identity service's token
+         endpoint (from its OpenID discovery document), using the stored
+         RefreshToken and the token's client_id claim. New tokens are written
+         back to contexts.json so octo-cli and later runs pick them up.
+
+    `stale_token` is the token the caller found lacking; if another thread
+    already replaced it, nothing more is done. Returns True if the context now
+    holds a different access token. Failures are not raised: the caller's
+    request then fails with the usual AuthError.
+    """
+    auth = context.setdefault("Authentication", {})
+    with _token_lock:
+        current = auth.get("AccessToken")
+        if stale_token is not None and current != stale_token:
+            return True
+
+        stored = _read_stored_auth(context)
+        if stored and stored.get("AccessToken") not in (None, current) \
+                and not _expires_soon(stored["AccessToken"]):
+            auth.update(stored)
+            return True
+
+        new_tokens = _refresh_grant(context, current, verify_ssl)
+        if not new_tokens:
+            return False
+        auth["AccessToken"] = new_tokens["access_token"]
+        if new_tokens.get("refresh_token"):
+            auth["RefreshToken"] = new_tokens["refresh_token"]
+        _write_stored_auth(context, auth)
+        return True
+
+
+def _read_stored_auth(context):
+    """Return the Authentication block of this context as currently stored on disk."""
+    try:
+        active_name, contexts = load_contexts()
+    except ContextError:
+        return None
+    stored = contexts.get(context.get("Name") or active_name)
+    return dict(stored["Authentication"]) if stored else None
 
-    Handles HTTP errors, auth failures, GraphQL errors, and connection errors.
-    Exits with actionable error messages on failure.
+
+def _refresh_grant(context, access_token, verify_ssl):
+    """Run the refresh_token grant; return the token response dict or None."""
+    refresh = context["Authentication"].get("RefreshToken")
+    identity_url = context.get("OctoToolOptions", {}).get("IdentityServiceUrl") \
+        or jwt_claims(access_token or "").get("iss")
+    if not refresh or not identity_url:
+        return None
+    claims = jwt_claims(access_token or "")
+    client_id = claims.get("client_id") or claims.get("azp")
+
+    discovery_url = identity_url.rstrip("/") + "/.well-known/openid-configuration"
+    verify_ssl = _resolve_verify_ssl(discovery_url, verify_ssl)
+    client = get_client(discovery_url, verify_ssl)
+    try:
+        resp = client.get(discovery_url)
+        token_endpoint = resp.json().get("token_endpoint") if resp.status_code == 200 else None
+        if not token_endpoint:
+            return None
+        form = {"grant_type": "refresh_token", "refresh_token": refresh}
+        if client_id:
+            form["client_id"] = client_id
+        resp = get_client(token_endpoint, verify_ssl).post(token_endpoint, data=form)
+        tokens = resp.json() if resp.status_code == 200 else None
+    except (requests.RequestException, ValueError):
+        return None
+    if not isinstance(tokens, dict) or not tokens.get("access_token"):
+        return None
+    return tokens
+
+
+def _write_stored_auth(context, auth):
+    """Atomically write refreshed tokens back to this context in contexts.json.
+
+    Only the token fields of this context are changed; other contexts and
+    settings are kept as found on disk. Write failures are ignored.
+    """
+    path = _contexts_path()
+    try:
+        with open(path) as f:
+            config = json.load(f)
+        name = context.get("Name") or config.get("ActiveContext")
+        stored = config.get("Contexts", {}).get(name)
+        if stored is None:
+            return
+        stored.setdefault("Authentication", {}).update(
+            {k: auth[k] for k in ("AccessToken", "RefreshToken") if k in auth})
+        mode = os.stat(path).st_mode & 0o777
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(config, f, indent=2)
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except (OSError, ValueError):
+        pass
+
+
+# ---------------------------------------------------------------------------
+# Rate limiting
+# ---------------------------------------------------------------------------
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+
+class RateLimit:
+    """Client-side throttle for one GraphQL endpoint.
 
     Args:
-        verify_ssl: If False, skip TLS certificate verification (for local dev
-                    with self-signed certs). Also automatically disabled for
-                    localhost URLs.
+        rate: Sustained requests per second (token bucket refill rate); None for no limit.
+        burst: Bucket size, i.e. requests allowed back to back after idling (default: max(1, rate)).
+        max_in_flight: Maximum concurrent requests; None for no limit.
+        shared: Coordinate the limits across processes on this machine through lock
+                files in the temp directory, so parallel jobs share one budget.
+    Raises ValueError for a rate or burst that is not greater than 0, or a
+    max_in_flight below 1.
+    """
+
+    def __init__(self, rate=None, burst=None, max_in_flight=None, shared=False):
+        if rate is not None and not rate > 0:
+            raise ValueError(f"rate must be greater than 0, got {rate}")
+        if burst is not None and not burst > 0:
+            raise ValueError(f"burst must be greater than 0, got {burst}")
+        if max_in_flight is not None and max_in_flight < 1:
+            raise ValueError(f"max_in_flight must be at least 1, got {max_in_flight}")
+        self.rate = rate
+        self.burst = burst if burst is not None else (max(1.0, rate) if rate else None)
+        self.max_in_flight = max_in_flight
+        self.shared = shared
+
+
+def _lock_file(f, blocking=True):
+    """Exclusively lock an open file; returns False if non-blocking and already locked."""
+    if fcntl is not None:
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            return True
+        except BlockingIOError:
+            return False
+    f.seek(0)
+    while True:
+        try:
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            if not blocking:
+                return False
+            time.sleep(0.01)
+
+
+def _unlock_file(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class _Governor:
+    """Token bucket plus in-flight cap for one endpoint, thread-safe and optionally cross-process."""
+
+    def __init__(self, key, limit):
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(limit.max_in_flight) if limit.max_in_flight else None
+        self._tokens = limit.burst or 0.0
+        self._stamp = time.monotonic()
+        self._shared = limit.shared and (fcntl is not None or msvcrt is not None)
+        if self._shared:
+            digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+            self._prefix = os.path.join(tempfile.gettempdir(), f"octo-claude-skills-limit-{digest}")
+            self._held = threading.local()
+
+    def acquire(self):
+        """Block until a request may be sent; return the seconds spent waiting."""
+        start = time.perf_counter()
+        if self._slots is not None:
+            self._slots.acquire()
+            if self._shared:
+                try:
+                    self._acquire_shared_slot()
+                except BaseException:
+                    # No slot file is held yet; give the local slot back so it is not lost.
+                    self._slots.release()
+                    raise
+        try:
+            if self.limit.rate:
+                self._take_token()
+        except BaseException:
+            self.release()
+            raise
+        return time.perf_counter() - start
+
+    def release(self):
+        if self._slots is not None:
+            if self._shared:
+                f = getattr(self._held, "slot", None)
+                if f is not None:
+                    self._held.slot = None
+                    _unlock_file(f)
+                    f.close()
+            self._slots.release()
+
+    def _take_token(self):
+        while True:
+            wait = self._take_shared_token() if self._shared else self._take_local_token()
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    def _take_local_token(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.limit.burst, self._tokens + (now - self._stamp) * self.limit.rate)
+            self._stamp = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.limit.rate
+
+    def _take_shared_token(self):
+        """Token bucket whose state lives in a JSON file guarded by an exclusive lock."""
+        with self._lock, open(self._prefix + ".bucket", "a+") as f:
+            _lock_file(f)
+            try:
+                f.seek(0)
+                try:
+                    state = json.loads(f.read() or "{}")
+                except ValueError:
+                    state = {}
+                now = time.time()
+                tokens = state.get("tokens", self.limit.burst)
+                tokens = min(self.limit.burst, tokens + max(0.0, now - state.get("stamp", now)) * self.limit.rate)
+                wait = 0.0
+                if tokens >= 1:
+                    tokens -= 1
+                else:
+                    wait = (1 - tokens) / self.limit.rate
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps({"tokens": tokens, "stamp": now}))
+                f.flush()
+                return wait
+            finally:
+                _unlock_file(f)
+
+    def _acquire_shared_slot(self):
+        """Hold one of max_in_flight slot lock files; poll until one is free."""
+        delay = 0.005
+        while True:
+            for i in range(self.limit.max_in_flight):
+                f = open(f"{self._prefix}.slot{i}", "a+")
+                try:
+                    locked = _lock_file(f, blocking=False)
+                except BaseException:
+                    f.close()
+                    raise
+                if locked:
+                    self._held.slot = f
+                    return
+                f.close()
+            time.sleep(delay)
+            delay = min(delay * 2, 0.1)
+
+
+_rate_limits = {}
+_governors = {}
+_governors_lock = threading.Lock()
+
+
+def set_rate_limit(limit, context=None, tenant_override=None):
+    """Throttle GraphQL requests to the context's endpoint (or to every endpoint).
+
+    With a context, the limit applies to that AssetServiceUrl and tenant only;
+    without one it becomes the default for all endpoints. Pass limit=None to
+    remove it. Fan-out helpers (graphql_batch, fetch_all_pages, bulk commands)
+    then run as fast as the limit allows.
+    """
+    key = get_graphql_url(context, tenant_override).lower() if context is not None else None
+    with _governors_lock:
+        if limit is None:
+            _rate_limits.pop(key, None)
+        else:
+            _rate_limits[key] = limit
+        _governors.clear()
+
+
+def _governor_for(url):
+    key = url.lower()
+    with _governors_lock:
+        governor = _governors.get(key)
+        if governor is None:
+            limit = _rate_limits.get(key) or _rate_limits.get(None)
+            if limit is None or not (limit.rate or limit.max_in_flight):
+                return None
+            governor = _Governor(key, limit)
+            _governors[key] = governor
+        return governor
+
+
+def _governed_post(client, url, **kwargs):
+    """POST through the endpoint's rate limiter, if one is configured."""
+    governor = _governor_for(url)
+    if governor is None:
+        return client.post(url, **kwargs)
+    _note_phase("throttle", governor.acquire())
+    try:
+        return client.post(url, **kwargs)
+    finally:
+        governor.release()
+
+
+# ---------------------------------------------------------------------------
+# Request instrumentation
+# ---------------------------------------------------------------------------
+
+_request_hooks = []
+_trace = threading.local()
+
+
+def add_request_hook(hook):
+    """Call `hook(event)` after every GraphQL request attempt, from the requesting thread.
+
+    `event` is a dict with: name (operation name or top-level field path), url,
+    attempt, status (None if no response), error, start (Unix time), the phase
+    durations in seconds throttle (waiting on the rate limiter), connect (DNS +
+    TCP, 0 on a reused connection), tls, wait (request upload + server time to
+    first response byte), download, decode, and total, plus requestBytes, wireBytes
+    (None if the transport did not count them), decodedBytes, encoding, and
+    reused. Hooks must be fast and must not raise.
+    """
+    _request_hooks.append(hook)
+
+
+def remove_request_hook(hook):
+    """Stop calling a hook registered with add_request_hook()."""
+    if hook in _request_hooks:
+        _request_hooks.remove(hook)
+
+
+def _note_phase(key, seconds):
+    record = getattr(_trace, "record", None)
+    if record is not None:
+        record[key] = record.get(key, 0.0) + seconds
+
+
+class _TimedConnectionMixin:
+    """Record DNS + TCP connect and TLS handshake time into the current request trace."""
+
+    def _new_conn(self):
+        start = time.perf_counter()
+        try:
+            return super()._new_conn()
+        finally:
+            self._octo_tcp_seconds = time.perf_counter() - start
+            _note_phase("connect", self._octo_tcp_seconds)
+
+    def connect(self):
+        self._octo_tcp_seconds = 0.0
+        start = time.perf_counter()
+        super().connect()
+        tls = time.perf_counter() - start - self._octo_tcp_seconds
+        if isinstance(self, HTTPSConnection):
+            _note_phase("tls", max(0.0, tls))
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedAdapter(HTTPAdapter):
+    """HTTPAdapter whose connections report connect/TLS timings."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+
+_QUERY_FIELDS_RE = re.compile(r"\{\s*(?:\w+\s*:\s*)?(\w+)[^{}]*\{\s*(?:\w+\s*:\s*)?(\w+)")
+_OPERATION_NAME_RE = re.compile(r"^\s*(?:query|mutation|subscription)\s+(\w+)")
+
+
+def _query_name(payload):
+    """Short label for a payload: the operation name, else the first two field names."""
+    if isinstance(payload, list):
+        return f"batch[{len(payload)}]"
+    query = payload.get("query")
+    if query is None:
+        persisted = (payload.get("extensions") or {}).get("persistedQuery") or {}
+        query = _persisted_documents.get(persisted.get("sha256Hash")) or ""
+    m = _OPERATION_NAME_RE.match(query)
+    if m:
+        return m.group(1)
+    m = _QUERY_FIELDS_RE.search(query)
+    return f"{m.group(1)}.{m.group(2)}" if m else "query"
+
+
+def _start_trace(name, url, attempt, request_bytes):
+    record = {"name": name, "url": url, "attempt": attempt, "status": None, "error": None,
+              "start": time.time(), "requestBytes": request_bytes, "_t0": time.perf_counter()}
+    _trace.record = record
+    return record
+
+
+def _note_response(record, resp):
+    record["status"] = resp.status_code
+    record["_http"] = time.perf_counter() - record["_t0"]
+    record["_elapsed"] = resp.elapsed.total_seconds()
+
+
+def _finish_trace(record, error=None):
+    """Complete a request trace and pass it to the hooks (once per record)."""
+    if getattr(_trace, "record", None) is record:
+        _trace.record = None
+    if record.get("_done"):
+        return
+    record["_done"] = True
+    if error:
+        record["error"] = error
+    if not _request_hooks:
+        return
+    t0 = record.pop("_t0")
+    http = record.pop("_http", time.perf_counter() - t0)
+    elapsed = record.pop("_elapsed", http)
+    connect, tls = record.setdefault("connect", 0.0), record.setdefault("tls", 0.0)
+    throttle = record.setdefault("throttle", 0.0)
+    event = {k: v for k, v in record.items() if not k.startswith("_")}
+    event.update(
+        wait=max(0.0, elapsed - connect - tls),
+        download=max(0.0, http - throttle - elapsed),
+        decode=record.get("decode", 0.0),
+        total=time.perf_counter() - t0,
+        wireBytes=record.get("wireBytes", 0),  # None: read by an adapter that does not count bytes
+        decodedBytes=record.get("decodedBytes", 0),
+        encoding=record.get("encoding"),
+        reused=record["status"] is not None and connect == 0.0,
+    )
+    for hook in list(_request_hooks):
+        hook(event)
+
+
+class RequestTimings:
+    """Collects request events and reports where a command's time went.
+
+    Client time is wall time not covered by any in-flight request, i.e. time
+    spent in the script itself (argument handling, formatting, output).
+    """
+
+    def __init__(self):
+        self.events = []
+        self._lock = threading.Lock()
+        self._wall_start = time.perf_counter()
+        self._started_at = time.time()
+
+    @classmethod
+    def install(cls):
+        """Create a collector and register it as a request hook."""
+        timings = cls()
+        add_request_hook(timings.record)
+        return timings
+
+    def record(self, event):
+        with self._lock:
+            self.events.append(event)
+
+    def totals(self):
+        """Aggregate the collected events into a summary dict."""
+        wall = time.perf_counter() - self._wall_start
+        events = list(self.events)
+        intervals = sorted((e["start"], e["start"] + e["total"]) for e in events)
+        covered, cur_start, cur_end = 0.0, None, None
+        for start, end in intervals:
+            if cur_end is None or start > cur_end:
+                if cur_end is not None:
+                    covered += cur_end - cur_start
+                cur_start, cur_end = start, end
+            else:
+                cur_end = max(cur_end, end)
+        if cur_end is not None:
+            covered += cur_end - cur_start
+
+        phases = {p: sum(e[p] for e in events)
+                  for p in ("throttle", "connect", "tls", "wait", "download", "decode", "total")}
+        by_name = {}
+        for e in events:
+            entry = by_name.setdefault(e["name"], {"requests": 0, "seconds": 0.0, "wireBytes": 0, "wireUnknown": 0,
+                                                   "decodedBytes": 0})
+            entry["requests"] += 1
+            entry["seconds"] += e["total"]
+            if e["wireBytes"] is None:
+                entry["wireUnknown"] += 1
+            else:
+                entry["wireBytes"] += e["wireBytes"]
+            entry["decodedBytes"] += e["decodedBytes"]
+        return {
+            "wallSeconds": wall,
+            "requestSeconds": covered,
+            "clientSeconds": max(0.0, wall - covered),
+            "requests": len(events),
+            "newConnections": sum(1 for e in events if not e["reused"] and e["status"] is not None),
+            "errors": sum(1 for e in events if e["error"] or (e["status"] or 0) >= 400),
+            "phases": phases,
+            "byName": by_name,
+        }
+
+    def summary(self):
+        """Human-readable multi-line summary."""
+        t = self.totals()
+        lines = [
+            f"Timings: {t['requests']} requests ({t['newConnections']} new connections, {t['errors']} failed) "
+            f"in {t['wallSeconds']:.3f}s wall; {t['requestSeconds']:.3f}s waiting on the network/server, "
+            f"{t['clientSeconds']:.3f}s in the script",
+        ]
+        labels = [("throttle", "rate limiter"), ("connect", "connect (DNS+TCP)"), ("tls", "TLS handshake"), ("wait", "server wait"),
+                  ("download", "download"), ("decode", "JSON decode")]
+        total = t["phases"]["total"] or 1.0
+        for key, label in labels:
+            seconds = t["phases"][key]
+            lines.append(f"  {label:20s} {seconds:8.3f}s  {seconds / total * 100:5.1f}%")
+        for name, e in sorted(t["byName"].items(), key=lambda kv: -kv[1]["seconds"]):
+            wire = f"{e['wireBytes'] / 1024:9.1f}" if e["wireUnknown"] < e["requests"] else f"{'?':>9s}"
+            lines.append(f"  {name:30s} {e['requests']:5d} req  {e['seconds']:8.3f}s  "
+                         f"{wire} KiB wire  {e['decodedBytes'] / 1024:9.1f} KiB decoded")
+        return "\n".join(lines)
+
+    def write_trace(self, path):
+        """Write the totals and every request event as JSON to `path`."""
+        with open(path, "w") as f:
+            json.dump({"startedAt": self._started_at, "summary": self.totals(), "events": list(self.events)}, f, indent=2)
+
+    def report(self, trace_path=None):
+        """Print the summary to stderr and, if given, write the JSON trace. Unregisters the hook."""
+        remove_request_hook(self.record)
+        print(self.summary(), file=sys.stderr)
+        if trace_path:
+            try:
+                self.write_trace(trace_path)
+                print(f"Timing trace written to {trace_path}", file=sys.stderr)
+            except OSError as e:
+                print(f"Warning: could not write timing trace {trace_path}: {e}", file=sys.stderr)
+
+
+class GraphQLClient:
+    """Pooled keep-alive HTTP client for one AssetServiceUrl.
+
+    Wraps a requests.Session with a connection pool sized for `pool_size`
+    concurrent requests. Safe to share between threads. Use get_client() to
+    obtain the shared instance instead of constructing one per query.
+    """
+
+    def __init__(self, base_url, verify_ssl=True, pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT):
+        self.base_url = base_url
+        self.verify_ssl = verify_ssl
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.verify = verify_ssl
+        adapter = _TimedAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def post(self, url, **kwargs):
+        """POST through the pooled session, applying the client timeout by default."""
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.post(url, **kwargs)
+
+    def get(self, url, **kwargs):
+        """GET through the pooled session, applying the client timeout by default."""
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.get(url, **kwargs)
+
+    def close(self):
+        """Close all pooled connections."""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+# Clients replaced by a larger pool; other threads may still be using them.
+_retired_clients = []
+
+_stats_lock = threading.Lock()
+_stats = {}
+
+
+def reset_transfer_stats():
+    """Zero the counters reported by transfer_stats()."""
+    with _stats_lock:
+        _stats.clear()
+        _stats.update(requests=0, wireBytes=0, wireUnknown=0, decodedBytes=0, decodeSeconds=0.0, encodings={})
+
+
+reset_transfer_stats()
+
+
+def transfer_stats():
+    """Return a snapshot of GraphQL response transfer counters for this process.
+
+    Keys: requests, wireBytes (compressed bytes received, for responses whose
+    transport counted them), wireUnknown (responses it did not), decodedBytes (JSON
+    text size after decompression), decodeSeconds (time spent parsing JSON),
+    encodings ({content coding: response count}), and jsonBackend.
+    """
+    with _stats_lock:
+        snapshot = dict(_stats, encodings=dict(_stats["encodings"]))
+    snapshot["jsonBackend"] = JSON_BACKEND
+    return snapshot
+
+
+def format_transfer_stats(stats=None):
+    """One-line human summary of transfer_stats()."""
+    stats = stats or transfer_stats()
+    wire, decoded, unknown = stats["wireBytes"], stats["decodedBytes"], stats["wireUnknown"]
+    if unknown and unknown >= stats["requests"]:
+        on_wire = "wire size unknown"
+    elif unknown:
+        on_wire = f"{wire / 1024:.1f} KiB on wire for {stats['requests'] - unknown} of them"
+    else:
+        on_wire = f"{wire / 1024:.1f} KiB on wire"
+    ratio = f", {decoded / wire:.1f}x" if wire and decoded > wire and not unknown else ""
+    encodings = ", ".join(f"{k} {v}" for k, v in sorted(stats["encodings"].items())) or "none"
+    return (f"{stats['requests']} responses, {on_wire}, "
+            f"{decoded / 1024:.1f} KiB decoded{ratio} (encoding: {encodings}); "
+            f"JSON decode {stats['decodeSeconds'] * 1000:.0f} ms ({stats['jsonBackend']})")
+
+
+def _wire_size(resp, content):
+    """Bytes read off the connection for a response (before decompression), or None if unknown.
+
+    urllib3 responses count them; other transport adapters may not.
+    """
+    try:
+        wire = resp.raw.tell()
+    except (AttributeError, OSError, ValueError):
+        return None
+    return wire if wire or not content else None
+
+
+def _decode_json(resp):
+    """Decode a response body with the fast JSON backend and record transfer stats."""
+    content = resp.content
+    wire = _wire_size(resp, content)
+    start = time.perf_counter()
+    try:
+        return _json_loads(content)
+    finally:
+        elapsed = time.perf_counter() - start
+        encoding = resp.headers.get("Content-Encoding", "identity").lower()
+        record = getattr(_trace, "record", None)
+        if record is not None:
+            record.update(decode=elapsed, wireBytes=wire, decodedBytes=len(content), encoding=encoding)
+        with _stats_lock:
+            _stats["requests"] += 1
+            if wire is None:
+                _stats["wireUnknown"] += 1
+            else:
+                _stats["wireBytes"] += wire
+            _stats["decodedBytes"] += len(content)
+            _stats["decodeSeconds"] += elapsed
+            _stats["encodings"][encoding] = _stats["encodings"].get(encoding, 0) + 1
+
+
+def _client_key(url, verify_ssl):
+    """Key pooled clients by scheme://host[:port] and TLS verification setting."""
+    parts = urlsplit(url)
+    return (f"{parts.scheme}://{parts.netloc}".lower(), bool(verify_ssl))
+
+
+def get_client(url, verify_ssl=True, pool_size=None):
+    """Return the shared GraphQLClient for the host of `url`, creating it on first use.
+
+    Args:
+        url: Any URL on the target host (e.g. the GraphQL endpoint).
+        verify_ssl: TLS verification setting; clients are pooled separately per setting.
+        pool_size: Maximum keep-alive connections. If larger than the existing
+                   client's pool, a larger client replaces it for new callers. The
+                   old one stays open for threads still using it and is closed
+                   by close_clients().
+    """
+    key = _client_key(url, verify_ssl)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is not None and pool_size and pool_size > client.pool_size:
+            _retired_clients.append(client)
+            client = None
+        if client is None:
+            client = GraphQLClient(key[0], verify_ssl=verify_ssl, pool_size=pool_size or DEFAULT_POOL_SIZE)
+            _clients[key] = client
+        return client
+
+
+def close_clients():
+    """Close and forget all pooled clients. Registered to run at interpreter exit."""
+    with _clients_lock:
+        for client in list(_clients.values()) + _retired_clients:
+            client.close()
+        _clients.clear()
+        _retired_clients.clear()
+
+
+atexit.register(close_clients)
+
+
+def ensure_pool_size(context, pool_size, tenant_override=None, verify_ssl=True):
+    """Make sure the pooled client for the context's endpoint keeps `pool_size` connections.
+
+    Call before fanning out `pool_size` concurrent requests from worker threads.
     """
     url = get_graphql_url(context, tenant_override)
+    get_client(url, _resolve_verify_ssl(url, verify_ssl), pool_size=pool_size)
+
 
-    # Auto-disable SSL verification for localhost (self-signed certs)
+def _resolve_verify_ssl(url, verify_ssl):
+    """Auto-disable SSL verification for localhost (self-signed certs)."""
     if verify_ssl and ("://localhost" in url or "://127.0.0.1" in url):
         verify_ssl = False
 
     if not verify_ssl:
         import urllib3
         urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+    return verify_ssl
+
 
-    token = get_token(context)
+def _post_graphql(context, payload, tenant_override=None, verify_ssl=True):
+    """POST a GraphQL payload (one request dict or a batch list) and return the decoded body.
+
+    An expiring access token is refreshed before sending, and a 401 triggers one
+    refresh-and-resend. Transient failures are retried per the active RetryPolicy;
+    connection and HTTP failures that persist raise TransportError, and rejected
+    or missing tokens raise AuthError. HTTP 400 responses that carry GraphQL
+    errors are returned as the body.
+    """
+    url = get_graphql_url(context, tenant_override)
+    verify_ssl = _resolve_verify_ssl(url, verify_ssl)
+
+    token = get_token(context, verify_ssl)
     headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+    client = get_client(url, verify_ssl)
+    policy = _retry_policy
+    data = json.dumps(payload).encode("utf-8")
+    name = _query_name(payload)
+
+    refreshed = False
+    attempt = 0
+    while True:
+        attempt += 1
+        retry_after = None
+        record = _start_trace(name, url, attempt, len(data))
+        try:
+            resp = _governed_post(client, url, data=data, headers=headers, timeout=policy.timeout)
+        except requests.ConnectionError as e:
+            _finish_trace(record, "connection error")
+            if "SSL" in str(e) or "CERTIFICATE_VERIFY_FAILED" in str(e):
+                raise TransportError(f"SSL certificate verification failed for {url}",
+                                     "For local development with self-signed certs, use --insecure.",
+                                     url=url, attempts=attempt) from e
+            error = TransportError(f"cannot connect to {url}",
+                                   "Check your network and that the AssetServiceUrl is correct in the active context.",
+                                   url=url, attempts=attempt)
+            if not policy.retry_connection_errors:
+                raise error from e
+            reason = "connection error"
+        except requests.Timeout as e:
+            _finish_trace(record, "timeout")
+            error = TransportError(f"request to {url} timed out.", url=url, attempts=attempt)
+            if not policy.retry_connection_errors:
+                raise error from e
+            reason = "timeout"
+        else:
+            _note_response(record, resp)
+            if resp.status_code == 401 and not refreshed:
+                # Token expired or revoked early: refresh once and resend.
+                refreshed = True
+                if refresh_token(context, stale_token=token, verify_ssl=verify_ssl):
+                    token = context["Authentication"]["AccessToken"]
+                    headers["Authorization"] = f"Bearer {token}"
+                    _finish_trace(record)
+                    continue
+            if resp.status_code not in policy.retry_statuses:
+                break
+            _finish_trace(record)
+            error = TransportError(f"HTTP {resp.status_code} from {url}", resp.text[:500],
+                                   url=url, status=resp.status_code, attempts=attempt)
+            retry_after = resp.headers.get("Retry-After")
+            reason = f"HTTP {resp.status_code}"
+
+        if attempt >= policy.max_attempts:
+            raise error
+        delay = policy.delay(attempt, retry_after)
+        print(f"Warning: {reason} from GraphQL endpoint, retrying in {delay:.1f}s "
+              f"(attempt {attempt + 1}/{policy.max_attempts})...", file=sys.stderr)
+        time.sleep(delay)
+
+    try:
+        if resp.status_code in (401, 403):
+            raise AuthError(f"authentication failed (HTTP {resp.status_code}).",
+                            "Your token may have expired. Run 'octo-cli -c LogIn -i' to re-authenticate.",
+                            status=resp.status_code)
+
+        if resp.status_code == 400:
+            try:
+                body = _decode_json(resp)
+            except ValueError:
+                body = None
+            if isinstance(body, dict) and body.get("errors"):
+                return body
+
+        if resp.status_code != 200:
+            raise TransportError(f"HTTP {resp.status_code} from {url}", resp.text[:500],
+                                 url=url, status=resp.status_code, attempts=attempt)
+
+        return _decode_json(resp)
+    finally:
+        _finish_trace(record)
+
+
+def graphql_execute(context, query, variables=None, tenant_override=None, verify_ssl=True):
+    """Execute a GraphQL query and return the full response body ({"data", "errors"}).
+
+    Connection and HTTP failures raise TransportError after retries, and auth
+    failures raise AuthError, like graphql_query(). GraphQL-level errors
+    (including validation errors the server reports with HTTP 400) are returned
+    to the caller instead, so it can fall back when, for example, the server
+    version does not support an argument.
+
+    Args:
+        verify_ssl: If False, skip TLS certificate verification (for local dev
+                    with self-signed certs). Also automatically disabled for
+                    localhost URLs.
+    """
+    if query in _persisted_hashes and _persisted_queries_enabled:
+        return _execute_persisted(context, query, variables, tenant_override, verify_ssl)
     payload = {"query": query}
     if variables:
         payload["variables"] = variables
+    return _post_graphql(context, payload, tenant_override=tenant_override, verify_ssl=verify_ssl)
 
-    try:
-        resp = requests.post(url, json=payload, headers=headers, timeout=30, verify=verify_ssl)
-    except requests.ConnectionError as e:
-        if "SSL" in str(e) or "CERTIFICATE_VERIFY_FAILED" in str(e):
-            print(f"Error: SSL certificate verification failed for {url}", file=sys.stderr)
-            print("For local development with self-signed certs, use --insecure.", file=sys.stderr)
-        else:
-            print(f"Error: cannot connect to {url}", file=sys.stderr)
-            print("Check your network and that the AssetServiceUrl is correct in the active context.", file=sys.stderr)
-        sys.exit(1)
-    except requests.Timeout:
-        print(f"Error: request to {url} timed out.", file=sys.stderr)
-        sys.exit(1)
-
-    if resp.status_code in (401, 403):
-        print(f"Error: authentication failed (HTTP {resp.status_code}).", file=sys.stderr)
-        print("Your token may have expired. Run 'octo-cli -c LogIn -i' to re-authenticate.", file=sys.stderr)
-        sys.exit(1)
-
-    if resp.status_code != 200:
-        print(f"Error: HTTP {resp.status_code} from {url}", file=sys.stderr)
-        print(resp.text[:500], file=sys.stderr)
-        sys.exit(1)
-
-    body = resp.json()
+
+def graphql_query(context, query, variables=None, tenant_override=None, verify_ssl=True):
+    """Execute a GraphQL query and return the 'data' dict.
+
+    Transient HTTP and connection errors are retried (see RetryPolicy); persistent
+    ones raise TransportError, auth failures raise AuthError, and GraphQL errors
+    without data raise GraphQLError. Errors that come with partial data are
+    printed to stderr as warnings and the data is returned. Requests go through the
+    shared pooled client for the AssetServiceUrl (see get_client()).
+
+    Args:
+        verify_ssl: If False, skip TLS certificate verification (for local dev
+                    with self-signed certs). Also automatically disabled for
+                    localhost URLs.
+    """
+    body = graphql_execute(context, query, variables=variables, tenant_override=tenant_override, verify_ssl=verify_ssl)
     if "errors" in body:
-        for err in body["errors"]:
-            print(f"GraphQL error: {err.get('message', err)}", file=sys.stderr)
         if "data" not in body or body["data"] is None:
-            sys.exit(1)
+            raise GraphQLError(body["errors"], body.get("data"))
+        for err in body["errors"]:
+            print(f"GraphQL error: {_error_message(err)}", file=sys.stderr)
 
     return body["data"]
 
 
+# ---------------------------------------------------------------------------
+# Automatic persisted queries
+# ---------------------------------------------------------------------------
+
+# Where endpoints that do not support persisted queries are remembered.
+APQ_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "octo-claude-skills", "apq.json")
+
+# Seconds an endpoint stays marked as not supporting persisted queries.
+APQ_UNSUPPORTED_TTL = 24 * 3600
+
+_persisted_hashes = {}
+_persisted_documents = {}
+_persisted_queries_enabled = True
+_apq_lock = threading.Lock()
+_apq_registered = set()
+_apq_unsupported = None
+
+
+def register_persisted_queries(namespace):
+    """Register the Q_* document strings of a module (pass globals()) for persisted queries.
+
+    graphql_execute() / graphql_query() send registered documents as their
+    SHA-256 hash (automatic persisted queries) and fall back to the full text
+    when the server does not know the hash yet. Other documents are sent as is.
+    """
+    for name, value in namespace.items():
+        if name.startswith("Q_") and isinstance(value, str):
+            digest = hashlib.sha256(value.encode("utf-8")).hexdigest()
+            _persisted_hashes[value] = digest
+            _persisted_documents[digest] = value
+
+
+def set_persisted_queries(enabled):
+    """Turn automatic persisted queries on or off for this process."""
+    global _persisted_queries_enabled
+    _persisted_queries_enabled = enabled
+
+
+def _load_apq_unsupported():
+    """Endpoints known not to support persisted queries: {endpoint: marked-at timestamp}."""
+    global _apq_unsupported
+    if _apq_unsupported is None:
+        try:
+            with open(APQ_CACHE_PATH) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        now = time.time()
+        _apq_unsupported = {k: v for k, v in (data.get("unsupported") or {}).items()
+                            if isinstance(v, (int, float)) and now - v < APQ_UNSUPPORTED_TTL}
+    return _apq_unsupported
+
+
+def _mark_apq_unsupported(endpoint):
+    with _apq_lock:
+        unsupported = _load_apq_unsupported()
+        unsupported[endpoint] = time.time()
+        try:
+            os.makedirs(os.path.dirname(APQ_CACHE_PATH), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(APQ_CACHE_PATH), suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump({"unsupported": unsupported}, f)
+            os.replace(tmp_path, APQ_CACHE_PATH)
+        except OSError:
+            pass
+
+
+# Error codes / messages with which servers reject persisted-query requests.
+_APQ_ERRORS = ("persistedquerynotfound", "persistedquerynotsupported", "persistedqueriesnotsupported")
+
+
+def _failed_without_data(body):
+    """True if a response body carries GraphQL errors and no data."""
+    return isinstance(body, dict) and body.get("data") is None and bool(body.get("errors"))
+
+
+def _apq_error(body):
+    """True if a response is an explicit persisted-query error.
+
+    On a hash-only request this tells a server that speaks the protocol apart
+    from one that ignores it; on a request that included the query text it
+    means the text was still refused. Any other error (validation, an unknown
+    type, ...) is an answer to the query itself.
+    """
+    if not _failed_without_data(body):
+        return False
+    for err in body["errors"]:
+        code = ((err.get("extensions") or {}).get("code") or "") if isinstance(err, dict) else ""
+        text = f"{_error_message(err)} {code}".lower().replace("_", "")
+        if any(marker in text for marker in _APQ_ERRORS):
+            return True
+    return False
+
+
+def _execute_persisted(context, query, variables, tenant_override, verify_ssl):
+    """Send a registered document by hash, registering it with its full text on a miss.
+
+    A hash-only request carries no query text, so any error without data is
+    treated as a miss and the full text is resent with the hash. A server with
+    persisted-query support reports a miss as PersistedQueryNotFound; one that
+    answers with any other error and then runs the full text does not support
+    persisted queries. Such endpoints, and those that refuse the full text too
+    or need it again for a hash they already accepted, are remembered (on disk,
+    for APQ_UNSUPPORTED_TTL) and get plain requests from then on, so later runs
+    send each query once.
+    """
+    endpoint = get_graphql_url(context, tenant_override).lower()
+    digest = _persisted_hashes[query]
+    payload = {"query": query}
+    if variables:
+        payload["variables"] = variables
+    with _apq_lock:
+        unsupported = endpoint in _load_apq_unsupported()
+    if unsupported:
+        return _post_graphql(context, payload, tenant_override=tenant_override, verify_ssl=verify_ssl)
+
+    extensions = {"persistedQuery": {"version": 1, "sha256Hash": digest}}
+    hashed = {"extensions": extensions}
+    if variables:
+        hashed["variables"] = variables
+    body = _post_graphql(context, hashed, tenant_override=tenant_override, verify_ssl=verify_ssl)
+    if not _failed_without_data(body):
+        return body
+    understood = _apq_error(body)
+
+    body = _post_graphql(context, dict(payload, extensions=extensions),
+                         tenant_override=tenant_override, verify_ssl=verify_ssl)
+    if not _apq_error(body):
+        ran = body.get("data") is not None
+        if ran and (not understood or (endpoint, digest) in _apq_registered):
+            # The server ignores the hash (it never said PersistedQueryNotFound)
+            # or runs the text without keeping it: stop sending hashes.
+            _mark_apq_unsupported(endpoint)
+        else:
+            _apq_registered.add((endpoint, digest))
+        return body
+
+    # Even the full text is refused as a persisted query: fall back to plain requests for good.
+    _mark_apq_unsupported(endpoint)
+    return _post_graphql(context, payload, tenant_override=tenant_override, verify_ssl=verify_ssl)
+
+
+def write_ndjson(obj, stream=None):
+    """Write `obj` as one compact JSON line (NDJSON) to `stream` (default: stdout)."""
+    stream = stream or sys.stdout
+    stream.write(json.dumps(obj, separators=(",", ":")))
+    stream.write("\n")
+
+
 def collect_connection(connection):
     """Extract node list from a Relay-style connection (edges[].node).
 
@@ -141,3 +1521,447 @@ def collect_connection(connection):
     if not connection or "edges" not in connection:
         return []
     return [edge["node"] for edge in connection["edges"] if edge.get("node")]
+
+
+def iter_connection_pages(context, query, variables, path, tenant_override=None, verify_ssl=True,
+                          page_size=DEFAULT_PAGE_SIZE, max_items=None, after=None, count_nodes=None):
+    """Walk a Relay-style connection by following pageInfo.endCursor.
+
+    The query must accept $first and $after and select pageInfo { hasNextPage endCursor }.
+    `path` is the key path from 'data' to the connection, e.g. ("runtime", "runtimeEntities").
+    Yields each page's connection dict as soon as it arrives, so callers can process
+    nodes without holding the whole result set. Stops after `max_items` nodes if given.
+    Yields nothing if the connection resolves to null (e.g. abstract or unknown type).
+    `count_nodes(page)` counts the nodes of a page for connections without edges
+    (e.g. transientQuery rows); it defaults to the number of edges.
+    """
+    variables = dict(variables or {})
+    cursor = after
+    fetched = 0
+    while True:
+        first = page_size if max_items is None else min(page_size, max_items - fetched)
+        if first <= 0:
+            return
+        variables["first"] = first
+        if cursor:
+            variables["after"] = cursor
+        else:
+            variables.pop("after", None)
+
+        data = graphql_query(context, query, variables=variables, tenant_override=tenant_override, verify_ssl=verify_ssl)
+        conn = data
+        for key in path:
+            conn = (conn or {}).get(key)
+        if conn is None:
+            return
+        yield conn
+
+        count = count_nodes(conn) if count_nodes else len(conn.get("edges") or [])
+        fetched += count
+        page = conn.get("pageInfo") or {}
+        cursor = page.get("endCursor")
+        if not count or not page.get("hasNextPage") or not cursor:
+            return
+
+
+def _offset_cursor_encoder(cursor, consumed):
+    """Return a function offset -> cursor if `cursor` is an encoded offset, else None.
+
+    Recognizes base64-encoded integers, optionally prefixed (e.g. 'arrayconnection:49'),
+    whose value is either the index of the last item returned (consumed - 1) or the
+    number of items consumed. Opaque cursors return None.
+    """
+    try:
+        text = base64.b64decode(cursor, validate=True).decode("ascii")
+    except (ValueError, UnicodeDecodeError):
+        return None
+    m = re.fullmatch(r"(\D*)(\d+)", text)
+    if not m:
+        return None
+    prefix, value = m.group(1), int(m.group(2))
+    if value == consumed - 1:
+        shift = -1
+    elif value == consumed:
+        shift = 0
+    else:
+        return None
+    return lambda offset: base64.b64encode(f"{prefix}{offset + shift}".encode("ascii")).decode("ascii")
+
+
+def fetch_all_pages(context, query, variables, path, tenant_override=None, verify_ssl=True,
+                    page_size=DEFAULT_PAGE_SIZE, max_items=None, max_workers=DEFAULT_PARALLEL_PAGES):
+    """Fetch every page of a connection and return the page dicts in order.
+
+    Same query contract as iter_connection_pages(); the query should also select
+    totalCount. After the first page, if its endCursor turns out to be an encoded
+    offset, the remaining pages are requested concurrently (up to `max_workers` at
+    a time) with computed cursors. Otherwise the cursor is walked sequentially.
+    Returns [] if the connection resolves to null; raises OctoError if a later
+    parallel page does, instead of returning a result with a gap.
+    """
+    pages = iter_connection_pages(context, query, variables, path, tenant_override=tenant_override,
+                                  verify_ssl=verify_ssl, page_size=page_size, max_items=max_items)
+    first_page = next(pages, None)
+    if first_page is None:
+        return []
+
+    consumed = len(first_page.get("edges") or [])
+    info = first_page.get("pageInfo") or {}
+    total = first_page.get("totalCount")
+    encode = None
+    if info.get("hasNextPage") and info.get("endCursor") and isinstance(total, int) and max_workers > 1:
+        encode = _offset_cursor_encoder(info["endCursor"], consumed)
+    if encode is None:
+        return [first_page] + list(pages)
+    pages.close()
+
+    if max_items is not None:
+        total = min(total, max_items)
+
+    # Stride by what the server actually returned, in case it caps `first`.
+    stride = consumed
+
+    def fetch(offset):
+        page_vars = dict(variables or {})
+        page_vars["first"] = min(stride, total - offset)
+        page_vars["after"] = encode(offset)
+        data = graphql_query(context, query, variables=page_vars, tenant_override=tenant_override, verify_ssl=verify_ssl)
+        conn = data
+        for key in path:
+            conn = (conn or {}).get(key)
+        if conn is None:
+            raise OctoError(f"{'.'.join(path)} returned no page at offset {offset} of {total}; "
+                            "the result would be incomplete.")
+        return conn
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        rest = list(pool.map(fetch, range(consumed, total, stride)))
+    return [first_page] + rest
+
+
+# Default number of documents merged into one HTTP request by graphql_batch().
+DEFAULT_BATCH_SIZE = 50
+
+_NAME_RE = re.compile(r"[_A-Za-z][_0-9A-Za-z]*")
+
+
+def _skip_ignored(doc, i):
+    """Advance past whitespace, commas, and # comments."""
+    n = len(doc)
+    while i < n:
+        c = doc[i]
+        if c in " \t\r\n,\ufeff":
+            i += 1
+        elif c == "#":
+            while i < n and doc[i] not in "\r\n":
+                i += 1
+        else:
+            break
+    return i
+
+
+def _skip_string(doc, i):
+    """Return the index just past the string literal starting at doc[i]."""
+    if doc.startswith('"""', i):
+        end = doc.find('"""', i + 3)
+        while end != -1 and doc[end - 1] == "\\":
+            end = doc.find('"""', end + 1)
+        return len(doc) if end == -1 else end + 3
+    i += 1
+    while i < len(doc) and doc[i] != '"':
+        i += 2 if doc[i] == "\\" else 1
+    return i + 1
+
+
+def _alias_document(query, prefix):
+    """Rewrite one query document for merging into an aliased batch document.
+
+    Every $variable is renamed to $<prefix><name> and every top-level field gets
+    (or has its alias replaced by) an alias starting with `prefix`.
+    Returns (variable definitions text, top-level selections text).
+    Raises ValueError for documents this rewriter does not handle (mutations,
+    subscriptions, fragments, multiple operations).
+    """
+    out = []
+    defs_start = defs_end = body_start = None
+    brace = paren = 0
+    prev = ""
+    i = _skip_ignored(query, 0)
+    m = _NAME_RE.match(query, i)
+    if m and m.group(0) != "query":
+        raise ValueError(f"only query operations can be batched, got '{m.group(0)}'")
+
+    n = len(query)
+    while i < n:
+        c = query[i]
+        if c in " \t\r\n,\ufeff#":
+            j = _skip_ignored(query, i)
+            out.append(query[i:j])
+            i = j
+            continue
+        if c == '"':
+            j = _skip_string(query, i)
+            out.append(query[i:j])
+            i = j
+            prev = '"'
+            continue
+        if c == "$":
+            m = _NAME_RE.match(query, i + 1)
+            if not m:
+                raise ValueError("malformed variable reference")
+            out.append(f"${prefix}{m.group(0)}")
+            i = m.end()
+            prev = "$"
+            continue
+        if c == "(":
+            paren += 1
+            if brace == 0 and defs_start is None:
+                defs_start = len(out) + 1
+        elif c == ")":
+            paren -= 1
+            if brace == 0 and paren == 0 and defs_end is None:
+                defs_end = len(out)
+        elif c == "{":
+            brace += 1
+            if brace == 1 and paren == 0:
+                if body_start is not None:
+                    raise ValueError("documents with multiple operations cannot be batched")
+                body_start = len(out) + 1
+            out.append(c)
+            i += 1
+            prev = c
+            continue
+        elif c == "}":
+            brace -= 1
+            if brace == 0 and paren == 0:
+                body_end = len(out)
+                out.append(c)
+                i += 1
+                if query[_skip_ignored(query, i):].strip():
+                    raise ValueError("documents with fragments or multiple operations cannot be batched")
+                break
+        elif c == "." and brace == 1 and paren == 0:
+            raise ValueError("top-level fragment spreads cannot be batched")
+        elif brace == 1 and paren == 0:
+            m = _NAME_RE.match(query, i)
+            if m:
+                # A top-level name is a directive after '@', the field name after
+                # an alias ':', and otherwise starts a new selection (alias or field).
+                name = m.group(0)
+                j = _skip_ignored(query, m.end())
+                if prev in ("@", ":"):
+                    out.append(name)
+                elif j < n and query[j] == ":":
+                    out.append(f"{prefix}{name}")
+                else:
+                    out.append(f"{prefix}{name}: {name}")
+                i = m.end()
+                prev = name
+                continue
+        out.append(c)
+        i += 1
+        prev = c
+    else:
+        raise ValueError("unbalanced braces in query document")
+
+    if body_start is None:
+        raise ValueError("query document has no selection set")
+    defs = "".join(out[defs_start:defs_end]) if defs_start is not None and defs_start <= body_start else ""
+    body = "".join(out[body_start:body_end])
+    return defs.strip(), body.strip()
+
+
+def _split_aliased(body, count, prefixes):
+    """Split a merged batch response back into one {"data", "errors"} dict per item."""
+    data = body.get("data") or {}
+    results = [{"data": {}, "errors": []} for _ in range(count)]
+    for key, value in data.items():
+        for idx, prefix in enumerate(prefixes):
+            if key.startswith(prefix):
+                results[idx]["data"][key[len(prefix):]] = value
+                break
+    for err in body.get("errors") or []:
+        path = err.get("path") or []
+        for idx, prefix in enumerate(prefixes):
+            if path and isinstance(path[0], str) and path[0].startswith(prefix):
+                results[idx]["errors"].append(dict(err, path=[path[0][len(prefix):]] + list(path[1:])))
+                break
+    for result in results:
+        if not result["data"]:
+            result["data"] = None
+    return results
+
+
+def _execute_aliased(context, items, tenant_override, verify_ssl):
+    """Run items as one merged, aliased document. Returns per-item results, or None
+    if the merged document failed as a whole (e.g. a validation error in one item)."""
+    prefixes = [f"b{idx}_" for idx in range(len(items))]
+    defs, bodies, variables = [], [], {}
+    for (query, item_vars), prefix in zip(items, prefixes):
+        item_defs, item_body = _alias_document(query, prefix)
+        if item_defs:
+            defs.append(item_defs)
+        bodies.append(item_body)
+        for name, value in (item_vars or {}).items():
+            variables[f"{prefix}{name}"] = value
+
+    header = f"query({', '.join(defs)})" if defs else "query"
+    document = header + " {\n" + "\n".join(bodies) + "\n}"
+    payload = {"query": document}
+    if variables:
+        payload["variables"] = variables
+    body = _post_graphql(context, payload, tenant_override=tenant_override, verify_ssl=verify_ssl)
+    if not isinstance(body, dict):
+        return None
+    if body.get("errors") and any(not err.get("path") for err in body["errors"]):
+        return None
+    return _split_aliased(body, len(items), prefixes)
+
+
+# HTTP statuses with which servers refuse a batch array they cannot parse or route.
+_ARRAY_REJECTED_STATUSES = (400, 404, 405, 415, 422, 500, 501)
+
+# {endpoint: whether its first batch array was answered with an array}, for this process.
+_array_batching = {}
+
+
+def _execute_array(context, items, tenant_override, verify_ssl):
+    """Run items as a GraphQL batch array. Returns None if the server does not support it.
+
+    Servers without batching answer with a GraphQL error or refuse the array
+    with an HTTP error such as 400 or 501; either way the first attempt per
+    endpoint decides, and endpoints that refused it are not sent arrays again.
+    """
+    endpoint = get_graphql_url(context, tenant_override).lower()
+    if _array_batching.get(endpoint) is False:
+        return None
+    payload = []
+    for query, item_vars in items:
+        entry = {"query": query}
+        if item_vars:
+            entry["variables"] = item_vars
+        payload.append(entry)
+    try:
+        body = _post_graphql(context, payload, tenant_override=tenant_override, verify_ssl=verify_ssl)
+    except TransportError as e:
+        if endpoint in _array_batching or e.status not in _ARRAY_REJECTED_STATUSES:
+            raise
+        body = None
+    supported = isinstance(body, list) and len(body) == len(items)
+    _array_batching.setdefault(endpoint, supported)
+    if not supported:
+        return None
+    return [{"data": r.get("data"), "errors": r.get("errors") or []} for r in body]
+
+
+def graphql_batch(context, requests_list, tenant_override=None, verify_ssl=True,
+                  mode="alias", batch_size=DEFAULT_BATCH_SIZE):
+    """Execute many (query, variables) pairs in as few round trips as possible.
+
+    Returns one {"data": ..., "errors": [...]} dict per request, in input order.
+    GraphQL errors are reported per item instead of raising; transport and auth
+    failures raise TransportError / AuthError like graphql_query().
+
+    Modes:
+        "alias": merge up to `batch_size` query documents into one document, renaming
+                 variables and aliasing top-level fields per item. Works with any
+                 GraphQL server.
+        "array": send a JSON array of requests (GraphQL batching); falls back to
+                 "alias" if the server does not answer with an array or refuses
+                 it with an HTTP error, and stays on "alias" for that endpoint.
+    If a merged request fails as a whole (e.g. one item does not validate), its
+    items are re-run one by one so each gets its own result.
+    """
+    items = [(q, v) for q, v in requests_list]
+    results = []
+    for start in range(0, len(items), batch_size):
+        chunk = items[start:start + batch_size]
+        chunk_results = None
+        if mode == "array":
+            chunk_results = _execute_array(context, chunk, tenant_override, verify_ssl)
+        if chunk_results is None:
+            try:
+                chunk_results = _execute_aliased(context, chunk, tenant_override, verify_ssl)
+            except ValueError:
+                chunk_results = None
+        if chunk_results is None:
+            chunk_results = []
+            for query, item_vars in chunk:
+                body = graphql_execute(context, query, variables=item_vars,
+                                       tenant_override=tenant_override, verify_ssl=verify_ssl)
+                chunk_results.append({"data": body.get("data"), "errors": body.get("errors") or []})
+        results.extend(chunk_results)
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Asyncio client
+# ---------------------------------------------------------------------------
+
+# Default number of queries an AsyncGraphQLClient keeps in flight at once.
+DEFAULT_ASYNC_CONCURRENCY = 16
+
+
+class AsyncGraphQLClient:
+    """Asyncio front end for graphql_execute() / graphql_query().
+
+    Each call runs the synchronous query on a private thread pool of
+    `max_concurrency` workers, over the shared pooled HTTP client (sized to
+    match), and an asyncio.Semaphore bounds how many calls are in flight.
+    Context, token, and tenant-override handling are those of graphql_query();
+    `tenant_override` on a call takes precedence over the client's default.
+
+    Usage:
+        async with AsyncGraphQLClient(context, max_concurrency=20) as client:
+            results = await client.gather([(Q_COUNT, {"ckId": c}) for c in ck_ids])
+    """
+
+    def __init__(self, context, tenant_override=None, verify_ssl=True,
+                 max_concurrency=DEFAULT_ASYNC_CONCURRENCY):
+        self.context = context
+        self.tenant_override = tenant_override
+        self.verify_ssl = verify_ssl
+        self.max_concurrency = max_concurrency
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        self._semaphore = None
+        self._sized = set()
+
+    def _limiter(self):
+        # Created lazily so the semaphore binds to the running event loop.
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def _run(self, func, query, variables, tenant_override):
+        tenant = tenant_override or self.tenant_override
+        if tenant not in self._sized:
+            ensure_pool_size(self.context, self.max_concurrency, tenant_override=tenant, verify_ssl=self.verify_ssl)
+            self._sized.add(tenant)
+        async with self._limiter():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor,
+                lambda: func(self.context, query, variables=variables,
+                             tenant_override=tenant, verify_ssl=self.verify_ssl))
+
+    async def execute(self, query, variables=None, tenant_override=None):
+        """Async graphql_execute(): return the full response body ({"data", "errors"})."""
+        return await self._run(graphql_execute, query, variables, tenant_override)
+
+    async def query(self, query, variables=None, tenant_override=None):
+        """Async graphql_query(): return the 'data' dict, raising OctoError subclasses like the sync call."""
+        return await self._run(graphql_query, query, variables, tenant_override)
+
+    async def gather(self, requests_list, tenant_override=None):
+        """Execute (query, variables) pairs concurrently; return their bodies in order."""
+        return await asyncio.gather(*(self.execute(q, v, tenant_override) for q, v in requests_list))
+
+    def close(self):
+        """Shut down the worker threads. Pooled HTTP connections stay shared."""
+        self._executor.shutdown(wait=False)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
@@ -0,0 +1,150 @@
+"""Shared --profile support for the OctoMesh scripts.
+
+Each script records _IMPORT_START = time.perf_counter() before its other imports,
+lists the flag in its --help with add_flag(parser), and runs its main() through
+run(). If the command line contains --profile, --profile=FILE or
+--profile FILE.prof, the flag is removed from sys.argv, main() runs under
+cProfile, and a wall-clock breakdown plus the top hotspots are printed to
+stderr. With a FILE, the raw profile is also saved for snakeviz / pstats.
+
+This module deliberately imports only the standard library, so profiling a
+script does not change which third-party packages it loads.
+"""
+import cProfile
+import os
+import pstats
+import sys
+import time
+
+# Number of functions listed in the hotspot table.
+TOP_N = 15
+
+# (category, substrings matched against a function's file path or builtin name), first match wins.
+CATEGORIES = [
+    ("yaml", ("/yaml/", "_yaml")),
+    ("jsonschema", ("/jsonschema/", "/referencing/", "/rpds/", "/jsonschema_specifications/")),
+    ("network", ("/requests/", "/urllib3/", "/http/client.py", "socket", "_ssl.", "/ssl.py",
+                 "/selectors.py", "/idna/", "/certifi/", "/charset_normalizer/")),
+    ("json", ("/json/", "orjson", "ujson")),
+    ("subprocess (octo-cli)", ("/subprocess.py", "posix.waitpid", "_posixsubprocess")),
+    ("waiting on worker threads", ("_thread.lock", "/threading.py", "/concurrent/futures/")),
+    ("imports", ("<frozen importlib", "/importlib/")),
+    ("regex", ("/re/", "/sre_", "re.Pattern")),
+    ("argument parsing", ("/argparse.py",)),
+]
+
+_SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _parse_flag(argv):
+    """Remove --profile[=FILE] / --profile FILE.prof from argv; return (enabled, path or None).
+
+    A separate argument is only taken as the file when it ends in .prof, so
+    "--profile count X" still profiles the count command.
+    """
+    enabled, path, rest = False, None, []
+    args = iter(argv)
+    for arg in args:
+        if arg == "--profile":
+            enabled = True
+            following = next(args, None)
+            if following is not None and following.endswith(".prof"):
+                path = following
+            elif following is not None:
+                rest.append(following)
+        elif arg.startswith("--profile="):
+            enabled, path = True, arg.split("=", 1)[1] or None
+        else:
+            rest.append(arg)
+    argv[:] = rest
+    return enabled, path
+
+
+def _category(filename, funcname):
+    """Map a profiled function to a breakdown category."""
+    where = filename if filename != "~" else funcname
+    where = where.replace("\\", "/")
+    for name, needles in CATEGORIES:
+        if any(n in where for n in needles):
+            return name
+    if where.startswith(_SCRIPTS_DIR.replace("\\", "/")):
+        return "scripts (logic, formatting, output)"
+    if filename == "~" and ("write" in funcname or "print" in funcname):
+        return "scripts (logic, formatting, output)"
+    return "other"
+
+
+def _location(filename, line, funcname):
+    if filename == "~":
+        return funcname
+    path = filename
+    for marker in ("site-packages" + os.sep, "lib" + os.sep + "python"):
+        if marker in path:
+            path = path.split(marker, 1)[1]
+            break
+    if path.startswith(_SCRIPTS_DIR):
+        path = os.path.relpath(path, _SCRIPTS_DIR)
+    return f"{path}:{line}({funcname})"
+
+
+def report(profiler, import_seconds, run_seconds, stream=None):
+    """Print the wall-clock breakdown and hotspot table for a finished profile."""
+    stream = stream or sys.stderr
+    stats = pstats.Stats(profiler).stats
+    profiled = sum(tt for (_, _, tt, _, _) in stats.values()) or 1e-9
+
+    by_category = {}
+    for (filename, _, funcname), (_, _, tt, _, _) in stats.items():
+        cat = _category(filename, funcname)
+        by_category[cat] = by_category.get(cat, 0.0) + tt
+
+    total = import_seconds + run_seconds
+    print(f"Profile: {total:.3f}s wall = imports {import_seconds:.3f}s + run {run_seconds:.3f}s", file=stream)
+    print("  Run time by category (main thread, self time):", file=stream)
+    for cat, seconds in sorted(by_category.items(), key=lambda kv: -kv[1]):
+        print(f"    {cat:36s} {seconds:8.3f}s  {seconds / profiled * 100:5.1f}%", file=stream)
+    if by_category.get("waiting on worker threads", 0.0) > 0.1 * profiled:
+        print("    (work done in worker threads is not profiled; use --timings for request phases)", file=stream)
+
+    print(f"  Top {TOP_N} functions by self time:", file=stream)
+    print(f"    {'calls':>9s} {'self':>9s} {'cumulative':>11s}  function", file=stream)
+    top = sorted(stats.items(), key=lambda kv: -kv[1][2])[:TOP_N]
+    for (filename, line, funcname), (_, ncalls, tt, ct, _) in top:
+        print(f"    {ncalls:9d} {tt:8.3f}s {ct:10.3f}s  {_location(filename, line, funcname)}", file=stream)
+
+
+def add_flag(parser):
+    """Document --profile [FILE.prof] in a script's --help.
+
+    run() removes the flag from sys.argv before the parser sees it, so this
+    only adds the help entry; it works in any position on the command line.
+    """
+    parser.add_argument("--profile", nargs="?", const=None, default=None, metavar="FILE.prof",
+                        help="Print a CPU profile and wall-clock breakdown (imports, network, JSON, "
+                             "formatting) to stderr; --profile FILE.prof or --profile=FILE also "
+                             "saves the raw cProfile data")
+
+
+def run(main, import_start=None):
+    """Run main(), profiling it if --profile[=FILE] is on the command line."""
+    enabled, path = _parse_flag(sys.argv)
+    if not enabled:
+        return main()
+
+    run_start = time.perf_counter()
+    import_seconds = run_start - import_start if import_start is not None else 0.0
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        return main()
+    finally:
+        profiler.disable()
+        run_seconds = time.perf_counter() - run_start
+        sys.stdout.flush()
+        report(profiler, import_seconds, run_seconds)
+        if path:
+            try:
+                profiler.dump_stats(path)
+                print(f"Profile written to {path} (open with snakeviz or python -m pstats)", file=sys.stderr)
+            except OSError as e:
+                print(f"Warning: could not write profile {path}: {e}", file=sys.stderr)
@@ -17,17 +17,17 @@ FIXTURES = os.path.join(SCRIPTS, "e2e_fixtures")
 RT_EXPLORER = os.path.join(SCRIPTS, "rt_explorer.py")
 
 sys.path.insert(0, SCRIPTS)
-from _octo_common import load_context, graphql_query, get_graphql_url, get_token
+from _octo_common import (
+    load_context, load_contexts, load_contexts_config, graphql_query,
+    OctoError, print_error,
+)
 
 
 def get_context_info():
     """Read the active context name, service URLs, and auth from ~/.octo-cli/contexts.json."""
-    import json as _json
-    path = os.path.join(os.path.expanduser("~"), ".octo-cli", "contexts.json")
-    with open(path) as f:
-        config = _json.load(f)
-    active_name = config.get("ActiveContext", "default")
-    active = config.get("Contexts", {}).get(active_name, {})
+    active_name, contexts = load_contexts()
+    active_name = active_name or "default"
+    active = contexts.get(active_name, {})
     opts = active.get("OctoToolOptions", {})
     auth = active.get("Authentication", {})
     return {
@@ -48,8 +48,7 @@ def create_e2e_context(context_name, tenant_id, source_ctx):
     """
     import json as _json
     path = os.path.join(os.path.expanduser("~"), ".octo-cli", "contexts.json")
-    with open(path) as f:
-        config = _json.load(f)
+    config = load_contexts_config()
 
     # Clone the source context's options with the new tenant ID
     source = config["Contexts"][source_ctx["active_context"]]
@@ -464,8 +463,7 @@ def _restore_context(original_context):
     import json as _json
     path = os.path.join(os.path.expanduser("~"), ".octo-cli", "contexts.json")
     try:
-        with open(path) as f:
-            config = _json.load(f)
+        config = load_contexts_config()
         config["ActiveContext"] = original_context
         with open(path, "w") as f:
             _json.dump(config, f, indent=2)
@@ -483,7 +481,11 @@ def main():
     print("=" * 60)
 
     # Check prerequisites
-    context = load_context()
+    try:
+        context = load_context()
+    except OctoError as e:
+        print_error(e)
+        sys.exit(e.exit_code)
     print(f"  Active context loaded")
 
     # Save original context name for restoration
@@ -506,7 +508,9 @@ def main():
         phase_4_import_seed_data(tenant_id)
         sensor_source = phase_5_create_sensors(tenant_id)
         passed, total = phase_6_query_and_assert(tenant_id)
-    except SystemExit:
+    except (SystemExit, OctoError) as e:
+        if isinstance(e, OctoError):
+            print_error(e)
         print()
         print("=" * 60)
         print(f"  E2E TEST FAILED \u2014 tenant '{tenant_id}' left for inspection")
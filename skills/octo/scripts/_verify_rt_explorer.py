@@ -3,6 +3,11 @@ import subprocess
 import sys
 import json
 import os
+import csv
+import shutil
+import signal
+import tempfile
+import time
 
 SCRIPTS = os.path.dirname(os.path.abspath(__file__))
 EXPLORER = os.path.join(SCRIPTS, "rt_explorer.py")
@@ -11,10 +16,10 @@ print("=== Verification: rt_explorer.py ===")
 print()
 
 
-def run(args, expect_fail=False):
+def run(args, expect_fail=False, stdin=None):
     result = subprocess.run(
         [sys.executable, EXPLORER] + args,
-        capture_output=True, text=True
+        capture_output=True, text=True, input=stdin
     )
     if expect_fail:
         return result
@@ -139,5 +144,216 @@ if r.returncode != 0:
 else:
     print("   OK — handled gracefully (no traceback)")
 
+# 10. get with several rtIds — bulk lookup reports the missing one
+print()
+print("10. 'get Industry.Basic/Machine <5 rtIds> 000000000000000000000000 --ndjson --batch-size 2'...")
+r = run(["list", "Industry.Basic/Machine", "--ndjson", "--first", "5"])
+sample_ids = [json.loads(l)["rtId"] for l in r.stdout.splitlines() if l.strip()]
+assert sample_ids, "No rtIds to look up"
+r = run(["get", "Industry.Basic/Machine"] + sample_ids + ["000000000000000000000000",
+         "--ndjson", "--batch-size", "2", "--parallel", "2"], expect_fail=True)
+assert "Traceback" not in r.stderr, "Got unexpected traceback"
+got = [json.loads(l)["rtId"] for l in r.stdout.splitlines() if l.strip()]
+assert sorted(got) == sorted(sample_ids), f"Expected {sample_ids}, got {got}"
+assert r.returncode == 1 and "000000000000000000000000" in r.stderr, "Missing rtId not reported"
+print(f"   OK — {len(got)} entities, missing rtId reported")
+
+r = run(["get", "Industry.Basic/Machine", "--ids-from", "-", "--json"], stdin="\n".join(sample_ids) + "\n")
+data = json.loads(r.stdout)
+assert sorted(e["rtId"] for e in data["entities"]) == sorted(sample_ids), "--ids-from - returned other entities"
+assert data["notFound"] == [] and data["invalid"] == [], "Unexpected notFound/invalid"
+print("   OK — --ids-from - resolves the same rtIds")
+
+r = run(["get", "Industry.Basic/Machine", sample_ids[0], "--parallel", "0"], expect_fail=True)
+assert r.returncode == 2 and "Traceback" not in r.stderr, "--parallel 0 should be a usage error"
+print("   OK — --parallel 0 rejected as a usage error")
+
+# 11. count several types — one row per type, failures reported per row
+print()
+print("11. 'count Industry.Basic/Machine NonExistent/Type --json'...")
+r = run(["count", "Industry.Basic/Machine", "NonExistent/Type", "--json"], expect_fail=True)
+assert "Traceback" not in r.stderr, "Got unexpected traceback"
+data = json.loads(r.stdout)
+rows = {row["ckId"]: row["totalCount"] for row in data["counts"]}
+assert rows.get("Industry.Basic/Machine") == count_val, f"Expected Machine count {count_val}, got {rows}"
+assert "NonExistent/Type" in rows, "Missing row for NonExistent/Type"
+if rows["NonExistent/Type"] is None:
+    assert r.returncode == 1, "A failed type should exit 1"
+print(f"   OK — {len(rows)} rows, total={data['total']}")
+
+print()
+print("12. 'count --model Industry.Basic --ndjson'...")
+r = run(["count", "--model", "Industry.Basic", "--ndjson"], expect_fail=True)
+assert "Traceback" not in r.stderr, "Got unexpected traceback"
+rows = {row["ckId"]: row["totalCount"] for row in map(json.loads, r.stdout.splitlines()) if row}
+assert rows.get("Industry.Basic/Machine") == count_val, f"Machine missing from model counts: {rows}"
+print(f"   OK — {len(rows)} concrete types counted")
+
+r = run(["count", "Industry.Basic/Machine", "--batch-size", "-1"], expect_fail=True)
+assert r.returncode == 2 and "Traceback" not in r.stderr, "--batch-size -1 should be a usage error"
+print("   OK — --batch-size -1 rejected as a usage error")
+
+# 13. query --format — all rows unless --max; CSV on stdout, Parquet to a file when pyarrow is installed
+print()
+print("13. 'query Industry.Basic/Machine --columns name,machineState --max 5 --format csv'...")
+r = run(["query", "Industry.Basic/Machine", "--columns", "name,machineState", "--max", "5", "--format", "csv"])
+table = list(csv.reader(r.stdout.splitlines()))
+assert table[0] == ["name", "machineState"], f"Unexpected CSV header: {table[0]}"
+assert len(table) - 1 == min(5, count_val), f"Expected {min(5, count_val)} CSV rows, got {len(table) - 1}"
+print(f"   OK — header + {len(table) - 1} rows")
+
+work_dir = tempfile.mkdtemp(prefix="verify_rt_")
+parquet_path = os.path.join(work_dir, "machines.parquet")
+r = run(["query", "Industry.Basic/Machine", "--columns", "name,machineState", "--max", "5",
+         "--format", "parquet", "--out", parquet_path], expect_fail=True)
+assert "Traceback" not in r.stderr, "Got unexpected traceback"
+try:
+    import pyarrow.parquet
+except ImportError:
+    assert r.returncode == 1 and "pyarrow" in r.stderr, "Expected a clean 'needs pyarrow' error"
+    print("   OK — pyarrow not installed, clean error")
+else:
+    assert r.returncode == 0, f"--format parquet failed: {r.stderr[:500]}"
+    parquet_table = pyarrow.parquet.read_table(parquet_path)
+    assert parquet_table.column_names == ["name", "machineState"], "Unexpected Parquet columns"
+    assert parquet_table.num_rows == min(5, count_val), "Unexpected Parquet row count"
+    print(f"   OK — Parquet file with {parquet_table.num_rows} rows")
+
+r = run(["query", "Industry.Basic/Machine", "--columns", "name", "--format", "arrow"], expect_fail=True)
+assert r.returncode == 1 and "--out" in r.stderr, "Binary format to stdout should be refused"
+print("   OK — binary format to stdout refused")
+
+# 14. query --all / --max — pages through the transient query
+print()
+print("14. 'query Industry.Basic/Machine --columns name --all --first 7 --ndjson'...")
+r = run(["query", "Industry.Basic/Machine", "--columns", "name", "--all", "--first", "7", "--ndjson"])
+query_rows = [json.loads(l) for l in r.stdout.splitlines() if l.strip()]
+if "does not page" in r.stderr:
+    assert len(query_rows) == min(7, count_val), "Fallback should return exactly one page"
+    print(f"   OK — server does not page transient queries, first page of {len(query_rows)} rows")
+else:
+    assert len(query_rows) == count_val, f"Expected {count_val} rows, got {len(query_rows)}"
+    print(f"   OK — {len(query_rows)} rows across pages")
+
+r = run(["query", "Industry.Basic/Machine", "--columns", "name", "--max", "10", "--first", "3", "--ndjson"])
+query_rows = [l for l in r.stdout.splitlines() if l.strip()]
+expected = min(3 if "does not page" in r.stderr else 10, count_val)
+assert len(query_rows) == expected, f"Expected {expected} rows with --max 10, got {len(query_rows)}"
+print(f"   OK — --max 10 --first 3 returned {len(query_rows)} rows")
+
+# 15. repeated --where — clauses are ANDed, IN/NOT_IN take lists
+print()
+print("15. 'filter Industry.Basic/Machine --where rtId IN [3 rtIds] --where rtId NOT_IN [1 rtId]'...")
+in_ids = sample_ids[:3]
+r = run(["filter", "Industry.Basic/Machine", "--where", "rtId", "IN", json.dumps(in_ids), "--ndjson"])
+got = sorted(json.loads(l)["rtId"] for l in r.stdout.splitlines() if l.strip())
+assert got == sorted(in_ids), f"IN returned {got}, expected {sorted(in_ids)}"
+print(f"   OK — IN matched {len(got)} entities")
+
+r = run(["filter", "Industry.Basic/Machine", "--where", "rtId", "IN", json.dumps(in_ids),
+         "--where", "rtId", "NOT_IN", json.dumps(in_ids[:1]), "--ndjson"])
+got = sorted(json.loads(l)["rtId"] for l in r.stdout.splitlines() if l.strip())
+assert got == sorted(in_ids[1:]), f"IN and NOT_IN returned {got}, expected {sorted(in_ids[1:])}"
+print(f"   OK — both clauses applied, {len(got)} entities")
+
+r = run(["query", "Industry.Basic/Machine", "--columns", "name", "--where", "rtId", "IN", json.dumps(in_ids),
+         "--ndjson"])
+got = [l for l in r.stdout.splitlines() if l.strip()]
+assert len(got) == len(in_ids), f"query --where returned {len(got)} rows, expected {len(in_ids)}"
+print(f"   OK — query --where returned {len(got)} rows")
+
+r = run(["filter", "Industry.Basic/Machine", "--where", "rtId", "BOGUS", "x"], expect_fail=True)
+assert r.returncode == 1 and "unknown operator" in r.stderr, "Unknown --where operator should be rejected"
+assert "Traceback" not in r.stderr, "Got unexpected traceback"
+print("   OK — unknown operator rejected cleanly")
+
+# 16. export — NDJSON file with every instance exactly once
+def exported_ids(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(l)["rtId"] for l in f if l.strip()]
+
+
+def read_checkpoint(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+print()
+print("16. 'export Industry.Basic/Machine --out machines.ndjson'...")
+export_path = os.path.join(work_dir, "machines.ndjson")
+run(["export", "Industry.Basic/Machine", "--out", export_path])
+full_ids = exported_ids(export_path)
+assert len(full_ids) == count_val, f"Expected {count_val} rows, got {len(full_ids)}"
+assert len(set(full_ids)) == len(full_ids), "Export contains duplicate rtIds"
+assert read_checkpoint(export_path + ".checkpoint")["complete"], "Checkpoint not marked complete"
+print(f"   OK — {len(full_ids)} unique rows, checkpoint complete")
+
+# 17. export interrupted with SIGINT, then --resume — same rows, no duplicates
+print()
+print("17. 'export ... --page-size N --rate 2', SIGINT, then '--resume'...")
+resume_path = os.path.join(work_dir, "resumed.ndjson")
+export_args = ["export", "Industry.Basic/Machine", "--out", resume_path,
+               "--page-size", str(max(1, count_val // 10)), "--rate", "2"]
+proc = subprocess.Popen([sys.executable, EXPLORER] + export_args,
+                        stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+deadline = time.time() + 60
+while proc.poll() is None and time.time() < deadline:
+    checkpoint = read_checkpoint(resume_path + ".checkpoint")
+    if checkpoint and checkpoint["rows"] and not checkpoint["complete"]:
+        proc.send_signal(signal.SIGINT)
+        break
+    time.sleep(0.1)
+_, stderr = proc.communicate(timeout=60)
+assert "Traceback" not in stderr, f"Got unexpected traceback: {stderr[-500:]}"
+if proc.returncode == 130:
+    partial = read_checkpoint(resume_path + ".checkpoint")["rows"]
+    assert "--resume" in stderr, "Interrupt message should mention --resume"
+    print(f"   OK — interrupted after {partial} rows")
+else:
+    assert proc.returncode == 0, f"Export failed (exit {proc.returncode}): {stderr[-500:]}"
+    print("   OK — export finished before the interrupt (resume will report it complete)")
+
+r = run(["export", "Industry.Basic/Machine", "--out", resume_path, "--resume"])
+resumed_ids = exported_ids(resume_path)
+assert len(set(resumed_ids)) == len(resumed_ids), "Resumed export contains duplicate rtIds"
+assert sorted(resumed_ids) == sorted(full_ids), "Resumed export differs from the uninterrupted one"
+print(f"   OK — resumed export has the same {len(resumed_ids)} unique rows")
+
+other_path = os.path.join(work_dir, "other.ndjson")
+with open(other_path, "w", encoding="utf-8") as f:
+    f.write("unrelated\n")
+r = run(["export", "Industry.Basic/Machine", "--out", other_path,
+         "--checkpoint", resume_path + ".checkpoint", "--resume"], expect_fail=True)
+assert r.returncode == 1 and "belongs to an export to" in r.stderr, "Resume into another --out should be refused"
+with open(other_path, encoding="utf-8") as f:
+    assert f.read() == "unrelated\n", "Refused resume must not touch the other file"
+print("   OK — resume with another --out refused, file untouched")
+
+# 18. export --shards — key ranges exported concurrently and merged
+print()
+print("18. 'export Industry.Basic/Machine --shards 3 --parallel 2'...")
+sharded_path = os.path.join(work_dir, "sharded.ndjson")
+run(["export", "Industry.Basic/Machine", "--out", sharded_path, "--shards", "3", "--parallel", "2"])
+sharded_ids = exported_ids(sharded_path)
+assert len(set(sharded_ids)) == len(sharded_ids), "Sharded export contains duplicate rtIds"
+assert sharded_ids == sorted(full_ids), "Sharded export is not the single export in rtId order"
+print(f"   OK — {len(sharded_ids)} unique rows, the single export in rtId order")
+
+r = run(["export", "Industry.Basic/Machine", "--out", sharded_path, "--shards", "3", "--resume"])
+assert "already complete" in r.stderr, "Resuming a finished sharded export should report it complete"
+print("   OK — --resume reports the sharded export complete")
+
+r = run(["export", "Industry.Basic/Machine", "--out", sharded_path, "--shards", "0"], expect_fail=True)
+assert r.returncode == 2 and "Traceback" not in r.stderr, "--shards 0 should be a usage error"
+r = run(["export", "Industry.Basic/Machine", "--out", sharded_path, "--shards", "2", "--sort", "rtId"],
+        expect_fail=True)
+assert r.returncode == 1 and "--sort" in r.stderr, "--sort with --shards should be refused"
+print("   OK — --shards 0 and --sort with --shards rejected")
+
+shutil.rmtree(work_dir, ignore_errors=True)
+
 print()
 print("=== rt_explorer.py: ALL CHECKS PASSED ===")
@@ -1,6 +1,18 @@
 """Verification script for Step 1: _octo_common.py shared foundation."""
-import sys
+import asyncio
+import base64
+import itertools
+import json
 import os
+import re
+import sys
+import tempfile
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
@@ -9,7 +21,12 @@ print()
 
 # 1. Module imports without errors
 print("1. Import check...")
-from _octo_common import load_context, get_graphql_url, get_token, graphql_query, collect_connection
+import _octo_common
+from _octo_common import (
+    load_context, get_graphql_url, get_token, graphql_query, graphql_batch, collect_connection,
+    AsyncGraphQLClient, _alias_document, _split_aliased, register_persisted_queries,
+    RateLimit, set_rate_limit, RetryPolicy, set_retry_policy, TransportError,
+)
 print("   All functions imported OK")
 
 # 2. Context loads correctly
@@ -43,5 +60,430 @@ print(f"   Extracted {len(result)} nodes from test connection OK")
 assert collect_connection(None) == []
 print("   None input returns [] OK")
 
+# 6. Batch document rewriting (offline)
+print()
+print("6. _alias_document / _split_aliased check...")
+defs, body = _alias_document('{ a(x: "}{") { b } }', "b0_")
+assert (defs, body) == ("", 'b0_a: a(x: "}{") { b }'), body
+defs, body = _alias_document('query { a(s: """x { "y" } \\""" z""") { b } }', "b0_")
+assert body == 'b0_a: a(s: """x { "y" } \\""" z""") { b }', body
+print("   Braces inside strings and block strings left alone OK")
+defs, body = _alias_document('query($f: Boolean!) { a @include(if: $f) { b(f: $f) } c }', "b1_")
+assert defs == "$b1_f: Boolean!", defs
+assert body == "b1_a: a @include(if: $b1_f) { b(f: $b1_f) } b1_c: c", body
+print("   Directives kept, variables renamed at every depth OK")
+defs, body = _alias_document("{ x: a { y: b } }", "b2_")
+assert body == "b2_x: a { y: b }", body
+print("   Existing top-level alias replaced, nested alias kept OK")
+defs, body = _alias_document('query Named($n: Int = 5, $s: String = "a)b") { a(n: $n) }', "b3_")
+assert defs == '$b3_n: Int = 5, $b3_s: String = "a)b"', defs
+assert body == "b3_a: a(n: $b3_n)", body
+print("   Default values kept in variable definitions OK")
+for doc in ["query { ...F } fragment F on Query { a }", "{ a { ...F } } fragment F on Query { a }",
+            "{ ... on Query { a } }", "mutation { a }", "{ a } { b }", "{ a "]:
+    try:
+        _alias_document(doc, "b0_")
+    except ValueError:
+        continue
+    raise AssertionError(f"Expected ValueError for {doc!r}")
+print("   Fragments, mutations, multiple operations, and unbalanced braces rejected OK")
+split = _split_aliased({
+    "data": {"b0_a": 1, "b1_a": 2, "b10_x": 3},
+    "errors": [{"message": "bad c", "path": ["b1_a", "c", 0]}, {"message": "bad x", "path": ["b10_x"]}],
+}, 11, [f"b{i}_" for i in range(11)])
+assert split[0] == {"data": {"a": 1}, "errors": []}, split[0]
+assert split[1] == {"data": {"a": 2}, "errors": [{"message": "bad c", "path": ["a", "c", 0]}]}, split[1]
+assert split[10] == {"data": {"x": 3}, "errors": [{"message": "bad x", "path": ["x"]}]}, split[10]
+assert split[2] == {"data": None, "errors": []}, split[2]
+print("   Merged data and error paths mapped back to their items OK")
+
+# 7. graphql_batch fallbacks against a stubbed transport (offline)
+print()
+print("7. graphql_batch fallback check (stubbed transport)...")
+sent = []
+
+
+def fake_post(context, payload, tenant_override=None, verify_ssl=True):
+    sent.append(payload)
+    if isinstance(payload, list):
+        if tenant_override == "rejects-arrays":
+            raise TransportError("HTTP 400 from stub", "Request body is not a JSON object.", status=400)
+        return {"errors": [{"message": "batched requests are not supported"}]}
+    query = payload["query"]
+    if "broken" in query:
+        return {"errors": [{"message": "Cannot query field 'broken'"}]}
+    data = {}
+    for alias, field in re.findall(r"(?<!\$)(b\d+_\w+): (\w+)", query):
+        data[alias] = f"{field}:{payload.get('variables')}"
+    return {"data": data or {"a": "plain"}}
+
+
+real_post = _octo_common._post_graphql
+_octo_common._post_graphql = fake_post
+try:
+    items = [("query($v: Int) { a(v: $v) }", {"v": 1}), ("{ b }", None), ("{ broken }", None)]
+    results = graphql_batch(s, items[:2], mode="array")
+    assert len(sent) == 2 and isinstance(sent[0], list), "Array mode should fall back to one aliased request"
+    assert results[0]["data"] == {"a": "a:{'b0_v': 1}"} and results[1]["data"] == {"b": "b:{'b0_v': 1}"}, results
+    sent.clear()
+    for _ in range(2):
+        results = graphql_batch(s, items[:2], mode="array", tenant_override="rejects-arrays")
+        assert results[1]["data"] == {"b": "b:{'b0_v': 1}"}, results
+    assert [isinstance(p, list) for p in sent] == [True, False, False], "Array refused with HTTP 400 once"
+    sent.clear()
+    results = graphql_batch(s, items)
+    assert len(sent) == 4, f"Expected merged request plus 3 single retries, got {len(sent)}"
+    assert results[0]["data"] == {"a": "plain"} and not results[0]["errors"], results[0]
+    assert results[2]["data"] is None and results[2]["errors"], results[2]
+    sent.clear()
+    graphql_batch(s, [("{ a }", None)] * 5, batch_size=2)
+    assert len(sent) == 3, f"Expected 3 chunks of at most 2, got {len(sent)}"
+finally:
+    _octo_common._post_graphql = real_post
+    _octo_common._array_batching.clear()
+print("   Array fallback (GraphQL error or HTTP 400), per-item retry after a failed merge, and chunking OK")
+
+# 8. Live graphql_batch round trip
+print()
+print("8. Live graphql_batch round trip...")
+live = [
+    ("{ __schema { queryType { name } } }", None),
+    ("query($name: String!) { __type(name: $name) { name kind } }", {"name": "String"}),
+    ("{ doesNotExistAnywhere }", None),
+]
+for mode in ("alias", "array"):
+    results = graphql_batch(s, live, mode=mode)
+    assert len(results) == 3, results
+    query_type = results[0]["data"]["__schema"]["queryType"]["name"]
+    assert results[1]["data"]["__type"]["kind"] == "SCALAR", results[1]
+    assert results[2]["errors"] and not results[2]["data"], results[2]
+    print(f"   mode={mode}: queryType {query_type}, invalid item reported on its own OK")
+
+# 9. AsyncGraphQLClient — bounded concurrency (stubbed), then a live gather()
+print()
+print("9. AsyncGraphQLClient check...")
+in_flight = {"now": 0, "max": 0}
+in_flight_lock = threading.Lock()
+
+
+def slow_post(context, payload, tenant_override=None, verify_ssl=True):
+    with in_flight_lock:
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+    time.sleep(0.05)
+    with in_flight_lock:
+        in_flight["now"] -= 1
+    return {"data": {"n": payload["variables"]["n"]}}
+
+
+async def gather_stubbed():
+    async with AsyncGraphQLClient(s, max_concurrency=4) as client:
+        return await client.gather([("query($n: Int) { n(n: $n) }", {"n": i}) for i in range(20)])
+
+
+_octo_common._post_graphql = slow_post
+try:
+    bodies = asyncio.run(gather_stubbed())
+finally:
+    _octo_common._post_graphql = real_post
+assert [b["data"]["n"] for b in bodies] == list(range(20)), "gather() should keep input order"
+assert 1 < in_flight["max"] <= 4, f"Expected 2-4 requests in flight, saw {in_flight['max']}"
+print(f"   Stubbed: 20 queries in order, at most {in_flight['max']} in flight OK")
+
+
+async def gather_live():
+    async with AsyncGraphQLClient(s, max_concurrency=8) as client:
+        bodies = await client.gather([("{ __schema { queryType { name } } }", None)] * 8
+                                     + [("{ doesNotExistAnywhere }", None)])
+        data = await client.query("{ __schema { queryType { name } } }")
+    return bodies, data
+
+
+bodies, data = asyncio.run(gather_live())
+names = {b["data"]["__schema"]["queryType"]["name"] for b in bodies[:8]}
+assert names == {data["__schema"]["queryType"]["name"]}, f"Inconsistent live answers: {names}"
+assert bodies[8].get("errors") and not bodies[8].get("data"), "Invalid query should come back with errors"
+print(f"   Live: 8 concurrent queries answered ({names.pop()}), invalid one returned its errors OK")
+
+# 10. Automatic persisted queries — POSTs per run against stubbed servers (offline)
+print()
+print("10. Persisted query round trips (stubbed servers)...")
+apq_queries = {"Q_VERIFY_A": "{ verifyA { id } }", "Q_VERIFY_B": "{ verifyB { id } }"}
+register_persisted_queries(apq_queries)
+apq_posts = []
+apq_known = set()
+
+
+def apq_server(context, payload, tenant_override=None, verify_ssl=True):
+    apq_posts.append(payload)
+    digest = ((payload.get("extensions") or {}).get("persistedQuery") or {}).get("sha256Hash")
+    if "query" in payload:
+        apq_known.add(digest)
+    elif digest not in apq_known:
+        return {"errors": [{"message": "PersistedQueryNotFound",
+                            "extensions": {"code": "PERSISTED_QUERY_NOT_FOUND"}}]}
+    return {"data": {"ok": True}}
+
+
+def plain_server(context, payload, tenant_override=None, verify_ssl=True):
+    apq_posts.append(payload)
+    if "query" not in payload:
+        return {"errors": [{"message": "No query document was provided."}]}
+    return {"data": {"ok": True}}
+
+
+def apq_run(server):
+    """One CLI invocation: fresh in-process state, same on-disk cache and server."""
+    _octo_common._apq_unsupported = None
+    _octo_common._apq_registered.clear()
+    apq_posts.clear()
+    _octo_common._post_graphql = server
+    try:
+        for query in apq_queries.values():
+            assert graphql_query(s, query) == {"ok": True}
+    finally:
+        _octo_common._post_graphql = real_post
+    return len(apq_posts)
+
+
+real_cache_path = _octo_common.APQ_CACHE_PATH
+with tempfile.TemporaryDirectory() as tmp:
+    try:
+        _octo_common.APQ_CACHE_PATH = os.path.join(tmp, "apq.json")
+        first, later = apq_run(apq_server), apq_run(apq_server)
+        assert (first, later) == (4, 2), f"APQ server: expected 4 then 2 POSTs, got {first} then {later}"
+        assert all("query" not in p for p in apq_posts), "Later run should send hashes only"
+        assert not os.path.exists(_octo_common.APQ_CACHE_PATH), "APQ server must not be marked unsupported"
+        print(f"   Supporting server: {first} POSTs on first contact, {later} on a later run OK")
+        first, later = apq_run(plain_server), apq_run(plain_server)
+        assert (first, later) == (3, 2), f"Plain server: expected 3 then 2 POSTs, got {first} then {later}"
+        assert all("extensions" not in p for p in apq_posts), "Later run should send plain requests"
+        print(f"   Non-supporting server: {first} POSTs on first contact, {later} on a later run OK")
+    finally:
+        _octo_common.APQ_CACHE_PATH = real_cache_path
+        _octo_common._apq_unsupported = None
+        _octo_common._apq_registered.clear()
+
+# 11. Rate limiter — --rate spacing and --max-in-flight cap (offline, fake adapter)
+print()
+print("11. Rate limiter check (fake adapter)...")
+
+
+class FakeAdapter(requests.adapters.BaseAdapter):
+    """Answers every request to one host offline: handler(request) -> (status, body, headers)."""
+
+    def __init__(self, handler):
+        super().__init__()
+        self.handler = handler
+
+    def send(self, request, **kwargs):
+        status, body, headers = self.handler(request)
+        resp = requests.Response()
+        resp.status_code, resp.request, resp.url = status, request, request.url
+        resp._content = body if isinstance(body, bytes) else json.dumps(body).encode("utf-8")
+        resp.headers.update(headers or {})
+        return resp
+
+    def close(self):
+        pass
+
+
+OFFLINE_URL = "https://octo.invalid/"
+offline = {"Name": "verify-offline", "Authentication": {"AccessToken": "offline-token"},
+           "OctoToolOptions": {"AssetServiceUrl": OFFLINE_URL, "TenantId": "verify"}}
+
+
+def serve(handler, url=OFFLINE_URL):
+    """Route the pooled client's requests for `url` to `handler` instead of the network."""
+    _octo_common.get_client(url).session.mount(url, FakeAdapter(handler))
+
+
+sent_at = []
+in_flight = {"now": 0, "max": 0}
+
+
+def limited_handler(request):
+    with in_flight_lock:
+        sent_at.append(time.monotonic())
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+    time.sleep(0.05)
+    with in_flight_lock:
+        in_flight["now"] -= 1
+    return 200, {"data": {"ok": True}}, None
+
+
+def broken_slot():
+    raise OSError("lock file unavailable")
+
+
+serve(limited_handler)
+try:
+    set_rate_limit(RateLimit(rate=20, burst=1), offline)
+    for _ in range(6):
+        graphql_query(offline, "{ ok }")
+    gaps = [b - a for a, b in zip(sent_at, sent_at[1:])]
+    assert min(gaps) >= 0.045, f"--rate 20 should space requests 50 ms apart, saw {min(gaps) * 1000:.0f} ms"
+    print(f"   --rate 20: 6 requests at least {min(gaps) * 1000:.0f} ms apart OK")
+
+    set_rate_limit(RateLimit(max_in_flight=3), offline)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda _: graphql_query(offline, "{ ok }"), range(16)))
+    assert 1 < in_flight["max"] <= 3, f"--max-in-flight 3: saw {in_flight['max']} concurrent requests"
+    print(f"   --max-in-flight 3: 16 requests from 8 threads, at most {in_flight['max']} in flight OK")
+
+    set_rate_limit(RateLimit(max_in_flight=1, shared=True), offline)
+    governor = _octo_common._governor_for(get_graphql_url(offline))
+
+    governor._acquire_shared_slot = broken_slot
+    try:
+        graphql_query(offline, "{ ok }")
+        raise AssertionError("Expected the shared slot error to propagate")
+    except OSError:
+        pass
+    del governor._acquire_shared_slot
+    assert governor._slots.acquire(timeout=1), "Local slot leaked after a failed shared-slot acquisition"
+    governor._slots.release()
+    graphql_query(offline, "{ ok }")
+    print("   Failed shared-slot acquisition gives the local slot back OK")
+finally:
+    set_rate_limit(None, offline)
+
+# 12. Token refresh — near expiry and after a 401 (offline, fake identity service)
+print()
+print("12. Token refresh check (fake identity service)...")
+IDENTITY_URL = "https://identity.invalid/"
+token_serial = itertools.count()
+
+
+def fake_jwt(expires_in):
+    def enc(part):
+        return base64.urlsafe_b64encode(json.dumps(part).encode("utf-8")).rstrip(b"=").decode("ascii")
+    claims = {"exp": int(time.time()) + expires_in, "client_id": "octo-cli", "jti": next(token_serial)}
+    return f"{enc({'alg': 'none'})}.{enc(claims)}.sig"
+
+
+grants = []
+revoked = set()
+graphql_tokens = []
+
+
+def identity_handler(request):
+    if request.url.endswith("/.well-known/openid-configuration"):
+        return 200, {"token_endpoint": IDENTITY_URL + "connect/token"}, None
+    grants.append(request.body)
+    time.sleep(0.05)  # let the other threads pile up behind the refresh
+    return 200, {"access_token": fake_jwt(3600), "refresh_token": f"refresh-{len(grants)}"}, None
+
+
+def token_handler(request):
+    token = request.headers["Authorization"].split(" ", 1)[1]
+    graphql_tokens.append(token)
+    if token in revoked:
+        return 401, b"", None
+    return 200, {"data": {"ok": True}}, None
+
+
+real_home = {k: os.environ.get(k) for k in ("HOME", "USERPROFILE")}
+with tempfile.TemporaryDirectory() as home:
+    try:
+        os.environ["HOME"] = os.environ["USERPROFILE"] = home
+        contexts_path = _octo_common._contexts_path()
+        os.makedirs(os.path.dirname(contexts_path))
+        stored = {
+            "ActiveContext": "verify-offline",
+            "Contexts": {
+                "verify-offline": {
+                    "OctoToolOptions": {"AssetServiceUrl": OFFLINE_URL, "TenantId": "verify",
+                                        "IdentityServiceUrl": IDENTITY_URL},
+                    "Authentication": {"AccessToken": fake_jwt(10), "RefreshToken": "refresh-0"},
+                },
+                "untouched": {"OctoToolOptions": {}, "Authentication": {"AccessToken": "keep-me"}},
+            },
+        }
+        with open(contexts_path, "w") as f:
+            json.dump(stored, f)
+        os.chmod(contexts_path, 0o600)
+        inode = os.stat(contexts_path).st_ino
+
+        serve(identity_handler, IDENTITY_URL)
+        serve(token_handler)
+        context, other_copy = load_context(), load_context()
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda _: graphql_query(context, "{ ok }"), range(8)))
+        new_token = context["Authentication"]["AccessToken"]
+        assert len(grants) == 1, f"Expected exactly one refresh grant for 8 threads, got {len(grants)}"
+        assert "grant_type=refresh_token" in grants[0] and "refresh_token=refresh-0" in grants[0], grants[0]
+        assert set(graphql_tokens) == {new_token}, "Every request should carry the refreshed token"
+        assert other_copy["Authentication"]["AccessToken"] == stored["Contexts"]["verify-offline"][
+            "Authentication"]["AccessToken"], "Another load_context() copy changed in place"
+        print("   Expiring token: one refresh grant for 8 threads, the caller's context updated OK")
+
+        with open(contexts_path) as f:
+            on_disk = json.load(f)
+        assert os.stat(contexts_path).st_ino != inode, "contexts.json should be replaced, not rewritten in place"
+        assert os.stat(contexts_path).st_mode & 0o777 == 0o600, "contexts.json permissions not kept"
+        assert not [n for n in os.listdir(os.path.dirname(contexts_path)) if n.endswith(".tmp")]
+        assert on_disk["Contexts"]["verify-offline"]["Authentication"] == {
+            "AccessToken": new_token, "RefreshToken": "refresh-1"}, on_disk
+        assert on_disk["Contexts"]["untouched"] == stored["Contexts"]["untouched"]
+        assert load_context()["Authentication"]["AccessToken"] == new_token
+        print("   contexts.json replaced atomically with the new tokens, other contexts kept OK")
+
+        revoked.add(new_token)
+        graphql_tokens.clear()
+        assert graphql_query(context, "{ ok }") == {"ok": True}
+        assert len(grants) == 2, f"Expected one more refresh after the 401, got {len(grants) - 1}"
+        assert graphql_tokens == [new_token, context["Authentication"]["AccessToken"]], graphql_tokens
+        print("   401 on a valid-looking token: one refresh and one resend OK")
+    finally:
+        for key, value in real_home.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+# 13. Retries — 503 then success, 429 with Retry-After, giving up (offline, fake adapter)
+print()
+print("13. Retry check (fake adapter)...")
+script = []
+attempt_at = []
+
+
+def scripted_handler(request):
+    attempt_at.append(time.monotonic())
+    status, headers = script.pop(0)
+    return status, {"data": {"ok": True}} if status == 200 else b"busy", headers
+
+
+def scripted(*responses):
+    script[:] = responses
+    attempt_at.clear()
+
+
+serve(scripted_handler)
+previous_policy = set_retry_policy(RetryPolicy(max_attempts=3, backoff=0.01, jitter=False))
+try:
+    scripted((503, None), (200, None))
+    assert graphql_query(offline, "{ ok }") == {"ok": True} and len(attempt_at) == 2
+    print("   503 then 200: retried once and returned the data OK")
+
+    scripted((429, {"Retry-After": "0.3"}), (200, None))
+    assert graphql_query(offline, "{ ok }") == {"ok": True} and len(attempt_at) == 2
+    waited = attempt_at[1] - attempt_at[0]
+    assert waited >= 0.29, f"Retry-After 0.3 should beat the 10 ms backoff, waited {waited * 1000:.0f} ms"
+    print(f"   429 with Retry-After 0.3: waited {waited * 1000:.0f} ms before the retry OK")
+
+    scripted((503, None), (502, None), (503, None))
+    try:
+        graphql_query(offline, "{ ok }")
+        raise AssertionError("Expected TransportError after the last attempt")
+    except TransportError as e:
+        assert (e.status, e.attempts) == (503, 3), (e.status, e.attempts)
+    assert not script, "All three attempts should have been used"
+    print("   Three failures: TransportError (HTTP 503, 3 attempts) OK")
+finally:
+    set_retry_policy(previous_policy)
+
 print()
 print("=== Step 1: ALL CHECKS PASSED ===")
@@ -1,4 +1,6 @@
 """Verification script for Step 3: ck_explorer.py."""
+import argparse
+import base64
 import subprocess
 import sys
 import json
@@ -7,6 +9,13 @@ import os
 SCRIPTS = os.path.dirname(os.path.abspath(__file__))
 EXPLORER = os.path.join(SCRIPTS, "ck_explorer.py")
 
+sys.path.insert(0, SCRIPTS)
+import _ck_cache
+import _ck_index
+import ck_explorer
+import _octo_common
+from _octo_common import load_context, fetch_all_pages
+
 print("=== Step 3 Verification: ck_explorer.py ===")
 print()
 
@@ -125,5 +134,162 @@ assert "no model found" in combined.lower() or "available" in combined.lower(),
     "Expected informative message"
 print("   OK — clean error message, no traceback")
 
+# 11. CK snapshot cache — --refresh re-downloads, plain runs reuse it, --no-cache bypasses it
+print()
+print("11. 'type System-2.0.2/Entity-1' with --refresh, cached, and --no-cache...")
+snapshot_file = _ck_cache.snapshot_path(load_context())
+r = run(["type", "System-2.0.2/Entity-1", "--refresh", "--json"])
+assert json.loads(r.stdout)["ckTypeId"]["fullName"] == "System-2.0.2/Entity-1", "--refresh found the wrong type"
+snapshot = _ck_cache.load_json(snapshot_file)
+assert snapshot and _ck_cache.is_complete(snapshot), "--refresh should save a complete snapshot"
+fetched_at = snapshot["fetchedAt"]
+print(f"   OK — --refresh saved a snapshot with {len(snapshot['types'])} types, {len(snapshot['enums'])} enums")
+
+r = run(["type", "System-2.0.2/Entity-1", "--json"])
+assert json.loads(r.stdout)["ckTypeId"]["fullName"] == "System-2.0.2/Entity-1", "Cached lookup found the wrong type"
+assert _ck_cache.load_json(snapshot_file)["fetchedAt"] == fetched_at, "A cache hit should not re-download"
+print("   OK — second run answered from the cached snapshot")
+
+r = run(["type", "System-2.0.2/Entity-1", "--no-cache", "--json"])
+assert json.loads(r.stdout)["ckTypeId"]["fullName"] == "System-2.0.2/Entity-1", "--no-cache found the wrong type"
+assert _ck_cache.load_json(snapshot_file)["fetchedAt"] == fetched_at, "--no-cache must not write the cache"
+r = run(["type", "System-2.0.2/Entity-1", "--refresh"])
+assert _ck_cache.load_json(snapshot_file)["fetchedAt"] > fetched_at, "--refresh should re-download"
+print("   OK — --no-cache leaves the snapshot alone, --refresh replaces it")
+
+r = run(["enum", "System-2.0.2/AggregationTypes-1", "--page-size", "0"], expect_fail=True)
+assert r.returncode == 2 and "Traceback" not in r.stderr, "--page-size 0 should be a usage error"
+assert _ck_cache.is_complete(_ck_cache.load_json(snapshot_file)), "The cached snapshot should stay complete"
+print("   OK — --page-size 0 rejected, snapshot still complete")
+
+# 12. Server-side type lookup and its fallback (offline, stubbed queries)
+print()
+print("12. types(ckId:) lookup and full-scan fallback (stubbed)...")
+found = {"ckTypeId": {"fullName": "M-1.0.0/T-1", "semanticVersionedFullName": "M/T-1"}}
+other = {"ckTypeId": {"fullName": "M-1.0.0/Other-1", "semanticVersionedFullName": "M/Other-1"}}
+lookups, scans = [], []
+answers = {
+    "ok": {"data": {"constructionKit": {"types": {"edges": [{"node": other}, {"node": found}]}}}},
+    "unsupported": {"errors": [{"message": "The argument `ckId` does not exist."}], "data": None},
+    "empty": {"data": {"constructionKit": {"types": {"edges": []}}}},
+}
+stub_args = argparse.Namespace(tenant=None, insecure=False, no_cache=True, refresh=False, type_name="M-1.0.0/T-1")
+real_execute, real_load_ck = ck_explorer.graphql_execute, ck_explorer._load_ck
+ck_explorer._load_ck = lambda context, args, snapshot=None: scans.append(args.type_name) or {"types": [other, found]}
+try:
+    for answer, expect_scan in (("ok", False), ("unsupported", True), ("empty", True)):
+        ck_explorer.graphql_execute = lambda context, query, variables=None, **kw: (
+            lookups.append(variables["ckId"]) or answers[answer])
+        scans.clear()
+        assert ck_explorer._find_type({}, stub_args) is found, f"{answer}: wrong type"
+        assert bool(scans) == expect_scan, f"{answer}: expected fallback scan={expect_scan}"
+    lookups.clear()
+    stub_args.type_name = "T-1"
+    assert ck_explorer._find_type({}, stub_args) is found, "Short name should be found by the scan"
+    assert not lookups, "Short names should not be looked up server-side"
+finally:
+    ck_explorer.graphql_execute, ck_explorer._load_ck = real_execute, real_load_ck
+print("   OK — lookup used when it answers, full scan on errors, no match, or a short name")
+
+r = run(["preflight", "System-2.0.2/Entity-1", "--no-cache", "--json"])
+assert json.loads(r.stdout)["ckTypeId"] == "System-2.0.2/Entity-1", "Live lookup found the wrong type"
+r = run(["type", "Entity-1", "--no-cache", "--json"])
+assert json.loads(r.stdout)["ckTypeId"]["fullName"].endswith("/Entity-1"), "Short-name scan found the wrong type"
+print("   OK — live full-name lookup and short-name scan")
+
+# 13. Paging past the old 200 cap (offline, stubbed connection of 450 types)
+print()
+print("13. fetch_all_pages over 450 items with offset and opaque cursors (stubbed)...")
+
+
+def fake_connection(opaque):
+    def query(context, q, variables=None, **kw):
+        if opaque:
+            start = int(variables["after"][len("opaque-"):]) if variables.get("after") else 0
+        else:
+            start = int(base64.b64decode(variables["after"]).decode().split(":")[1]) + 1 if variables.get("after") else 0
+        end = min(start + variables["first"], 450)
+        cursor = f"opaque-{end}" if opaque else base64.b64encode(f"arrayconnection:{end - 1}".encode()).decode()
+        return {"constructionKit": {"types": {
+            "totalCount": 450,
+            "pageInfo": {"hasNextPage": end < 450, "endCursor": cursor},
+            "edges": [{"node": {"n": i}} for i in range(start, end)],
+        }}}
+    return query
+
+
+real_query = _octo_common.graphql_query
+try:
+    for opaque in (False, True):
+        _octo_common.graphql_query = fake_connection(opaque)
+        pages = fetch_all_pages({}, "q", {}, ("constructionKit", "types"), page_size=200)
+        nodes = [e["node"]["n"] for p in pages for e in p["edges"]]
+        assert nodes == list(range(450)), f"opaque={opaque}: got {len(nodes)} nodes, out of order or short"
+        pages = fetch_all_pages({}, "q", {}, ("constructionKit", "types"), page_size=200, max_items=230)
+        assert sum(len(p["edges"]) for p in pages) == 230, f"opaque={opaque}: max_items not honoured"
+finally:
+    _octo_common.graphql_query = real_query
+print("   OK — all 450 in order with parallel offset pages and sequential opaque ones; max_items honoured")
+
+# 14. Live types/enums paging — every page size returns the whole list
+print()
+print("14. 'types --json --page-size 7' returns every type...")
+full = json.loads(run(["types", "--json"]).stdout)
+paged = json.loads(run(["types", "--json", "--page-size", "7"]).stdout)
+assert len(full["types"]) == full["totalCount"], f"Got {len(full['types'])} of {full['totalCount']} types"
+assert sorted(t["ckTypeId"]["fullName"] for t in paged["types"]) == \
+    sorted(t["ckTypeId"]["fullName"] for t in full["types"]), "Small pages returned a different type set"
+limited = json.loads(run(["types", "--json", "--first", "10", "--page-size", "3"]).stdout)
+assert len(limited["types"]) == min(10, full["totalCount"]), "--first should cap the total"
+enums = json.loads(run(["enums", "--json", "--page-size", "5"]).stdout)
+assert len(enums["enums"]) == enums["totalCount"], f"Got {len(enums['enums'])} of {enums['totalCount']} enums"
+streamed = run(["types", "--ndjson", "--page-size", "7"]).stdout.splitlines()
+assert len(streamed) == full["totalCount"], f"--ndjson streamed {len(streamed)} of {full['totalCount']} types"
+print(f"   OK — {full['totalCount']} types and {enums['totalCount']} enums, any page size; --first 10 stops at 10")
+
+# 15. Inverted index ranking (offline)
+print()
+print("15. _ck_index.search ranking...")
+index = _ck_index.build_index(
+    [
+        {"ckTypeId": {"fullName": "Industry.Basic-2.1.0/Machine-1"}, "description": "A production machine",
+         "attributes": {"edges": [{"node": {"attributeName": "machineState"}}]}},
+        {"ckTypeId": {"fullName": "System-2.0.2/Entity-1"}, "description": "Root entity"},
+        {"ckTypeId": {"fullName": "Industry.Basic-2.1.0/MachineType-1"}},
+    ],
+    [{"ckEnumId": {"fullName": "Industry.Basic-2.1.0/MachineState-1"}, "values": [{"name": "Running"}]}],
+)
+
+
+def hits(query):
+    return [(kind, pos, why) for kind, pos, _score, why in _ck_index.search(index, query)]
+
+
+assert hits("machineState")[0][:2] == ("enum", 0), "Exact enum name should rank first"
+assert ("type", 0, ["attribute machineState", "name"]) in hits("machineState"), "Attribute match missing"
+assert hits("Running") == [("enum", 0, ["value Running"])], "Enum value match missing"
+assert hits("production") == [("type", 0, ["description"])], "Description match missing"
+assert hits("Machine-1")[0][:2] == ("type", 0), "Exact short name should rank first"
+assert ("type", 0) in [h[:2] for h in hits("Machne")], "Typo should still find Machine"
+assert ("type", 1) not in [h[:2] for h in hits("2.1")], "'2.1' must not match System-2.0.2"
+assert hits("machine root") == [], "All terms must match"
+print("   OK — attribute, enum value, description, exact-name, fuzzy, version, and AND matching")
+
+# 16. Live search over attributes, enum values, and typos
+print()
+print("16. 'search machineState', enum value, and 'search Machne'...")
+r = run(["search", "machineState"])
+assert any("/Machine-" in l and "attribute machineState" in l for l in r.stdout.splitlines()), \
+    "Machine type not found through its machineState attribute"
+print("   OK — Machine found by attribute")
+value = json.loads(run(["enum", "System-2.0.2/AggregationTypes-1", "--json"]).stdout)["values"][0]["name"]
+found = json.loads(run(["search", value, "--json"]).stdout)
+assert "System-2.0.2/AggregationTypes-1" in [e["ckEnumId"]["fullName"] for e in found["enums"]], \
+    f"AggregationTypes not found by its value '{value}'"
+print(f"   OK — AggregationTypes found by value '{value}'")
+found = json.loads(run(["search", "Machne", "--json"]).stdout)
+assert any("/Machine-" in t["ckTypeId"]["fullName"] for t in found["types"]), "Fuzzy search missed Machine"
+print("   OK — 'Machne' finds Machine")
+
 print()
 print("=== Step 3: ALL CHECKS PASSED ===")
@@ -3,15 +3,36 @@
 Explore CK models, types, enums, and associations via GraphQL.
 
 Usage:
-    python ck_explorer.py models [--json] [--tenant ID]
-    python ck_explorer.py model <name> [--json] [--tenant ID]
-    python ck_explorer.py types [--model X] [--first N] [--json] [--tenant ID]
-    python ck_explorer.py type <fullName> [--json] [--tenant ID]
-    python ck_explorer.py enums [--model X] [--first N] [--json] [--tenant ID]
-    python ck_explorer.py enum <fullName> [--json] [--tenant ID]
-    python ck_explorer.py search <term> [--first N] [--json] [--tenant ID]
-    python ck_explorer.py preflight <fullName> [--json] [--tenant ID]
+    python ck_explorer.py models [--json | --ndjson] [--tenant ID]
+    python ck_explorer.py model <name> [--json | --ndjson] [--tenant ID]
+    python ck_explorer.py types [--model X] [--first N] [--page-size N] [--json | --ndjson] [--tenant ID]
+    python ck_explorer.py type <fullName> [--refresh | --no-cache] [--json | --ndjson] [--tenant ID]
+    python ck_explorer.py enums [--model X] [--first N] [--page-size N] [--json | --ndjson] [--tenant ID]
+    python ck_explorer.py enum <fullName> [--refresh | --no-cache] [--json | --ndjson] [--tenant ID]
+    python ck_explorer.py search <term> [--first N] [--refresh | --no-cache] [--json | --ndjson] [--tenant ID]
+    python ck_explorer.py preflight <fullName> [--refresh | --no-cache] [--json | --ndjson] [--tenant ID]
+
+type, enum, search and preflight answer from an on-disk CK snapshot (see _ck_cache.py).
+After --cache-ttl seconds (default 600) the loaded model versions are re-checked with
+one small query and the snapshot is only re-downloaded if they changed; --refresh
+forces a re-download, --no-cache bypasses the cache entirely. Without a snapshot,
+type and preflight look up a full type name server-side instead of scanning the CK.
+
+Types and enums are paged through completely (--first limits the total); when the
+server's cursors are plain offsets, pages are fetched in parallel.
+
+search ranks types and enums through an inverted index (see _ck_index.py) over type,
+attribute, enum and enum value names and descriptions, persisted next to the cache.
+
+--ndjson writes one compact JSON object per model/type/enum (or one object for the
+single-item commands) instead of a single indented JSON document. types and enums
+follow the cursor page by page and write each page as it arrives.
+
 """
+import time
+
+_IMPORT_START = time.perf_counter()  # before other imports, for --profile
+
 import argparse
 import json
 import re
@@ -19,7 +40,14 @@ import sys
 import os
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-from _octo_common import load_context, graphql_query, collect_connection
+import _octo_profile
+from _octo_common import (
+    graphql_query, graphql_execute, collect_connection, fetch_all_pages, iter_connection_pages,
+    write_ndjson, DEFAULT_PAGE_SIZE, add_client_flags, run_cli,
+    register_persisted_queries, positive_int,
+)
+import _ck_cache
+import _ck_index
 
 
 # ---------------------------------------------------------------------------
@@ -41,10 +69,12 @@ Q_MODELS = """{
     }
 }"""
 
-Q_TYPES = """{
+Q_TYPES = """
+query($first: Int, $after: String) {
     constructionKit {
-        types(first: %d) {
+        types(first: $first, after: $after) {
             totalCount
+            pageInfo { hasNextPage endCursor }
             edges {
                 node {
                     ckTypeId { fullName semanticVersionedFullName }
@@ -58,11 +88,8 @@ Q_TYPES = """{
     }
 }"""
 
-Q_TYPE_DETAIL = """{
-    constructionKit {
-        types(first: 200) {
-            edges {
-                node {
+# Selection set for a fully expanded type, shared by the full scan and the single-type lookup.
+TYPE_DETAIL_FIELDS = """
                     ckTypeId { fullName semanticVersionedFullName }
                     isAbstract
                     isFinal
@@ -85,16 +112,39 @@ Q_TYPE_DETAIL = """{
                         out { all { roleId { fullName semanticVersionedFullName } originCkTypeId { fullName semanticVersionedFullName } targetCkTypeId { fullName semanticVersionedFullName } navigationPropertyName multiplicity } }
                     }
                     derivedTypes { edges { node { ckTypeId { fullName } } } }
-                }
+"""
+
+Q_TYPE_DETAIL = """
+query($first: Int, $after: String) {
+    constructionKit {
+        types(first: $first, after: $after) {
+            totalCount
+            pageInfo { hasNextPage endCursor }
+            edges {
+                node {%s}
             }
         }
     }
-}"""
+}""" % TYPE_DETAIL_FIELDS
 
-Q_ENUMS = """{
+# Server-side lookup of one type by ckId; not supported by every server version.
+Q_TYPE_BY_ID = """
+query($ckId: String!) {
     constructionKit {
-        enums(first: %d) {
+        types(ckId: $ckId, first: 5) {
+            edges {
+                node {%s}
+            }
+        }
+    }
+}""" % TYPE_DETAIL_FIELDS
+
+Q_ENUMS = """
+query($first: Int, $after: String) {
+    constructionKit {
+        enums(first: $first, after: $after) {
             totalCount
+            pageInfo { hasNextPage endCursor }
             edges {
                 node {
                     ckEnumId { fullName semanticVersionedFullName }
@@ -108,28 +158,43 @@ Q_ENUMS = """{
     }
 }"""
 
-Q_SEARCH_TYPES = """{
+Q_SEARCH_TYPES = """
+query($first: Int, $after: String) {
     constructionKit {
-        types(first: 200) {
+        types(first: $first, after: $after) {
+            totalCount
+            pageInfo { hasNextPage endCursor }
             edges {
                 node {
                     ckTypeId { fullName }
                     description
                     isAbstract
+                    attributes { edges { node { attributeName } } }
                 }
             }
         }
-        enums(first: 200) {
+    }
+}"""
+
+Q_SEARCH_ENUMS = """
+query($first: Int, $after: String) {
+    constructionKit {
+        enums(first: $first, after: $after) {
+            totalCount
+            pageInfo { hasNextPage endCursor }
             edges {
                 node {
                     ckEnumId { fullName }
                     description
+                    values { name }
                 }
             }
         }
     }
 }"""
 
+register_persisted_queries(globals())
+
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -142,6 +207,144 @@ def _model_prefix(full_name):
     return ""
 
 
+def _fetch_pages(context, args, query, key, max_items=None):
+    """Fetch every page of constructionKit.<key> and return (totalCount, nodes).
+
+    Pages of --page-size are requested concurrently when the server uses offset
+    cursors, sequentially otherwise. `max_items` stops after that many nodes.
+    totalCount is None if the connection resolved to null.
+    """
+    pages = fetch_all_pages(
+        context, query, {}, ("constructionKit", key),
+        tenant_override=args.tenant, verify_ssl=not args.insecure,
+        page_size=args.page_size, max_items=max_items,
+    )
+    total = pages[0].get("totalCount", "?") if pages else None
+    nodes = []
+    for page in pages:
+        nodes.extend(collect_connection(page))
+    return total, nodes
+
+
+def _write_ndjson_pages(context, args, query, key, id_key):
+    """Write constructionKit.<key> nodes (filtered by --model) as NDJSON, one page at a time.
+
+    Pages are requested sequentially, so only one page is held in memory.
+    """
+    pages = iter_connection_pages(
+        context, query, {}, ("constructionKit", key),
+        tenant_override=args.tenant, verify_ssl=not args.insecure,
+        page_size=args.page_size, max_items=args.first,
+    )
+    for page in pages:
+        for node in collect_connection(page):
+            if not args.model or _model_prefix(node[id_key]["fullName"]) == args.model:
+                write_ndjson(node)
+
+
+def _fetch_snapshot(context, args, models=None):
+    """Download models, fully expanded types, and enums into a new snapshot dict."""
+    if models is None:
+        data = graphql_query(context, Q_MODELS, tenant_override=args.tenant, verify_ssl=not args.insecure)
+        models = collect_connection(data["constructionKit"]["models"])
+    type_total, types = _fetch_pages(context, args, Q_TYPE_DETAIL, "types")
+    enum_total, enums = _fetch_pages(context, args, Q_ENUMS, "enums")
+    snapshot = _ck_cache.new_snapshot(models, types, enums, type_total, enum_total)
+    if not args.no_cache and not _ck_cache.is_complete(snapshot):
+        totals = ["?" if t is None else t for t in (type_total, enum_total)]
+        print(f"Warning: received {len(types)} of {totals[0]} types and {len(enums)} of {totals[1]} enums;"
+              " the CK snapshot is not cached.", file=sys.stderr)
+    return snapshot
+
+
+def _cached_snapshot(context, args):
+    """Return the on-disk snapshot if the cache may be used and one exists, else None."""
+    if args.no_cache or args.refresh:
+        return None
+    return _ck_cache.load_snapshot(context, args.tenant)
+
+
+def _load_ck(context, args, snapshot=None):
+    """Return the CK snapshot ({"models", "types", "enums"}) for the target tenant.
+
+    Served from the on-disk cache while it is younger than --cache-ttl. Once stale,
+    only the models are re-queried: if their versions are unchanged the snapshot is
+    re-stamped and reused, otherwise types and enums are downloaded again.
+    A download that did not return every type and enum is used but not saved.
+    `snapshot` may pass in an already loaded cache snapshot.
+    """
+    if args.no_cache:
+        return _fetch_snapshot(context, args)
+
+    if snapshot is None:
+        snapshot = _cached_snapshot(context, args)
+    if snapshot is not None:
+        if _ck_cache.is_fresh(snapshot, args.cache_ttl):
+            return snapshot
+        data = graphql_query(context, Q_MODELS, tenant_override=args.tenant, verify_ssl=not args.insecure)
+        models = collect_connection(data["constructionKit"]["models"])
+        if _ck_cache.model_fingerprint(models) == snapshot.get("fingerprint"):
+            snapshot["checkedAt"] = time.time()
+            snapshot["models"] = models
+        else:
+            snapshot = _fetch_snapshot(context, args, models)
+    else:
+        snapshot = _fetch_snapshot(context, args)
+
+    _ck_cache.save_snapshot(context, snapshot, args.tenant)
+    return snapshot
+
+
+def _match_type(types, target):
+    """Find a type by fullName or semanticVersionedFullName, then by short name."""
+    for t in types:
+        fn = t["ckTypeId"]["fullName"]
+        svfn = t["ckTypeId"].get("semanticVersionedFullName", "")
+        if fn == target or svfn == target:
+            return t
+    # Also try partial match (just the type name without model prefix)
+    for t in types:
+        fn = t["ckTypeId"]["fullName"]
+        short = fn.split("/", 1)[1] if "/" in fn else fn
+        if short == target:
+            return t
+    return None
+
+
+def _lookup_type(context, args, target):
+    """Ask the server for exactly one type via types(ckId: ...).
+
+    Returns the matching type, or None if the server rejects the ckId argument
+    or returns nothing that matches `target` (the caller then scans the full CK).
+    """
+    body = graphql_execute(context, Q_TYPE_BY_ID, variables={"ckId": target},
+                           tenant_override=args.tenant, verify_ssl=not args.insecure)
+    if body.get("errors") or not body.get("data"):
+        return None
+    types = collect_connection((body["data"].get("constructionKit") or {}).get("types"))
+    return _match_type(types, target)
+
+
+def _find_type(context, args):
+    """Resolve args.type_name to a fully expanded type.
+
+    Uses the on-disk CK snapshot when one exists (or --refresh is given). Otherwise a
+    full name is looked up server-side first, falling back to a scan of the whole CK
+    (which also populates the cache) for short names or servers without the lookup.
+    """
+    target = args.type_name
+    snapshot = _cached_snapshot(context, args)
+    if snapshot is not None or args.refresh:
+        return _match_type(_load_ck(context, args, snapshot)["types"], target)
+
+    match = None
+    if "/" in target:
+        match = _lookup_type(context, args, target)
+    if match is None:
+        match = _match_type(_load_ck(context, args)["types"], target)
+    return match
+
+
 def _group_by_model(items, name_key):
     """Group items by model prefix, extracted from their fullName."""
     groups = {}
@@ -162,6 +365,11 @@ def cmd_models(context, args):
     data = graphql_query(context, Q_MODELS, tenant_override=args.tenant, verify_ssl=not args.insecure)
     models = collect_connection(data["constructionKit"]["models"])
 
+    if args.ndjson:
+        for m in models:
+            write_ndjson(m)
+        return
+
     if args.json:
         print(json.dumps(models, indent=2))
         return
@@ -203,6 +411,10 @@ def cmd_model(context, args):
             print(f"  {m['id']['fullName']}", file=sys.stderr)
         sys.exit(1)
 
+    if args.ndjson:
+        write_ndjson(match)
+        return
+
     if args.json:
         print(json.dumps(match, indent=2))
         return
@@ -227,11 +439,11 @@ def cmd_model(context, args):
 
 
 def cmd_types(context, args):
-    first = args.first or 200
-    data = graphql_query(context, Q_TYPES % first, tenant_override=args.tenant, verify_ssl=not args.insecure)
-    conn = data["constructionKit"]["types"]
-    total = conn.get("totalCount", "?")
-    types = collect_connection(conn)
+    if args.ndjson:
+        _write_ndjson_pages(context, args, Q_TYPES, "types", "ckTypeId")
+        return
+
+    total, types = _fetch_pages(context, args, Q_TYPES, "types", max_items=args.first)
 
     # Filter by model if requested
     if args.model:
@@ -272,31 +484,18 @@ def cmd_types(context, args):
 
 
 def cmd_type(context, args):
-    data = graphql_query(context, Q_TYPE_DETAIL, tenant_override=args.tenant, verify_ssl=not args.insecure)
-    types = collect_connection(data["constructionKit"]["types"])
-
     target = args.type_name
-    match = None
-    for t in types:
-        fn = t["ckTypeId"]["fullName"]
-        svfn = t["ckTypeId"].get("semanticVersionedFullName", "")
-        if fn == target or svfn == target:
-            match = t
-            break
-    # Also try partial match (just the type name without model prefix)
-    if not match:
-        for t in types:
-            fn = t["ckTypeId"]["fullName"]
-            short = fn.split("/", 1)[1] if "/" in fn else fn
-            if short == target:
-                match = t
-                break
+    match = _find_type(context, args)
 
     if not match:
         print(f"No type found matching '{target}'.", file=sys.stderr)
         print("Use 'ck_explorer.py types' to list available types.", file=sys.stderr)
         sys.exit(1)
 
+    if args.ndjson:
+        write_ndjson(match)
+        return
+
     if args.json:
         print(json.dumps(match, indent=2))
         return
@@ -359,11 +558,11 @@ def cmd_type(context, args):
 
 
 def cmd_enums(context, args):
-    first = args.first or 200
-    data = graphql_query(context, Q_ENUMS % first, tenant_override=args.tenant, verify_ssl=not args.insecure)
-    conn = data["constructionKit"]["enums"]
-    total = conn.get("totalCount", "?")
-    enums = collect_connection(conn)
+    if args.ndjson:
+        _write_ndjson_pages(context, args, Q_ENUMS, "enums", "ckEnumId")
+        return
+
+    total, enums = _fetch_pages(context, args, Q_ENUMS, "enums", max_items=args.first)
 
     # Filter by model if requested
     if args.model:
@@ -402,8 +601,7 @@ def cmd_enums(context, args):
 
 
 def cmd_enum(context, args):
-    data = graphql_query(context, Q_ENUMS % 200, tenant_override=args.tenant, verify_ssl=not args.insecure)
-    enums = collect_connection(data["constructionKit"]["enums"])
+    enums = _load_ck(context, args)["enums"]
 
     target = args.enum_name
     match = None
@@ -426,6 +624,10 @@ def cmd_enum(context, args):
         print("Use 'ck_explorer.py enums' to list available enums.", file=sys.stderr)
         sys.exit(1)
 
+    if args.ndjson:
+        write_ndjson(match)
+        return
+
     if args.json:
         print(json.dumps(match, indent=2))
         return
@@ -448,21 +650,35 @@ def cmd_enum(context, args):
 
 
 def cmd_search(context, args):
-    data = graphql_query(context, Q_SEARCH_TYPES, tenant_override=args.tenant, verify_ssl=not args.insecure)
-    types = collect_connection(data["constructionKit"]["types"])
-    enums = collect_connection(data["constructionKit"]["enums"])
-
-    term = args.search_term.lower()
-
-    matched_types = [t for t in types if term in t["ckTypeId"]["fullName"].lower()
-                     or (t.get("description") and term in t["description"].lower())]
-    matched_enums = [e for e in enums if term in e["ckEnumId"]["fullName"].lower()
-                     or (e.get("description") and term in e["description"].lower())]
+    if args.no_cache:
+        _, types = _fetch_pages(context, args, Q_SEARCH_TYPES, "types")
+        _, enums = _fetch_pages(context, args, Q_SEARCH_ENUMS, "enums")
+        index = _ck_index.build_index(types, enums)
+    else:
+        snapshot = _load_ck(context, args)
+        types = snapshot["types"]
+        enums = snapshot["enums"]
+        index = _ck_index.load_or_build(context, snapshot, args.tenant)
+
+    # Ranked hits; reasons say which field matched (name, attribute X, value X, description)
+    matched_types, matched_enums = [], []
+    reasons = {}
+    for kind, pos, _score, why in _ck_index.search(index, args.search_term):
+        item = types[pos] if kind == "type" else enums[pos]
+        (matched_types if kind == "type" else matched_enums).append(item)
+        reasons[id(item)] = [r for r in why if r != "name"]
 
     if args.first:
         matched_types = matched_types[:args.first]
         matched_enums = matched_enums[:args.first]
 
+    if args.ndjson:
+        for t in matched_types:
+            write_ndjson({"kind": "type", **t})
+        for e in matched_enums:
+            write_ndjson({"kind": "enum", **e})
+        return
+
     if args.json:
         print(json.dumps({"types": matched_types, "enums": matched_enums}, indent=2))
         return
@@ -479,36 +695,23 @@ def cmd_search(context, args):
             if t.get("isAbstract"):
                 flags.append("abstract")
             flag_str = f" ({', '.join(flags)})" if flags else ""
-            print(f"  {fn}{flag_str}")
+            why = reasons[id(t)]
+            why_str = f"  [{', '.join(why)}]" if why else ""
+            print(f"  {fn}{flag_str}{why_str}")
         print()
 
     if matched_enums:
         print(f"Enums matching '{args.search_term}' ({len(matched_enums)}):")
         for e in matched_enums:
             fn = e["ckEnumId"]["fullName"]
-            print(f"  {fn}")
+            why = reasons[id(e)]
+            why_str = f"  [{', '.join(why)}]" if why else ""
+            print(f"  {fn}{why_str}")
 
 
 def cmd_preflight(context, args):
-    data = graphql_query(context, Q_TYPE_DETAIL, tenant_override=args.tenant, verify_ssl=not args.insecure)
-    types = collect_connection(data["constructionKit"]["types"])
-
     target = args.type_name
-    match = None
-    for t in types:
-        fn = t["ckTypeId"]["fullName"]
-        svfn = t["ckTypeId"].get("semanticVersionedFullName", "")
-        if fn == target or svfn == target:
-            match = t
-            break
-    # Also try partial match (just the type name without model prefix)
-    if not match:
-        for t in types:
-            fn = t["ckTypeId"]["fullName"]
-            short = fn.split("/", 1)[1] if "/" in fn else fn
-            if short == target:
-                match = t
-                break
+    match = _find_type(context, args)
 
     if not match:
         print(f"No type found matching '{target}'.", file=sys.stderr)
@@ -550,19 +753,22 @@ def cmd_preflight(context, args):
     ck_type_unversioned = match["ckTypeId"].get("semanticVersionedFullName", "")
 
     if args.for_import:
-        _print_import_template(match, attr_list, assoc_list, ck_type_unversioned, display_name, args.json)
+        _print_import_template(match, attr_list, assoc_list, ck_type_unversioned, display_name, args.json, args.ndjson)
         return
 
     mandatory = [a for a in assoc_list if a["isMandatory"]]
 
-    if args.json:
+    if args.json or args.ndjson:
         result = {
             "ckTypeId": match["ckTypeId"]["fullName"],
             "semanticVersionedFullName": ck_type_unversioned,
             "attributes": attr_list,
             "mandatoryAssociations": mandatory,
         }
-        print(json.dumps(result, indent=2))
+        if args.ndjson:
+            write_ndjson(result)
+        else:
+            print(json.dumps(result, indent=2))
         return
 
     print(f"Pre-flight for {display_name}:")
@@ -627,7 +833,7 @@ def _model_dep_range(full_name):
     return f"{model_name}-[{major}.0,{major + 1}.0)"
 
 
-def _print_import_template(match, attr_list, assoc_list, ck_type_unversioned, display_name, as_json):
+def _print_import_template(match, attr_list, assoc_list, ck_type_unversioned, display_name, as_json, as_ndjson=False):
     """Generate an ImportRt YAML template for the given type."""
     # Determine import-format IDs from fullName
     type_full = match["ckTypeId"]["fullName"]
@@ -661,14 +867,17 @@ def _print_import_template(match, attr_list, assoc_list, ck_type_unversioned, di
             "isMandatory": a["isMandatory"],
         })
 
-    if as_json:
+    if as_json or as_ndjson:
         result = {
             "ckTypeId": ck_type_import,
             "modelDependency": model_dep,
             "attributes": attr_entries,
             "associations": assoc_entries,
         }
-        print(json.dumps(result, indent=2))
+        if as_ndjson:
+            write_ndjson(result)
+        else:
+            print(json.dumps(result, indent=2))
         return
 
     # Print YAML template
@@ -729,19 +938,32 @@ def _example_value(vtype):
 
 def main():
     parser = argparse.ArgumentParser(description="OctoMesh Construction Kit schema explorer")
+    _octo_profile.add_flag(parser)
 
     sub = parser.add_subparsers(dest="command")
 
     # Shared flags added to each subparser so they work in any position
-    def add_common_flags(p, with_first=False, with_model=False):
-        p.add_argument("--json", action="store_true", help="Output raw JSON")
-        p.add_argument("--tenant", type=str, default=None, help="Override tenant ID")
-        p.add_argument("--insecure", action="store_true",
-                       help="Disable SSL certificate verification (for localhost dev)")
+    def add_common_flags(p, with_first=False, with_model=False, with_cache=False, with_page_size=False):
+        output = p.add_mutually_exclusive_group()
+        output.add_argument("--json", action="store_true", help="Output raw JSON")
+        output.add_argument("--ndjson", action="store_true",
+                            help="Output one compact JSON object per line")
+        add_client_flags(p)
         if with_first:
-            p.add_argument("--first", type=int, default=None, help="Pagination limit")
+            p.add_argument("--first", type=positive_int, default=None, help="Pagination limit")
         if with_model:
             p.add_argument("--model", type=str, default=None, help="Filter by model fullName")
+        if with_page_size:
+            p.add_argument("--page-size", type=positive_int, default=DEFAULT_PAGE_SIZE, dest="page_size",
+                           help=f"Types/enums fetched per request (default {DEFAULT_PAGE_SIZE})")
+        if with_cache:
+            cache = p.add_mutually_exclusive_group()
+            cache.add_argument("--refresh", action="store_true",
+                               help="Re-download the CK snapshot instead of using the on-disk cache")
+            cache.add_argument("--no-cache", action="store_true", dest="no_cache",
+                               help="Query the server directly; do not read or write the cache")
+            p.add_argument("--cache-ttl", type=int, default=_ck_cache.DEFAULT_TTL, dest="cache_ttl",
+                           help=f"Seconds before the cached model set is re-checked (default {_ck_cache.DEFAULT_TTL})")
 
     p_models = sub.add_parser("models", help="List all CK models")
     add_common_flags(p_models)
@@ -751,28 +973,28 @@ def main():
     add_common_flags(p_model)
 
     p_types = sub.add_parser("types", help="List all types")
-    add_common_flags(p_types, with_first=True, with_model=True)
+    add_common_flags(p_types, with_first=True, with_model=True, with_page_size=True)
 
     p_type = sub.add_parser("type", help="Show detail for a specific type")
     p_type.add_argument("type_name", help="Type fullName (e.g. System-2.0.2/Entity-1)")
-    add_common_flags(p_type)
+    add_common_flags(p_type, with_cache=True, with_page_size=True)
 
     p_enums = sub.add_parser("enums", help="List all enums")
-    add_common_flags(p_enums, with_first=True, with_model=True)
+    add_common_flags(p_enums, with_first=True, with_model=True, with_page_size=True)
 
     p_enum = sub.add_parser("enum", help="Show detail for a specific enum")
     p_enum.add_argument("enum_name", help="Enum fullName (e.g. System-2.0.2/AggregationTypes-1)")
-    add_common_flags(p_enum)
+    add_common_flags(p_enum, with_cache=True, with_page_size=True)
 
-    p_search = sub.add_parser("search", help="Search type and enum names")
-    p_search.add_argument("search_term", help="Search term (case-insensitive)")
-    add_common_flags(p_search, with_first=True)
+    p_search = sub.add_parser("search", help="Ranked search over type, attribute, enum and enum value names")
+    p_search.add_argument("search_term", help="Search terms (case-insensitive, all must match; typos tolerated)")
+    add_common_flags(p_search, with_first=True, with_cache=True, with_page_size=True)
 
     p_preflight = sub.add_parser("preflight", help="Pre-flight check for pipeline authoring: attributes and mandatory associations")
     p_preflight.add_argument("type_name", help="Type fullName or semanticVersionedFullName")
     p_preflight.add_argument("--for-import", action="store_true", dest="for_import",
                              help="Output an ImportRt YAML template with full CK attribute IDs")
-    add_common_flags(p_preflight)
+    add_common_flags(p_preflight, with_cache=True, with_page_size=True)
 
     args = parser.parse_args()
 
@@ -780,8 +1002,6 @@ def main():
         parser.print_help()
         sys.exit(1)
 
-    context = load_context()
-
     commands = {
         "models": cmd_models,
         "model": cmd_model,
@@ -792,8 +1012,9 @@ def main():
         "search": cmd_search,
         "preflight": cmd_preflight,
     }
-    commands[args.command](context, args)
+
+    run_cli(args, commands[args.command])
 
 
 if __name__ == "__main__":
-    main()
+    _octo_profile.run(main, _IMPORT_START)
@@ -7,13 +7,18 @@ Usage:
     python gql_introspect.py top [--json] [--tenant ID]
     python gql_introspect.py type <TypeName> [--json] [--tenant ID]
 """
+import time
+
+_IMPORT_START = time.perf_counter()  # before other imports, for --profile
+
 import argparse
 import json
 import sys
 import os
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-from _octo_common import load_context, graphql_query
+import _octo_profile
+from _octo_common import graphql_query, add_client_flags, run_cli
 
 
 def cmd_top(context, args):
@@ -96,21 +101,18 @@ def _format_type(t):
 
 def main():
     parser = argparse.ArgumentParser(description="OctoMesh GraphQL schema introspection")
+    _octo_profile.add_flag(parser)
 
     sub = parser.add_subparsers(dest="command")
 
     top_cmd = sub.add_parser("top", help="Show top-level query fields")
     top_cmd.add_argument("--json", action="store_true", help="Output raw JSON")
-    top_cmd.add_argument("--tenant", type=str, default=None, help="Override tenant ID")
-    top_cmd.add_argument("--insecure", action="store_true",
-                         help="Disable SSL certificate verification (for localhost dev)")
+    add_client_flags(top_cmd)
 
     type_cmd = sub.add_parser("type", help="Show fields of a GraphQL type")
     type_cmd.add_argument("type_name", help="GraphQL type name (case-sensitive)")
     type_cmd.add_argument("--json", action="store_true", help="Output raw JSON")
-    type_cmd.add_argument("--tenant", type=str, default=None, help="Override tenant ID")
-    type_cmd.add_argument("--insecure", action="store_true",
-                         help="Disable SSL certificate verification (for localhost dev)")
+    add_client_flags(type_cmd)
 
     args = parser.parse_args()
 
@@ -118,13 +120,10 @@ def main():
         parser.print_help()
         sys.exit(1)
 
-    context = load_context()
+    commands = {"top": cmd_top, "type": cmd_type}
 
-    if args.command == "top":
-        cmd_top(context, args)
-    elif args.command == "type":
-        cmd_type(context, args)
+    run_cli(args, commands[args.command])
 
 
 if __name__ == "__main__":
-    main()
+    _octo_profile.run(main, _IMPORT_START)
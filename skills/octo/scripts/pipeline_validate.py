@@ -11,6 +11,10 @@ Checks:
   - Recursively validates nested transformations (ForEach, For, If, Switch, BufferData)
 """
 
+import time
+
+_IMPORT_START = time.perf_counter()  # before other imports, for --profile
+
 import argparse
 import json
 import os
@@ -20,6 +24,7 @@ import tempfile
 
 # Allow importing _octo_common from the same directory
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import _octo_profile
 
 try:
     import yaml
@@ -254,6 +259,7 @@ def main():
         "--insecure", action="store_true",
         help="Skip TLS verification when fetching schema from adapter",
     )
+    _octo_profile.add_flag(parser)
 
     args = parser.parse_args()
 
@@ -283,4 +289,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    _octo_profile.run(main, _IMPORT_START)
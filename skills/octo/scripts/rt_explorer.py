@@ -3,20 +3,83 @@
 Explore runtime entities (instances of CK types) via the GraphQL runtime API.
 
 Usage:
-    python rt_explorer.py list <ckId> [--attrs] [--sort attr:asc|desc] [--first N] [--json] [--tenant ID]
-    python rt_explorer.py get <ckId> <rtId> [--json] [--tenant ID]
-    python rt_explorer.py count <ckId> [--json] [--tenant ID]
-    python rt_explorer.py search <ckId> <term> [--attr name] [--sort attr:asc|desc] [--first N] [--json] [--tenant ID]
-    python rt_explorer.py query <ckId> --columns c1,c2 [--sort attr:asc|desc] [--first N] [--json] [--tenant ID]
-    python rt_explorer.py filter <ckId> <attr> <op> <val> [--sort attr:asc|desc] [--first N] [--json] [--tenant ID]
+    python rt_explorer.py list <ckId> [--attrs] [--sort attr:asc|desc] [--first N] [--all | --max N] [--json | --ndjson] [--tenant ID]
+    python rt_explorer.py get <ckId> <rtId> [--json | --ndjson] [--tenant ID]
+    python rt_explorer.py get <ckId> <rtId> [<rtId> ...] [--ids-from FILE|-] [--parallel N] [--batch-size N] [--json | --ndjson] [--tenant ID]
+    python rt_explorer.py count <ckId> [<ckId> ...] [--json | --ndjson] [--tenant ID]
+    python rt_explorer.py count --model <model> [--parallel N] [--batch-size N] [--json | --ndjson] [--tenant ID]
+    python rt_explorer.py search <ckId> <term> [--attr name] [--where attr op val ...] [--sort attr:asc|desc] [--first N] [--all | --max N] [--json | --ndjson] [--tenant ID]
+    python rt_explorer.py query <ckId> --columns c1,c2 [--where attr op val ...] [--sort attr:asc|desc] [--first N] [--all | --max N] [--json | --ndjson] [--tenant ID]
+    python rt_explorer.py query <ckId> --columns c1,c2 --format csv|parquet|arrow [--out FILE] [--max N] [--tenant ID]
+    python rt_explorer.py filter <ckId> <attr> <op> <val> [--sort attr:asc|desc] [--first N] [--all | --max N] [--json | --ndjson] [--tenant ID]
+    python rt_explorer.py filter <ckId> --where <attr> <op> <val> [--where ...] [--sort attr:asc|desc] [--first N] [--all | --max N] [--json | --ndjson] [--tenant ID]
+    python rt_explorer.py export <ckId> --out FILE [--where attr op val ...] [--checkpoint FILE] [--resume] [--page-size N] [--sort attr:asc|desc] [--tenant ID]
+    python rt_explorer.py export <ckId> --out FILE --shards N [--shard-key rtId|attr] [--parallel N] [--where attr op val ...] [--resume] [--tenant ID]
+
+With --all (or --max N), list/search/filter/query follow the result cursor page by
+page and print entities (query: rows) as they arrive; --first then sets the page size.
+
+--ndjson writes one compact JSON object per entity (per row for query) as each page
+is decoded, so output can be piped to jq or a log shipper with constant memory.
+
+count accepts several ckIds, or --model to count every concrete type of a CK model
+(by name, e.g. Industry.Basic, or fullName, e.g. Industry.Basic-2.1.0). Counts are
+sent as aliased batches of --batch-size, with up to --parallel batches in flight.
+
+get accepts several rtIds, and --ids-from reads more from a file ('-' for stdin;
+whitespace- or comma-separated, '#' starts a comment). They are resolved with one
+rtId IN [...] filter per --batch-size IDs and printed as each batch returns; IDs
+that were not found are listed on stderr.
+
+filter, search, query, and export accept repeated --where ATTR OP VALUE clauses;
+all of them (with filter's positional condition or search's LIKE term) are sent
+in one fieldFilter, so only matching rows cross the wire. IN and NOT_IN take
+comma-separated values or a JSON list, e.g. --where state IN 1,2 or
+--where name IN '["Pump A", "Pump B"]'.
+
+query --format writes the rows as CSV, Parquet, or an Arrow IPC file, typed from
+the columns' attributeValueType, one row group per page. Parquet and Arrow need
+pyarrow; CSV can go to stdout. --format pages through every row unless --max is given.
+
+export writes every instance of a type to an NDJSON file page by page. After each
+page it records the endCursor, row count, and byte offset in a checkpoint file
+(FILE.checkpoint by default); --resume continues from there after a crash, Ctrl-C,
+or an expired login, first cutting off any partially written page. Rows/s and an
+ETA are reported on stderr.
+
+With --shards N, export finds the smallest and largest --shard-key (rtId by default,
+or a numeric or timestamp attribute), splits that range into N GREATER_EQUAL_THAN /
+LESS_THAN filters, and exports up to --parallel shards at once into FILE.partNNN
+files, each sorted by the key with its own checkpoint. The parts are then merged
+in key order, so the output does not depend on which shard finished first.
+
 """
+import time
+
+_IMPORT_START = time.perf_counter()  # before other imports, for --profile
+
 import argparse
+import itertools
 import json
+import re
 import sys
 import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-from _octo_common import load_context, graphql_query, collect_connection
+import _octo_profile
+from _octo_common import (
+    graphql_query, graphql_batch, collect_connection, iter_connection_pages,
+    fetch_all_pages, ensure_pool_size, write_ndjson, DEFAULT_PAGE_SIZE,
+    OctoError, GraphQLError, add_client_flags, run_cli,
+    register_persisted_queries, positive_int,
+)
+import _ck_cache
+import _columnar
 
 
 # ---------------------------------------------------------------------------
@@ -77,6 +140,22 @@ query($ckId: String!, $rtId: OctoObjectId!) {
   }
 }"""
 
+# Same selection as Q_GET, for many rtIds at once via an rtId IN fieldFilter
+Q_GET_MANY = """
+query($ckId: String!, $first: Int, $fieldFilter: [FieldFilter]) {
+  runtime {
+    runtimeEntities(ckId: $ckId, first: $first, fieldFilter: $fieldFilter) {
+      edges { node {
+        rtId ckTypeId rtWellKnownName rtCreationDateTime rtChangedDateTime rtVersion
+        attributes { items { attributeName value } }
+        associations { definitions(direction: OUTBOUND) {
+          items { ckAssociationRoleId targetRtId targetCkTypeId }
+        } }
+      } }
+    }
+  }
+}"""
+
 Q_COUNT = """
 query($ckId: String!) {
   runtime {
@@ -84,6 +163,17 @@ query($ckId: String!) {
   }
 }"""
 
+Q_CK_TYPES = """
+query($first: Int, $after: String) {
+  constructionKit {
+    types(first: $first, after: $after) {
+      totalCount
+      pageInfo { hasNextPage endCursor }
+      edges { node { ckTypeId { fullName } isAbstract } }
+    }
+  }
+}"""
+
 Q_SEARCH = """
 query($ckId: String!, $first: Int, $after: String, $sortOrder: [Sort], $fieldFilter: [FieldFilter]) {
   runtime {
@@ -127,6 +217,26 @@ query($ckId: String!, $columnPaths: [String!]!, $first: Int, $sortOrder: [Sort],
   }
 }"""
 
+# Cursor-paged variant, only used with --all/--max/--format: not every server
+# version supports $after and pageInfo on transient queries.
+Q_QUERY_PAGED = """
+query($ckId: String!, $columnPaths: [String!]!, $first: Int, $after: String, $sortOrder: [Sort], $fieldFilter: [FieldFilter]) {
+  runtime {
+    transientQuery {
+      simple(ckId: $ckId, columnPaths: $columnPaths, first: $first, after: $after, sortOrder: $sortOrder, fieldFilter: $fieldFilter) {
+        totalCount
+        pageInfo { hasNextPage endCursor }
+        items {
+          columns { attributePath attributeValueType }
+          rows { items { cells { items { attributePath value } } } }
+        }
+      }
+    }
+  }
+}"""
+
+register_persisted_queries(globals())
+
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -189,38 +299,685 @@ def _build_field_filter(attribute, operator, value):
     return [{"attributePath": attribute, "operator": operator, "comparisonValue": value}]
 
 
+# Operators whose comparison value is a list, and those that compare against text as is.
+LIST_OPERATORS = ("IN", "NOT_IN")
+TEXT_OPERATORS = ("LIKE", "MATCH_REG_EX", "ANY_LIKE")
+
+
+def _parse_filter_value(operator, value_str):
+    """Parse a CLI comparison value for `operator`.
+
+    IN / NOT_IN take a JSON list ('["a", 2]') or comma-separated values ('a,2'),
+    each coerced like a single value; LIKE and regex operators keep the text.
+    """
+    if operator in LIST_OPERATORS:
+        if value_str.lstrip().startswith("["):
+            try:
+                values = json.loads(value_str)
+            except ValueError as e:
+                print(f"Error: invalid JSON list for {operator}: {e}", file=sys.stderr)
+                sys.exit(1)
+            if not isinstance(values, list):
+                print(f"Error: {operator} needs a list of values.", file=sys.stderr)
+                sys.exit(1)
+            return values
+        return [_coerce_value(v.strip()) for v in value_str.split(",") if v.strip()]
+    if operator in TEXT_OPERATORS:
+        return value_str
+    return _coerce_value(value_str)
+
+
+def _where_filters(args):
+    """fieldFilter clauses for the repeated --where ATTR OP VALUE options."""
+    clauses = []
+    for attr, op, value in args.where or []:
+        op = op.upper()
+        if op not in FILTER_OPERATORS:
+            print(f"Error: unknown operator '{op}' in --where (use one of {', '.join(FILTER_OPERATORS)}).",
+                  file=sys.stderr)
+            sys.exit(1)
+        clauses.extend(_build_field_filter(attr, op, _parse_filter_value(op, value)))
+    return clauses
+
+
+def _describe_filter(field_filter):
+    """'state EQUALS 2 and name LIKE pump' for headings and messages."""
+    def value(v):
+        return ",".join(str(x) for x in v) if isinstance(v, list) else str(v)
+    return " and ".join(f"{c['attributePath']} {c['operator']} {value(c['comparisonValue'])}" for c in field_filter)
+
+
+def _to_rt_ck_id(full_name):
+    """Strip model and type versions: 'Industry.Basic-2.1.0/Machine-1' -> 'Industry.Basic/Machine'."""
+    if "/" not in full_name:
+        return full_name
+    model_part, type_part = full_name.split("/", 1)
+    model_part = re.sub(r"-\d+(\.\d+)*$", "", model_part)
+    type_part = re.sub(r"-\d+$", "", type_part)
+    return f"{model_part}/{type_part}"
+
+
+def _model_ck_ids(context, args):
+    """Return the runtime ckIds of every concrete type in --model, sorted.
+
+    Uses the ck_explorer CK snapshot when it is fresh, otherwise pages through
+    the type list. The model matches by fullName (with version) or by name.
+    """
+    snapshot = _ck_cache.load_snapshot(context, args.tenant)
+    if snapshot is not None and _ck_cache.is_fresh(snapshot):
+        types = snapshot["types"]
+    else:
+        pages = fetch_all_pages(context, Q_CK_TYPES, {}, ("constructionKit", "types"),
+                                tenant_override=args.tenant, verify_ssl=not args.insecure)
+        types = [t for page in pages for t in collect_connection(page)]
+
+    ck_ids = set()
+    for t in types:
+        if t.get("isAbstract"):
+            continue
+        full_name = t["ckTypeId"]["fullName"]
+        model = full_name.rsplit("/", 1)[0] if "/" in full_name else ""
+        if args.model in (model, re.sub(r"-\d+(\.\d+)*$", "", model)):
+            ck_ids.add(_to_rt_ck_id(full_name))
+    return sorted(ck_ids)
+
+
+def _count_many(context, args, ck_ids):
+    """Count instances of many types concurrently.
+
+    ckIds are grouped into aliased batches of --batch-size (one round trip each),
+    and up to --parallel batches run at once over the shared connection pool.
+    Returns one {"ckId", "totalCount"} dict per ckId, in order; types that cannot
+    be counted get totalCount None and an "error" message.
+    """
+    verify_ssl = not args.insecure
+    chunks = [ck_ids[i:i + args.batch_size] for i in range(0, len(ck_ids), args.batch_size)]
+    ensure_pool_size(context, args.parallel, tenant_override=args.tenant, verify_ssl=verify_ssl)
+
+    def run(chunk):
+        return graphql_batch(context, [(Q_COUNT, {"ckId": ck_id}) for ck_id in chunk],
+                             tenant_override=args.tenant, verify_ssl=verify_ssl, batch_size=len(chunk))
+
+    with ThreadPoolExecutor(max_workers=args.parallel) as pool:
+        results = [r for chunk_results in pool.map(run, chunks) for r in chunk_results]
+
+    rows = []
+    for ck_id, result in zip(ck_ids, results):
+        conn = ((result["data"] or {}).get("runtime") or {}).get("runtimeEntities")
+        if conn is None:
+            messages = [e.get("message", str(e)) for e in result["errors"]]
+            error = "; ".join(messages) or "type may be abstract or invalid"
+            rows.append({"ckId": ck_id, "totalCount": None, "error": error})
+        else:
+            rows.append({"ckId": ck_id, "totalCount": conn["totalCount"]})
+    return rows
+
+
+_RT_ID_RE = re.compile(r"^[0-9a-fA-F]{24}$")
+
+
+def _read_rt_ids(args):
+    """Collect rtIds from the command line and --ids-from, de-duplicated in order."""
+    ids = list(args.rtIds)
+    if args.ids_from:
+        if args.ids_from == "-":
+            text = sys.stdin.read()
+        else:
+            try:
+                with open(args.ids_from) as f:
+                    text = f.read()
+            except OSError as e:
+                print(f"Error: cannot read {args.ids_from}: {e}", file=sys.stderr)
+                sys.exit(1)
+        for line in text.splitlines():
+            ids.extend(t for t in re.split(r"[\s,]+", line.split("#", 1)[0]) if t)
+    return list(dict.fromkeys(ids))
+
+
+def _iter_get_many(context, args, rt_ids):
+    """Resolve rtIds in concurrent batches; yield (requested ids, found entities) per batch, in order."""
+    verify_ssl = not args.insecure
+    chunks = [rt_ids[i:i + args.batch_size] for i in range(0, len(rt_ids), args.batch_size)]
+    ensure_pool_size(context, args.parallel, tenant_override=args.tenant, verify_ssl=verify_ssl)
+
+    def run(chunk):
+        variables = {
+            "ckId": args.ckId,
+            "first": len(chunk),
+            "fieldFilter": _build_field_filter("rtId", "IN", chunk),
+        }
+        data = graphql_query(context, Q_GET_MANY, variables=variables,
+                             tenant_override=args.tenant, verify_ssl=verify_ssl)
+        conn = data.get("runtime", {}).get("runtimeEntities")
+        if conn is None:
+            # Raised, not exited: this runs in the pool workers, and run_cli reports it.
+            raise OctoError(f"could not query '{args.ckId}' (type may be abstract or invalid).")
+        return chunk, collect_connection(conn)
+
+    with ThreadPoolExecutor(max_workers=args.parallel) as pool:
+        yield from pool.map(run, chunks)
+
+
+def _is_paging(args):
+    """True if --all or --max was given, i.e. the cursor should be followed."""
+    return args.all or args.max is not None
+
+
+def _entity_pages(context, args, query, variables, action,
+                  path=("runtime", "runtimeEntities"), count_nodes=None):
+    """Yield runtimeEntities connection pages for list/search/filter.
+
+    Without --all/--max a single page of --first (default 50) entities is fetched.
+    With --all the endCursor is followed until the result set is exhausted, with
+    --max N it stops after N entities; --first is then the page size.
+    `path` and `count_nodes` select another connection, e.g. transientQuery rows.
+    Exits with an error if the type cannot be queried.
+    """
+    if _is_paging(args):
+        page_size = args.first or DEFAULT_PAGE_SIZE
+        max_items = args.max
+    else:
+        page_size = args.first or 50
+        max_items = page_size
+
+    pages = iter_connection_pages(
+        context, query, variables, path,
+        tenant_override=args.tenant, verify_ssl=not args.insecure,
+        page_size=page_size, max_items=max_items, count_nodes=count_nodes,
+    )
+    first_page = next(pages, None)
+    if first_page is None:
+        print(f"Error: could not {action} '{args.ckId}' (type may be abstract or invalid).", file=sys.stderr)
+        sys.exit(1)
+    yield first_page
+    yield from pages
+
+
+def _iter_entities(first_page, pages):
+    """Yield entity nodes from the first page and then every following page."""
+    yield from collect_connection(first_page)
+    for page in pages:
+        yield from collect_connection(page)
+
+
+def _write_ndjson_pages(first_page, pages):
+    """Write one NDJSON line per entity, flushing after each page."""
+    for page in itertools.chain([first_page], pages):
+        for e in collect_connection(page):
+            write_ndjson(e)
+        sys.stdout.flush()
+
+
+def _row_to_dict(row):
+    """Convert a transient query row ({cells: {items: [...]}}) to {attributePath: value}."""
+    cells = (row.get("cells") or {}).get("items") or []
+    return {cell.get("attributePath"): cell.get("value") for cell in cells}
+
+
+def _iter_rows(result):
+    """Yield the rows of every result set in a transientQuery page."""
+    for item in result.get("items") or []:
+        yield from (item.get("rows") or {}).get("items") or []
+
+
+def _count_rows(result):
+    return sum(len((item.get("rows") or {}).get("items") or []) for item in result.get("items") or [])
+
+
+def _merge_items(results):
+    """Concatenate the rows of each result set across transientQuery pages."""
+    merged = []
+    for result in results:
+        for i, item in enumerate(result.get("items") or []):
+            rows = (item.get("rows") or {}).get("items") or []
+            if i < len(merged):
+                merged[i]["rows"]["items"].extend(rows)
+            else:
+                merged.append(dict(item, rows={"items": list(rows)}))
+    return merged
+
+
+def _write_columnar(args, results):
+    """Write transientQuery result pages with a _columnar writer, one batch per page.
+
+    The column list is taken from the first result item; cells are matched to it
+    by attributePath, so a missing cell becomes null. A later item with other
+    columns raises OctoError rather than losing its values. Progress goes to
+    stderr when writing to a file.
+    """
+    writer = None
+    rows_written = 0
+    try:
+        for result in results:
+            for item in result.get("items") or []:
+                item_columns = [(c.get("attributePath"), c.get("attributeValueType"))
+                                for c in item.get("columns") or []]
+                if writer is None:
+                    columns = item_columns
+                    writer = _columnar.open_writer(args.format, args.out, columns)
+                    paths = [path for path, _ in columns]
+                elif item_columns != columns:
+                    raise OctoError(
+                        f"a result set has columns {', '.join(f'{p}:{t}' for p, t in item_columns)}"
+                        f" but the output was started with {', '.join(f'{p}:{t}' for p, t in columns)}.",
+                        hint=f"--format {args.format} needs one set of columns; query them separately.")
+                rows = [_row_to_dict(row) for row in (item.get("rows") or {}).get("items") or []]
+                writer.write_rows([[row.get(path) for path in paths] for row in rows])
+                rows_written += len(rows)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if writer is None:
+        print(f"No results for transient query on '{args.ckId}'.", file=sys.stderr)
+    elif args.out and args.out != "-":
+        print(f"Wrote {rows_written:,} rows to {args.out} ({args.format}).", file=sys.stderr)
+
+
+def _print_more_hint(args, first_page):
+    """Point at --all/--max when a single page was shown and more results exist."""
+    page = first_page.get("pageInfo") or {}
+    if not _is_paging(args) and page.get("hasNextPage"):
+        print()
+        print("  ... more results available (use --all or --max N to page through them)")
+
+
+# ---------------------------------------------------------------------------
+# Export
+# ---------------------------------------------------------------------------
+
+# Bump when the checkpoint layout changes so old checkpoints are rejected.
+CHECKPOINT_VERSION = 1
+
+# Seconds between progress lines when stderr is not a terminal.
+PROGRESS_INTERVAL = 10.0
+
+
+def _load_checkpoint(path):
+    """Read an export checkpoint, or None if there is none."""
+    try:
+        with open(path) as f:
+            checkpoint = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"Error: cannot read checkpoint {path}: {e}", file=sys.stderr)
+        sys.exit(1)
+    if not isinstance(checkpoint, dict) or checkpoint.get("version") != CHECKPOINT_VERSION:
+        print(f"Error: {path} is not an export checkpoint of this version.", file=sys.stderr)
+        sys.exit(1)
+    return checkpoint
+
+
+def _save_checkpoint(path, checkpoint):
+    """Atomically replace the checkpoint file, so a crash leaves the old or the new one."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(checkpoint, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _format_duration(seconds):
+    seconds = int(seconds)
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+class _Progress:
+    """Rows done, throughput, and ETA on stderr for long exports.
+
+    Redraws one line on a terminal, otherwise prints a line every PROGRESS_INTERVAL
+    seconds. Throughput counts only rows fetched by this run, not resumed ones.
+    Safe to update from several shard workers; with fixed_total the pages'
+    totalCount (a shard's, not the export's) is ignored.
+    """
+
+    def __init__(self, label, done=0, total=None, fixed_total=False):
+        self.label = label
+        self.done = done
+        self.total = total
+        self._fixed_total = fixed_total
+        self._initial = done
+        self._start = time.perf_counter()
+        self._last = 0.0
+        self._tty = sys.stderr.isatty()
+        self._lock = threading.Lock()
+
+    def update(self, rows, total=None):
+        with self._lock:
+            self.done += rows
+            if total is not None and not self._fixed_total:
+                self.total = total
+            now = time.perf_counter()
+            if self._tty or now - self._last >= PROGRESS_INTERVAL:
+                self._last = now
+                self._print(end="\r" if self._tty else "\n")
+
+    def finish(self):
+        self._print(end="\n")
+
+    def _print(self, end):
+        elapsed = time.perf_counter() - self._start
+        rate = (self.done - self._initial) / elapsed if elapsed > 0 else 0.0
+        line = f"{self.label}: {self.done:,}"
+        if self.total:
+            line += f"/{self.total:,} rows ({self.done * 100 // max(self.total, 1)}%)"
+        else:
+            line += " rows"
+        line += f"  {rate:,.0f} rows/s  elapsed {_format_duration(elapsed)}"
+        if self.total and rate > 0 and self.done < self.total:
+            line += f"  ETA {_format_duration((self.total - self.done) / rate)}"
+        print(line.ljust(100) if self._tty else line, end=end, file=sys.stderr, flush=True)
+
+
+def _export_pages(context, args, out, checkpoint, checkpoint_path, progress, stop=None):
+    """Append entity pages to `out`, saving the checkpoint after each page.
+
+    Each page is written and fsync'd before the checkpoint records its endCursor,
+    row count, and byte offset, so the checkpoint never points past data on disk.
+    Returns early, with the checkpoint incomplete, once `stop` is set.
+    """
+    variables = {"ckId": args.ckId}
+    if checkpoint.get("sort"):
+        variables["sortOrder"] = checkpoint["sort"]
+    if checkpoint.get("where"):
+        variables["fieldFilter"] = checkpoint["where"]
+
+    pages = iter_connection_pages(
+        context, Q_FILTER, variables, ("runtime", "runtimeEntities"),
+        tenant_override=args.tenant, verify_ssl=not args.insecure,
+        page_size=args.page_size, after=checkpoint.get("endCursor"),
+    )
+    for page in pages:
+        if stop is not None and stop.is_set():
+            return checkpoint
+        entities = collect_connection(page)
+        out.write("".join(json.dumps(e, separators=(",", ":")) + "\n" for e in entities).encode("utf-8"))
+        out.flush()
+        os.fsync(out.fileno())
+
+        info = page.get("pageInfo") or {}
+        checkpoint["rows"] += len(entities)
+        checkpoint["bytes"] = out.tell()
+        checkpoint["totalCount"] = page.get("totalCount")
+        checkpoint["endCursor"] = info.get("endCursor") or checkpoint.get("endCursor")
+        checkpoint["complete"] = not info.get("hasNextPage") or not entities
+        checkpoint["updatedAt"] = time.time()
+        _save_checkpoint(checkpoint_path, checkpoint)
+        progress.update(len(entities), page.get("totalCount"))
+    return checkpoint
+
+
+def _new_checkpoint(args, path, sort, where):
+    return {
+        "version": CHECKPOINT_VERSION,
+        "ckId": args.ckId,
+        "tenant": args.tenant,
+        "sort": sort,
+        "where": where,
+        "output": os.path.abspath(path),
+        "endCursor": None,
+        "rows": 0,
+        "bytes": 0,
+        "totalCount": None,
+        "complete": False,
+        "startedAt": time.time(),
+        "updatedAt": time.time(),
+    }
+
+
+def _export_file(context, args, path, checkpoint, checkpoint_path, progress, stop=None):
+    """Export into `path` from `checkpoint`, first cutting off anything written after it."""
+    if checkpoint["bytes"]:
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = -1
+        if size < checkpoint["bytes"]:
+            # Raised, not exited: this runs in the shard workers of a sharded export.
+            raise OctoError(f"{path} is shorter than the checkpoint records; cannot resume.",
+                            hint="Remove the checkpoint and the output to start the export over.")
+    with open(path, "r+b" if checkpoint["bytes"] else "wb") as out:
+        # Drop anything written after the last checkpoint (a page cut off by a crash).
+        out.seek(checkpoint["bytes"])
+        out.truncate()
+        return _export_pages(context, args, out, checkpoint, checkpoint_path, progress, stop)
+
+
+# ---------------------------------------------------------------------------
+# Sharded export
+# ---------------------------------------------------------------------------
+
+def _key_of(entity, key):
+    if key == "rtId":
+        return entity.get("rtId")
+    return _attrs_to_dict((entity.get("attributes") or {}).get("items")).get(key)
+
+
+def _first_entity(context, args, field_filter, sort=None):
+    """Return (first entity or None, totalCount) for a first:1 runtimeEntities query."""
+    variables = {"ckId": args.ckId, "first": 1, "fieldFilter": field_filter}
+    if sort:
+        variables["sortOrder"] = sort
+    data = graphql_query(context, Q_FILTER, variables=variables,
+                         tenant_override=args.tenant, verify_ssl=not args.insecure)
+    conn = data.get("runtime", {}).get("runtimeEntities")
+    if conn is None:
+        print(f"Error: could not export '{args.ckId}' (type may be abstract or invalid).", file=sys.stderr)
+        sys.exit(1)
+    entities = collect_connection(conn)
+    return (entities[0] if entities else None), conn.get("totalCount")
+
+
+def _key_range(context, args, key, where):
+    """Return (smallest key, largest key, totalCount) of the export; the keys are None if it is empty.
+
+    Two first:1 queries sorted ascending and descending on the key; entities
+    without a value for an attribute key are left out of the range, but not out
+    of totalCount, which always counts every entity the export will write.
+    """
+    field_filter = list(where)
+    if key != "rtId":
+        field_filter.append({"attributePath": key, "operator": "NOT_EQUALS", "comparisonValue": None})
+    ends = []
+    for direction in ("ASCENDING", "DESCENDING"):
+        entity, total = _first_entity(context, args, field_filter,
+                                      [{"attributePath": key, "sortOrder": direction}])
+        if entity is None:
+            break
+        ends.append(_key_of(entity, key))
+    if key != "rtId":
+        _, total = _first_entity(context, args, list(where))
+    if len(ends) < 2:
+        return None, None, total
+    return ends[0], ends[1], total
+
+
+def _split_points(key, low, high, shards):
+    """Return up to shards-1 ascending cut points between low and high.
+
+    rtIds (24-hex ObjectIds) and numbers are split into equal-width ranges,
+    ISO timestamps into equal time spans. Other values cannot be split.
+    """
+    def spread(a, b):
+        return [a + (b - a) * i / shards for i in range(1, shards)]
+
+    if key == "rtId":
+        a, b = int(low, 16), int(high, 16)
+        cuts = [f"{a + (b - a) * i // shards:024x}" for i in range(1, shards)]
+    elif isinstance(low, (int, float)) and isinstance(high, (int, float)) \
+            and not isinstance(low, bool) and not isinstance(high, bool):
+        cuts = spread(low, high)
+        if isinstance(low, int) and isinstance(high, int):
+            cuts = [int(c) for c in cuts]
+    else:
+        try:
+            a = datetime.fromisoformat(str(low).replace("Z", "+00:00"))
+            b = datetime.fromisoformat(str(high).replace("Z", "+00:00"))
+            cuts = [(a + (b - a) * i / shards).isoformat() for i in range(1, shards)]
+        except (TypeError, ValueError):
+            print(f"Error: cannot split '{key}' into ranges (values like {low!r} are not numbers or"
+                  f" timestamps); use --shard-key rtId.", file=sys.stderr)
+            sys.exit(1)
+    return [c for i, c in enumerate(cuts) if c > low and (i == 0 or c > cuts[i - 1])]
+
+
+def _plan_shards(context, args, where):
+    """Build the shard list: a fieldFilter per key range, plus one for null keys."""
+    key = args.shard_key
+    low, high, total = _key_range(context, args, key, where)
+    if low is None:
+        return [list(where)], total
+    cuts = _split_points(key, low, high, args.shards) if low != high else []
+    bounds = [None] + cuts + [None]
+    shards = []
+    if key != "rtId":
+        shards.append(where + [{"attributePath": key, "operator": "EQUALS", "comparisonValue": None}])
+    for lower, upper in zip(bounds, bounds[1:]):
+        clauses = list(where)
+        if key != "rtId":
+            # Null keys belong to the null-key shard only, also in unbounded ranges.
+            clauses.append({"attributePath": key, "operator": "NOT_EQUALS", "comparisonValue": None})
+        if lower is not None:
+            clauses.append({"attributePath": key, "operator": "GREATER_EQUAL_THAN", "comparisonValue": lower})
+        if upper is not None:
+            clauses.append({"attributePath": key, "operator": "LESS_THAN", "comparisonValue": upper})
+        shards.append(clauses)
+    return shards, total
+
+
+def _merge_parts(out_path, parts):
+    """Concatenate the part files, in shard order, into the output file."""
+    with open(out_path, "wb") as out:
+        for part in parts:
+            with open(part, "rb") as f:
+                shutil.copyfileobj(f, out, 1024 * 1024)
+        out.flush()
+        os.fsync(out.fileno())
+
+
+def _export_sharded(context, args, checkpoint_path, plan):
+    """Export the shards of `plan` concurrently into part files, then merge them.
+
+    Each shard is sorted by the shard key and has its own part file and
+    checkpoint, so an interrupted export resumes every shard where it stopped.
+    The output is the parts in key order, identical for every run.
+    """
+    verify_ssl = not args.insecure
+    sort = [{"attributePath": plan["shardKey"], "sortOrder": "ASCENDING"}]
+    shards = []
+    for i, where in enumerate(plan["shards"]):
+        part = f"{args.out}.part{i:03d}"
+        part_checkpoint = _load_checkpoint(part + ".checkpoint") if plan.get("started") else None
+        shards.append((part, part_checkpoint or _new_checkpoint(args, part, sort, where)))
+    if not plan.get("started"):
+        plan["started"] = True
+        _save_checkpoint(checkpoint_path, plan)
+
+    done = sum(c["rows"] for _, c in shards)
+    ranges = len(shards) - (1 if plan["shardKey"] != "rtId" and len(shards) > 1 else 0)
+    label = f"Export {args.ckId} ({ranges} shard{'s' if ranges != 1 else ''}"
+    label += " + null-key shard)" if ranges < len(shards) else ")"
+    progress = _Progress(label, done, plan.get("totalCount"), fixed_total=True)
+    if done:
+        print(f"Resuming after {done:,} rows.", file=sys.stderr)
+    ensure_pool_size(context, args.parallel, tenant_override=args.tenant, verify_ssl=verify_ssl)
+    stop = threading.Event()
+
+    def run(shard):
+        part, checkpoint = shard
+        if checkpoint.get("complete"):
+            return checkpoint
+        return _export_file(context, args, part, checkpoint, part + ".checkpoint", progress, stop)
+
+    pool = ThreadPoolExecutor(max_workers=args.parallel)
+    try:
+        results = list(pool.map(run, shards))
+    except KeyboardInterrupt:
+        stop.set()
+        pool.shutdown(wait=True, cancel_futures=True)
+        print(f"\nExport interrupted after {progress.done:,} rows;"
+              f" rerun with --resume to continue.", file=sys.stderr)
+        sys.exit(130)
+    except OSError as e:
+        stop.set()
+        pool.shutdown(wait=True, cancel_futures=True)
+        print(f"\nError: {e}", file=sys.stderr)
+        sys.exit(1)
+    except OctoError:
+        stop.set()
+        pool.shutdown(wait=True, cancel_futures=True)
+        print(f"\nExport stopped after {progress.done:,} rows;"
+              f" rerun with --resume to continue.", file=sys.stderr)
+        raise
+    pool.shutdown()
+    progress.finish()
+
+    parts = [part for part, _ in shards]
+    try:
+        _merge_parts(args.out, parts)
+    except OSError as e:
+        print(f"Error: merging shards into {args.out} failed: {e}", file=sys.stderr)
+        sys.exit(1)
+    plan["rows"] = sum(c["rows"] for c in results)
+    plan["complete"] = True
+    plan["updatedAt"] = time.time()
+    _save_checkpoint(checkpoint_path, plan)
+    for part in parts:
+        for path in (part, part + ".checkpoint"):
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+    print(f"Exported {plan['rows']:,} entities of {args.ckId} to {args.out}.", file=sys.stderr)
+
+
 # ---------------------------------------------------------------------------
 # Subcommands
 # ---------------------------------------------------------------------------
 
 def cmd_list(context, args):
     query = Q_LIST if args.attrs else Q_LIST_COMPACT
-    variables = {"ckId": args.ckId, "first": args.first or 50}
+    variables = {"ckId": args.ckId}
     sort = _parse_sort(args.sort)
     if sort:
         variables["sortOrder"] = sort
 
-    data = graphql_query(context, query, variables=variables, tenant_override=args.tenant, verify_ssl=not args.insecure)
-    conn = data.get("runtime", {}).get("runtimeEntities")
-    if conn is None:
-        print(f"Error: could not query instances of '{args.ckId}' (type may be abstract or invalid).", file=sys.stderr)
-        sys.exit(1)
-    total = conn.get("totalCount", "?")
-    entities = collect_connection(conn)
+    pages = _entity_pages(context, args, query, variables, "query instances of")
+    first_page = next(pages)
+    total = first_page.get("totalCount", "?")
+    entities = _iter_entities(first_page, pages)
+
+    if args.ndjson:
+        _write_ndjson_pages(first_page, pages)
+        return
 
     if args.json:
-        print(json.dumps({"totalCount": total, "entities": entities}, indent=2))
+        print(json.dumps({"totalCount": total, "entities": list(entities)}, indent=2))
         return
 
-    if not entities:
+    if not first_page.get("edges"):
         print(f"No instances of '{args.ckId}' found.")
         return
 
-    showing = len(entities)
-    print(f"Instances of {args.ckId} ({showing} shown, {total} total):")
+    if _is_paging(args):
+        print(f"Instances of {args.ckId} ({total} total):")
+    else:
+        print(f"Instances of {args.ckId} ({len(first_page['edges'])} shown, {total} total):")
     print()
 
+    showing = 0
     for e in entities:
+        showing += 1
         name = _display_name(e)
         rtId = e.get("rtId", "?")
         if args.attrs:
@@ -232,14 +989,23 @@ def cmd_list(context, args):
         else:
             print(f"  {rtId}  {name}")
 
-    page = conn.get("pageInfo", {})
-    if page.get("hasNextPage"):
+    if _is_paging(args):
         print()
-        print(f"  ... more results available (use --first {(args.first or 50) * 2} to see more)")
+        print(f"  {showing} shown")
+    _print_more_hint(args, first_page)
 
 
 def cmd_get(context, args):
-    variables = {"ckId": args.ckId, "rtId": args.rtId}
+    rt_ids = _read_rt_ids(args)
+    if not rt_ids:
+        print("Error: no rtIds given.", file=sys.stderr)
+        sys.exit(1)
+    if len(rt_ids) > 1 or args.ids_from:
+        _get_many(context, args, rt_ids)
+        return
+
+    rt_id = rt_ids[0]
+    variables = {"ckId": args.ckId, "rtId": rt_id}
 
     data = graphql_query(context, Q_GET, variables=variables, tenant_override=args.tenant, verify_ssl=not args.insecure)
     conn = data.get("runtime", {}).get("runtimeEntities")
@@ -249,15 +1015,61 @@ def cmd_get(context, args):
     entities = collect_connection(conn)
 
     if not entities:
-        print(f"Entity not found: ckId={args.ckId} rtId={args.rtId}", file=sys.stderr)
+        print(f"Entity not found: ckId={args.ckId} rtId={rt_id}", file=sys.stderr)
         sys.exit(1)
 
     entity = entities[0]
 
+    if args.ndjson:
+        write_ndjson(entity)
+        return
+
     if args.json:
         print(json.dumps(entity, indent=2))
         return
 
+    _print_entity(entity)
+
+
+def _get_many(context, args, rt_ids):
+    """Bulk get: stream found entities, then report invalid and missing rtIds on stderr."""
+    invalid = [i for i in rt_ids if not _RT_ID_RE.match(i)]
+    valid = [i for i in rt_ids if _RT_ID_RE.match(i)]
+
+    found = []
+    missing = []
+    first = True
+    for chunk, entities in _iter_get_many(context, args, valid):
+        by_id = {e.get("rtId"): e for e in entities}
+        missing.extend(i for i in chunk if i not in by_id and i.lower() not in by_id)
+        if args.ndjson:
+            for e in entities:
+                write_ndjson(e)
+            sys.stdout.flush()
+        elif args.json:
+            found.extend(entities)
+        else:
+            for e in entities:
+                if not first:
+                    print()
+                first = False
+                _print_entity(e)
+            sys.stdout.flush()
+
+    if args.json:
+        print(json.dumps({"entities": found, "notFound": missing, "invalid": invalid}, indent=2))
+
+    for rt_id in invalid:
+        print(f"Invalid rtId (expected 24 hex characters): {rt_id}", file=sys.stderr)
+    for rt_id in missing:
+        print(f"Entity not found: ckId={args.ckId} rtId={rt_id}", file=sys.stderr)
+    if invalid or missing:
+        print(f"{len(valid) - len(missing)} of {len(rt_ids)} rtIds resolved.", file=sys.stderr)
+        sys.exit(1)
+
+
+def _print_entity(entity):
+    """Print one entity with its attributes and outbound associations."""
     print(f"Entity: {_display_name(entity)}")
     print(f"  rtId:      {entity.get('rtId', '?')}")
     print(f"  ckTypeId:  {entity.get('ckTypeId', '?')}")
@@ -289,161 +1101,348 @@ def cmd_get(context, args):
 
 
 def cmd_count(context, args):
-    variables = {"ckId": args.ckId}
+    if args.model:
+        ck_ids = _model_ck_ids(context, args)
+        if not ck_ids:
+            print(f"Error: no concrete types found in model '{args.model}'.", file=sys.stderr)
+            print("Use 'ck_explorer.py models' to list loaded models.", file=sys.stderr)
+            sys.exit(1)
+    elif args.ckIds:
+        ck_ids = list(dict.fromkeys(args.ckIds))
+    else:
+        print("Error: give one or more ckIds or --model.", file=sys.stderr)
+        sys.exit(1)
+
+    if len(ck_ids) > 1 or args.model:
+        _print_counts(args, _count_many(context, args, ck_ids))
+        return
+
+    ck_id = ck_ids[0]
+    variables = {"ckId": ck_id}
 
     data = graphql_query(context, Q_COUNT, variables=variables, tenant_override=args.tenant, verify_ssl=not args.insecure)
     conn = data.get("runtime", {}).get("runtimeEntities")
     if conn is None:
-        print(f"Error: could not count '{args.ckId}' (type may be abstract or invalid).", file=sys.stderr)
+        print(f"Error: could not count '{ck_id}' (type may be abstract or invalid).", file=sys.stderr)
         sys.exit(1)
     total = conn["totalCount"]
 
+    if args.ndjson:
+        write_ndjson({"ckId": ck_id, "totalCount": total})
+        return
+
     if args.json:
-        print(json.dumps({"ckId": args.ckId, "totalCount": total}, indent=2))
+        print(json.dumps({"ckId": ck_id, "totalCount": total}, indent=2))
         return
 
-    print(f"{args.ckId}: {total} instances")
+    print(f"{ck_id}: {total} instances")
+
+
+def _print_counts(args, rows):
+    """Print multi-type counts as a table, JSON, or NDJSON; exit 1 if any type failed."""
+    failed = [r for r in rows if r["totalCount"] is None]
+    total = sum(r["totalCount"] for r in rows if r["totalCount"] is not None)
+
+    if args.ndjson:
+        for r in rows:
+            write_ndjson(r)
+    elif args.json:
+        print(json.dumps({"counts": rows, "total": total}, indent=2))
+    else:
+        label = f" in {args.model}" if args.model else ""
+        print(f"Instance counts{label} ({len(rows)} types):")
+        print()
+        width = max(len(r["ckId"]) for r in rows)
+        for r in rows:
+            if r["totalCount"] is None:
+                print(f"  {r['ckId']:{width}s}  error: {r['error']}")
+            else:
+                print(f"  {r['ckId']:{width}s}  {r['totalCount']:>10}")
+        print(f"  {'-' * width}  {'-' * 10}")
+        print(f"  {'Total':{width}s}  {total:>10}")
+
+    if failed:
+        sys.exit(1)
 
 
 def cmd_search(context, args):
     attr = args.attr or "name"
-    field_filter = _build_field_filter(attr, "LIKE", args.term)
+    field_filter = _build_field_filter(attr, "LIKE", args.term) + _where_filters(args)
     variables = {
         "ckId": args.ckId,
-        "first": args.first or 50,
         "fieldFilter": field_filter,
     }
     sort = _parse_sort(args.sort)
     if sort:
         variables["sortOrder"] = sort
 
-    data = graphql_query(context, Q_SEARCH, variables=variables, tenant_override=args.tenant, verify_ssl=not args.insecure)
-    conn = data.get("runtime", {}).get("runtimeEntities")
-    if conn is None:
-        print(f"Error: could not search '{args.ckId}' (type may be abstract or invalid).", file=sys.stderr)
-        sys.exit(1)
-    total = conn.get("totalCount", "?")
-    entities = collect_connection(conn)
+    pages = _entity_pages(context, args, Q_SEARCH, variables, "search")
+    first_page = next(pages)
+    total = first_page.get("totalCount", "?")
+    entities = _iter_entities(first_page, pages)
+
+    if args.ndjson:
+        _write_ndjson_pages(first_page, pages)
+        return
 
     if args.json:
-        print(json.dumps({"totalCount": total, "entities": entities}, indent=2))
+        print(json.dumps({"totalCount": total, "entities": list(entities)}, indent=2))
         return
 
-    if not entities:
+    if not first_page.get("edges"):
         print(f"No instances of '{args.ckId}' matching '{args.term}' (on attribute '{attr}').")
         return
 
-    showing = len(entities)
-    print(f"Search '{args.term}' on {args.ckId}.{attr} ({showing} shown, {total} matched):")
+    if _is_paging(args):
+        print(f"Search '{args.term}' on {args.ckId}.{attr} ({total} matched):")
+    else:
+        print(f"Search '{args.term}' on {args.ckId}.{attr} ({len(first_page['edges'])} shown, {total} matched):")
     print()
 
+    showing = 0
     for e in entities:
+        showing += 1
         name = _display_name(e)
         rtId = e.get("rtId", "?")
         attrs = _attrs_to_dict((e.get("attributes") or {}).get("items"))
         matched_val = attrs.get(attr, "")
         print(f"  {rtId}  {name}  ({attr}={_format_attr_value(matched_val)})")
 
+    if _is_paging(args):
+        print()
+        print(f"  {showing} shown")
+    _print_more_hint(args, first_page)
+
 
 def cmd_query(context, args):
+    if args.format in _columnar.BINARY_FORMATS and not args.out:
+        print(f"Error: --format {args.format} writes a binary file; give it with --out FILE.", file=sys.stderr)
+        sys.exit(1)
+    if args.format and args.max is None:
+        args.all = True
     columns = [c.strip() for c in args.columns.split(",")]
     variables = {
         "ckId": args.ckId,
         "columnPaths": columns,
-        "first": args.first or 50,
     }
+    field_filter = _where_filters(args)
+    if field_filter:
+        variables["fieldFilter"] = field_filter
     sort = _parse_sort(args.sort)
     if sort:
         variables["sortOrder"] = sort
 
-    data = graphql_query(context, Q_QUERY, variables=variables, tenant_override=args.tenant, verify_ssl=not args.insecure)
-    result = data["runtime"]["transientQuery"]["simple"]
-    total = result.get("totalCount", "?")
-    items = result.get("items") or []
+    path = ("runtime", "transientQuery", "simple")
+    action = "run a transient query on"
+    if _is_paging(args):
+        try:
+            pages = _entity_pages(context, args, Q_QUERY_PAGED, variables, action,
+                                  path=path, count_nodes=_count_rows)
+            first_page = next(pages)
+        except GraphQLError:
+            # Server without cursor paging on transient queries: one page is all we can get.
+            first_page = next(_entity_pages(context, args, Q_QUERY, variables, action,
+                                            path=path, count_nodes=_count_rows))
+            pages = iter(())
+            print(f"Warning: this server does not page transient queries; only the first"
+                  f" {_count_rows(first_page)} rows are returned.", file=sys.stderr)
+    else:
+        pages = _entity_pages(context, args, Q_QUERY, variables, action, path=path, count_nodes=_count_rows)
+        first_page = next(pages)
+    total = first_page.get("totalCount", "?")
+    pages = itertools.chain([first_page], pages)
 
-    if args.json:
-        print(json.dumps({"totalCount": total, "items": items}, indent=2))
+    if args.format:
+        _write_columnar(args, pages)
         return
 
-    if not items:
-        print(f"No results for transient query on '{args.ckId}'.")
+    if args.ndjson:
+        for page in pages:
+            for row in _iter_rows(page):
+                write_ndjson(_row_to_dict(row))
+            sys.stdout.flush()
         return
 
-    item = items[0]
-    col_defs = item.get("columns") or []
-    rows = (item.get("rows") or {}).get("items") or []
-
-    # Header
-    col_names = [c.get("attributePath", "?") for c in col_defs]
-    col_widths = [max(len(name), 10) for name in col_names]
-
-    # Compute widths from data
-    for row in rows:
-        cells = (row.get("cells") or {}).get("items") or []
-        for i, cell in enumerate(cells):
-            if i < len(col_widths):
-                val = _format_attr_value(cell.get("value"), max_len=40)
-                col_widths[i] = max(col_widths[i], len(val))
+    if args.json:
+        print(json.dumps({"totalCount": total, "items": _merge_items(pages)}, indent=2))
+        return
 
-    print(f"Transient query on {args.ckId} ({len(rows)} rows, {total} total):")
-    print()
+    if not _count_rows(first_page):
+        print(f"No results for transient query on '{args.ckId}'.")
+        return
 
-    # Print header
-    header = "  ".join(name.ljust(col_widths[i]) for i, name in enumerate(col_names))
-    print(f"  {header}")
-    print(f"  {'  '.join('-' * w for w in col_widths)}")
-
-    # Print rows
-    for row in rows:
-        cells = (row.get("cells") or {}).get("items") or []
-        vals = []
-        for i, cell in enumerate(cells):
-            val = _format_attr_value(cell.get("value"), max_len=40)
-            if i < len(col_widths):
-                vals.append(val.ljust(col_widths[i]))
-            else:
-                vals.append(val)
-        print(f"  {'  '.join(vals)}")
+    if _is_paging(args):
+        print(f"Transient query on {args.ckId} ({total} total):")
+    else:
+        print(f"Transient query on {args.ckId} ({_count_rows(first_page)} rows, {total} total):")
+
+    # Column widths come from the first page of each result set, so rows can be
+    # printed as pages arrive; later values wider than that just push the line out.
+    shown = 0
+    header = None
+    col_widths = []
+    for page in pages:
+        for item in page.get("items") or []:
+            col_names = [c.get("attributePath", "?") for c in item.get("columns") or []]
+            rows = (item.get("rows") or {}).get("items") or []
+            if col_names != header:
+                header = col_names
+                col_widths = [max(len(name), 10) for name in col_names]
+                for row in rows:
+                    cells = (row.get("cells") or {}).get("items") or []
+                    for i, cell in enumerate(cells[:len(col_widths)]):
+                        col_widths[i] = max(col_widths[i], len(_format_attr_value(cell.get("value"), max_len=40)))
+                print()
+                print(f"  {'  '.join(name.ljust(col_widths[i]) for i, name in enumerate(col_names))}")
+                print(f"  {'  '.join('-' * w for w in col_widths)}")
+
+            for row in rows:
+                cells = (row.get("cells") or {}).get("items") or []
+                vals = []
+                for i, cell in enumerate(cells):
+                    val = _format_attr_value(cell.get("value"), max_len=40)
+                    vals.append(val.ljust(col_widths[i]) if i < len(col_widths) else val)
+                print(f"  {'  '.join(vals)}")
+            shown += len(rows)
+        sys.stdout.flush()
+
+    if _is_paging(args):
+        print()
+        print(f"  {shown} shown")
+    elif isinstance(total, int) and total > shown:
+        print()
+        print("  ... more results available (use --all or --max N to page through them)")
 
 
 def cmd_filter(context, args):
-    value = _coerce_value(args.value)
-    field_filter = _build_field_filter(args.attr, args.op, value)
+    if args.attr is not None and args.value is None:
+        print("Error: filter needs <attr> <op> <val> together.", file=sys.stderr)
+        sys.exit(1)
+    field_filter = []
+    if args.attr is not None:
+        field_filter = _build_field_filter(args.attr, args.op, _parse_filter_value(args.op, args.value))
+    field_filter += _where_filters(args)
+    if not field_filter:
+        print("Error: give <attr> <op> <val> or at least one --where ATTR OP VALUE.", file=sys.stderr)
+        sys.exit(1)
+    condition = _describe_filter(field_filter)
+    shown_attrs = list(dict.fromkeys(c["attributePath"] for c in field_filter if c["attributePath"] != "rtId"))
+
     variables = {
         "ckId": args.ckId,
-        "first": args.first or 50,
         "fieldFilter": field_filter,
     }
     sort = _parse_sort(args.sort)
     if sort:
         variables["sortOrder"] = sort
 
-    data = graphql_query(context, Q_FILTER, variables=variables, tenant_override=args.tenant, verify_ssl=not args.insecure)
-    conn = data.get("runtime", {}).get("runtimeEntities")
-    if conn is None:
-        print(f"Error: could not filter '{args.ckId}' (type may be abstract or invalid).", file=sys.stderr)
-        sys.exit(1)
-    total = conn.get("totalCount", "?")
-    entities = collect_connection(conn)
+    pages = _entity_pages(context, args, Q_FILTER, variables, "filter")
+    first_page = next(pages)
+    total = first_page.get("totalCount", "?")
+    entities = _iter_entities(first_page, pages)
+
+    if args.ndjson:
+        _write_ndjson_pages(first_page, pages)
+        return
 
     if args.json:
-        print(json.dumps({"totalCount": total, "entities": entities}, indent=2))
+        print(json.dumps({"totalCount": total, "entities": list(entities)}, indent=2))
         return
 
-    if not entities:
-        print(f"No instances of '{args.ckId}' where {args.attr} {args.op} {args.value}.")
+    if not first_page.get("edges"):
+        print(f"No instances of '{args.ckId}' where {condition}.")
         return
 
-    showing = len(entities)
-    print(f"Filter {args.ckId} where {args.attr} {args.op} {args.value} ({showing} shown, {total} matched):")
+    if _is_paging(args):
+        print(f"Filter {args.ckId} where {condition} ({total} matched):")
+    else:
+        print(f"Filter {args.ckId} where {condition} ({len(first_page['edges'])} shown, {total} matched):")
     print()
 
+    showing = 0
     for e in entities:
+        showing += 1
         name = _display_name(e)
         rtId = e.get("rtId", "?")
         attrs = _attrs_to_dict((e.get("attributes") or {}).get("items"))
-        matched_val = attrs.get(args.attr, "")
-        print(f"  {rtId}  {name}  ({args.attr}={_format_attr_value(matched_val)})")
+        matched = ", ".join(f"{a}={_format_attr_value(attrs.get(a, ''))}" for a in shown_attrs)
+        print(f"  {rtId}  {name}  ({matched})" if matched else f"  {rtId}  {name}")
+
+    if _is_paging(args):
+        print()
+        print(f"  {showing} shown")
+    _print_more_hint(args, first_page)
+
+
+def cmd_export(context, args):
+    checkpoint_path = args.checkpoint or args.out + ".checkpoint"
+    sort = _parse_sort(args.sort)
+    where = _where_filters(args)
+    checkpoint = _load_checkpoint(checkpoint_path) if args.resume else None
+    if args.shards > 1 and args.sort:
+        print("Error: a sharded export is ordered by --shard-key; --sort cannot be used with --shards.",
+              file=sys.stderr)
+        sys.exit(1)
+
+    if checkpoint is not None:
+        if checkpoint.get("ckId") != args.ckId or checkpoint.get("tenant") != args.tenant:
+            print(f"Error: {checkpoint_path} belongs to an export of '{checkpoint.get('ckId')}'"
+                  f" (tenant {checkpoint.get('tenant') or 'default'}).", file=sys.stderr)
+            sys.exit(1)
+        if checkpoint.get("output") != os.path.abspath(args.out):
+            print(f"Error: {checkpoint_path} belongs to an export to {checkpoint.get('output')},"
+                  f" not {os.path.abspath(args.out)}.", file=sys.stderr)
+            sys.exit(1)
+        if args.sort and checkpoint.get("sort") != sort:
+            print("Error: --sort differs from the checkpointed export; a cursor cannot be resumed"
+                  " with a different order.", file=sys.stderr)
+            sys.exit(1)
+        if args.where and (checkpoint.get("where") or []) != where:
+            print("Error: --where differs from the checkpointed export.", file=sys.stderr)
+            sys.exit(1)
+        if checkpoint.get("complete"):
+            print(f"Export of {args.ckId} to {args.out} is already complete"
+                  f" ({checkpoint['rows']:,} rows).", file=sys.stderr)
+            return
+        if checkpoint.get("shards"):
+            _export_sharded(context, args, checkpoint_path, checkpoint)
+            return
+    else:
+        if args.resume:
+            print(f"No checkpoint at {checkpoint_path}; starting a new export.", file=sys.stderr)
+        if args.shards > 1:
+            shards, total = _plan_shards(context, args, where)
+            plan = _new_checkpoint(args, args.out, None, where)
+            plan.update(shardKey=args.shard_key, shards=shards, totalCount=total)
+            _export_sharded(context, args, checkpoint_path, plan)
+            return
+        checkpoint = _new_checkpoint(args, args.out, sort, where)
+
+    progress = _Progress(f"Export {args.ckId}", checkpoint["rows"], checkpoint.get("totalCount"))
+    if checkpoint["rows"]:
+        print(f"Resuming after {checkpoint['rows']:,} rows.", file=sys.stderr)
+    try:
+        _export_file(context, args, args.out, checkpoint, checkpoint_path, progress)
+    except OSError as e:
+        print(f"\nError: {e}", file=sys.stderr)
+        sys.exit(1)
+    except KeyboardInterrupt:
+        print(f"\nExport interrupted after {checkpoint['rows']:,} rows;"
+              f" rerun with --resume to continue.", file=sys.stderr)
+        sys.exit(130)
+    except OctoError:
+        print(f"\nExport stopped after {checkpoint['rows']:,} rows;"
+              f" rerun with --resume to continue.", file=sys.stderr)
+        raise
+    progress.finish()
+
+    if checkpoint["totalCount"] is None and not checkpoint["rows"]:
+        print(f"Error: could not export '{args.ckId}' (type may be abstract or invalid).", file=sys.stderr)
+        sys.exit(1)
+    if not checkpoint.get("complete"):
+        checkpoint["complete"] = True
+        _save_checkpoint(checkpoint_path, checkpoint)
+    print(f"Exported {checkpoint['rows']:,} entities of {args.ckId} to {args.out}.", file=sys.stderr)
 
 
 # ---------------------------------------------------------------------------
@@ -452,35 +1451,63 @@ def cmd_filter(context, args):
 
 def main():
     parser = argparse.ArgumentParser(description="OctoMesh runtime instance explorer")
+    _octo_profile.add_flag(parser)
 
     sub = parser.add_subparsers(dest="command")
 
-    def add_common_flags(p, with_first=False, with_sort=False):
-        p.add_argument("--json", action="store_true", help="Output raw JSON")
-        p.add_argument("--tenant", type=str, default=None, help="Override tenant ID")
-        p.add_argument("--insecure", action="store_true",
-                       help="Disable SSL certificate verification (for localhost dev)")
+    def add_common_flags(p, with_output=True, with_first=False, with_sort=False, with_paging=False, with_where=False):
+        if with_output:
+            output = p.add_mutually_exclusive_group()
+            output.add_argument("--json", action="store_true", help="Output raw JSON")
+            output.add_argument("--ndjson", action="store_true",
+                                help="Stream one compact JSON object per line as results arrive")
+        add_client_flags(p)
         if with_first:
-            p.add_argument("--first", type=int, default=None, help="Pagination limit")
+            p.add_argument("--first", type=positive_int, default=None,
+                           help="Pagination limit (page size with --all/--max)")
         if with_sort:
             p.add_argument("--sort", type=str, default=None,
                            help="Sort by attribute (e.g. name:asc, name:desc)")
+        if with_where:
+            p.add_argument("--where", nargs=3, action="append", default=None,
+                           metavar=("ATTR", "OP", "VALUE"),
+                           help="Extra server-side condition (repeatable; all must match). "
+                                "IN/NOT_IN take a,b,c or a JSON list")
+        if with_paging:
+            paging = p.add_mutually_exclusive_group()
+            paging.add_argument("--all", action="store_true",
+                                help="Follow the cursor and fetch every page")
+            paging.add_argument("--max", type=positive_int, default=None,
+                                help="Follow the cursor until N entities were fetched")
 
     # list
     p_list = sub.add_parser("list", help="List instances of a CK type")
     p_list.add_argument("ckId", help="CK type fullName (e.g. Industry.Basic/Machine)")
     p_list.add_argument("--attrs", action="store_true", help="Include all attributes")
-    add_common_flags(p_list, with_first=True, with_sort=True)
+    add_common_flags(p_list, with_first=True, with_sort=True, with_paging=True)
 
     # get
-    p_get = sub.add_parser("get", help="Get single entity with full detail")
+    p_get = sub.add_parser("get", help="Get one or more entities with full detail")
     p_get.add_argument("ckId", help="CK type fullName (e.g. Industry.Basic/Machine)")
-    p_get.add_argument("rtId", help="Runtime entity ID")
+    p_get.add_argument("rtIds", nargs="*", metavar="rtId", help="Runtime entity ID(s)")
+    p_get.add_argument("--ids-from", type=str, default=None, dest="ids_from", metavar="FILE",
+                       help="Read more rtIds from FILE ('-' for stdin)")
+    p_get.add_argument("--parallel", type=positive_int, default=4,
+                       help="Batches in flight at once (default 4)")
+    p_get.add_argument("--batch-size", type=positive_int, default=100, dest="batch_size",
+                       help="rtIds resolved per request (default 100)")
     add_common_flags(p_get)
 
     # count
-    p_count = sub.add_parser("count", help="Count instances of a CK type")
-    p_count.add_argument("ckId", help="CK type fullName (e.g. Industry.Basic/Machine)")
+    p_count = sub.add_parser("count", help="Count instances of one or more CK types")
+    p_count.add_argument("ckIds", nargs="*", metavar="ckId",
+                         help="CK type fullName(s) (e.g. Industry.Basic/Machine)")
+    p_count.add_argument("--model", type=str, default=None,
+                         help="Count every concrete type of this CK model instead")
+    p_count.add_argument("--parallel", type=positive_int, default=8,
+                         help="Batches in flight at once (default 8)")
+    p_count.add_argument("--batch-size", type=positive_int, default=25, dest="batch_size",
+                         help="Types counted per request (default 25)")
     add_common_flags(p_count)
 
     # search
@@ -489,22 +1516,45 @@ def main():
     p_search.add_argument("term", help="Search term (LIKE match)")
     p_search.add_argument("--attr", type=str, default=None,
                           help="Attribute to search (default: name)")
-    add_common_flags(p_search, with_first=True, with_sort=True)
+    add_common_flags(p_search, with_first=True, with_sort=True, with_paging=True, with_where=True)
 
     # query
     p_query = sub.add_parser("query", help="Transient query with specific columns")
     p_query.add_argument("ckId", help="CK type fullName (e.g. Industry.Basic/Machine)")
     p_query.add_argument("--columns", type=str, required=True,
                          help="Comma-separated column paths (e.g. name,machineState)")
-    add_common_flags(p_query, with_first=True, with_sort=True)
+    p_query.add_argument("--format", choices=_columnar.FORMATS, default=None,
+                         help="Write a columnar file instead of a table (parquet/arrow need pyarrow)")
+    p_query.add_argument("--out", type=str, default=None, metavar="FILE",
+                         help="Output file for --format (default: stdout, csv only)")
+    add_common_flags(p_query, with_first=True, with_sort=True, with_paging=True, with_where=True)
 
     # filter
     p_filter = sub.add_parser("filter", help="Filter by attribute value")
     p_filter.add_argument("ckId", help="CK type fullName (e.g. Industry.Basic/Machine)")
-    p_filter.add_argument("attr", help="Attribute name to filter on")
-    p_filter.add_argument("op", choices=FILTER_OPERATORS, help="Filter operator")
-    p_filter.add_argument("value", help="Comparison value")
-    add_common_flags(p_filter, with_first=True, with_sort=True)
+    p_filter.add_argument("attr", nargs="?", help="Attribute name to filter on")
+    p_filter.add_argument("op", nargs="?", choices=FILTER_OPERATORS, help="Filter operator")
+    p_filter.add_argument("value", nargs="?", help="Comparison value (IN/NOT_IN: a,b,c or a JSON list)")
+    add_common_flags(p_filter, with_first=True, with_sort=True, with_paging=True, with_where=True)
+
+    # export
+    p_export = sub.add_parser("export", help="Export every instance of a CK type to NDJSON, resumably")
+    p_export.add_argument("ckId", help="CK type fullName (e.g. Industry.Basic/Machine)")
+    p_export.add_argument("--out", type=str, required=True, metavar="FILE",
+                          help="NDJSON output file")
+    p_export.add_argument("--checkpoint", type=str, default=None, metavar="FILE",
+                          help="Checkpoint file (default: FILE.checkpoint next to --out)")
+    p_export.add_argument("--resume", action="store_true",
+                          help="Continue from the checkpoint instead of starting over")
+    p_export.add_argument("--page-size", type=positive_int, default=DEFAULT_PAGE_SIZE, dest="page_size",
+                          help=f"Entities per request (default {DEFAULT_PAGE_SIZE})")
+    p_export.add_argument("--shards", type=positive_int, default=1,
+                          help="Split the key range into N shards exported concurrently (default 1)")
+    p_export.add_argument("--shard-key", type=str, default="rtId", dest="shard_key", metavar="ATTR",
+                          help="Sortable key to split on: rtId (default) or a numeric/timestamp attribute")
+    p_export.add_argument("--parallel", type=positive_int, default=4,
+                          help="Shards in flight at once with --shards (default 4)")
+    add_common_flags(p_export, with_output=False, with_sort=True, with_where=True)
 
     args = parser.parse_args()
 
@@ -512,8 +1562,6 @@ def main():
         parser.print_help()
         sys.exit(1)
 
-    context = load_context()
-
     commands = {
         "list": cmd_list,
         "get": cmd_get,
@@ -521,9 +1569,11 @@ def main():
         "search": cmd_search,
         "query": cmd_query,
         "filter": cmd_filter,
+        "export": cmd_export,
     }
-    commands[args.command](context, args)
+
+    run_cli(args, commands[args.command])
 
 
 if __name__ == "__main__":
-    main()
+    _octo_profile.run(main, _IMPORT_START)